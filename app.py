@@ -1,11 +1,32 @@
 from shiny import App, render, ui, reactive
-from baseData import get_base_data
-from mtss.sidebar import app_sidebar, organized_cols, baseColumns
-import os
+from mtss.data import dataset_store, REFRESH_INTERVAL_SECS
+from baseData import ASSESSMENT_WATERMARK
+from mtss.sidebar import (
+    app_sidebar, widget_ids, lazy_children, server_option_filters, range_filter_bounds,
+    collect_active_filters, FILTER_DEBOUNCE_SECS, debounce
+)
+from mtss.startup import STARTUP_REPORT, write_startup_report
+from starlette.responses import JSONResponse
+import polars as pl
+import json
 import pathlib
+import math
+
+# Rows per page offered by the data table pager; the table only ever sends one page
+TABLE_PAGE_SIZES = [25, 50, 100, 250, 500]
+DEFAULT_TABLE_PAGE_SIZE = 100
+
+
+def display_frame(frame):
+    """Show missing values as empty cells; the dataset itself keeps typed nulls"""
+    return frame.with_columns(pl.all().cast(pl.String).fill_null(""))
 
 
-df = get_base_data().to_pandas()
+# Rebuild the dataset in the background on a fixed interval, if configured;
+# with an assessment watermark only changed students are re-pivoted
+if REFRESH_INTERVAL_SECS > 0:
+    dataset_store.start_schedule(
+        REFRESH_INTERVAL_SECS, incremental=bool(ASSESSMENT_WATERMARK))
 
 # Define head content for external CSS and fonts
 head_content = ui.tags.head(
@@ -115,6 +136,31 @@ app_ui = ui.page_fluid(
                 ui.div(
                     ui.h3("Selected Data",
                           class_="text-xl font-semibold text-gray-700 mb-3"),
+                    ui.div(
+                        ui.div(
+                            ui.input_select(
+                                "table_sort_col", "Sort by",
+                                choices={"": "(default order)"}, selected=""),
+                            ui.input_checkbox(
+                                "table_sort_desc", "Descending", value=False),
+                            class_="flex items-end gap-3"
+                        ),
+                        ui.div(
+                            ui.input_action_button(
+                                "table_prev", "", icon=ui.tags.i(class_="fas fa-chevron-left"),
+                                class_="px-3 py-1 bg-gray-100 rounded"),
+                            ui.output_text("table_pager", inline=True),
+                            ui.input_action_button(
+                                "table_next", "", icon=ui.tags.i(class_="fas fa-chevron-right"),
+                                class_="px-3 py-1 bg-gray-100 rounded"),
+                            ui.input_select(
+                                "table_page_size", "Rows per page",
+                                choices=[str(n) for n in TABLE_PAGE_SIZES],
+                                selected=str(DEFAULT_TABLE_PAGE_SIZE), width="120px"),
+                            class_="flex items-end gap-3"
+                        ),
+                        class_="flex items-end justify-between flex-wrap mb-3 table-pager"
+                    ),
                     ui.div(
                         ui.output_data_frame("data_table"),
                         class_="overflow-x-auto w-full table-responsive shiny-data-frame-container"
@@ -133,43 +179,60 @@ app_ui = ui.page_fluid(
 
 
 def server(input, output, session):
+    @reactive.poll(dataset_store.get_version, 5)
+    def current_dataset():
+        """The live dataset; invalidated whenever a refresh is swapped in"""
+        return dataset_store.current
+
+    @reactive.Effect
+    @reactive.event(input.lazy_content)
+    def _():
+        # Send the children of a sidebar branch or filter section the first time it opens
+        content_id = input.lazy_content()
+        children = lazy_children.get(content_id)
+        if children is not None:
+            ui.insert_ui(ui.TagList(*children), selector=f"#{content_id}", where="afterBegin")
+
+    @reactive.Effect
+    @reactive.event(input.server_options_filter)
+    def _():
+        # Serve a high-cardinality filter's choices from the column's sorted value index
+        filter_id = input.server_options_filter()
+        col = server_option_filters.get(filter_id)
+        if col is None:
+            return
+
+        def filter_options(request):
+            try:
+                limit = int(request.query_params.get("maxop", 1000))
+            except ValueError:
+                limit = 1000
+            values = dataset_store.current.value_index(col).search(
+                request.query_params.get("query", ""), limit=limit)
+            return JSONResponse([{"label": value, "value": value} for value in values])
+
+        session.send_input_message(filter_id, {
+            "url": session.dynamic_route(f"filter_options_{filter_id}", filter_options)
+        })
+
     @reactive.Calc
     def selected_columns_list():
-        cols = set()
+        cols = []
 
         # Add selected student info columns (these are direct checkbox group values)
         if input.student_info_cols():
-            cols.update(input.student_info_cols())
-
-        # Collect all original assessment column names
-        all_assessment_original_cols = []
-        for name, subjects in organized_cols["Assessments"].items():
-            for subject, years in subjects.items():
-                for year, testing_periods in years.items():
-                    for tp, assessment_types in testing_periods.items():
-                        for atype, assessment_column_names in assessment_types.items():
-                            all_assessment_original_cols.extend(
-                                assessment_column_names)
-
-        # Check each original assessment column name if its corresponding checkbox is selected
-        for original_col in all_assessment_original_cols:
-            sanitized_id = f"col_{''.join(c if c.isalnum() else '_' for c in original_col)}"
-            if sanitized_id in input and input[sanitized_id]():
-                cols.add(original_col)
-
-        # Collect all original grades column names
-        all_grades_original_cols = []
-        for subject, periods in organized_cols["Grades"].items():
-            for period, grade_column_names in periods.items():
-                all_grades_original_cols.extend(grade_column_names)
-
-        # Check each original grade column name if its corresponding checkbox is selected
-        for original_col in all_grades_original_cols:
-            sanitized_id = f"col_{''.join(c if c.isalnum() else '_' for c in original_col)}"
-            if sanitized_id in input and input[sanitized_id]():
-                cols.add(original_col)
-
-        return list(cols)
+            cols.extend(input.student_info_cols())
+
+        # Assessment and grade checkboxes are reported together as a JSON list of
+        # checkbox IDs, so this only depends on one input and only looks at the checked ones
+        try:
+            checked_ids = json.loads(input.selected_columns() or "[]")
+        except json.JSONDecodeError:
+            checked_ids = []
+        cols.extend(widget_ids.columns[col_id]
+                    for col_id in checked_ids if col_id in widget_ids.columns)
+
+        return list(dict.fromkeys(cols))
 
     @reactive.Calc
     def ordered_columns():
@@ -182,7 +245,6 @@ def server(input, output, session):
 
         try:
             # Parse the JSON string from the hidden input
-            import json
             ordered_cols = json.loads(input.column_order())
 
             # Filter out any columns that aren't in the selected columns
@@ -230,166 +292,128 @@ def server(input, output, session):
     @reactive.Calc
     def get_active_filters():
         """Collect all active filters from the UI"""
-        filters = {
-            "assessments": {},
-            "grades": {},
-            "student_info": {}
-        }
+        return collect_active_filters(input, widget_ids, range_filter_bounds)
+
+    @debounce(FILTER_DEBOUNCE_SECS)
+    @reactive.Calc
+    def settled_filters():
+        """Active filters once the inputs have stopped changing"""
+        return get_active_filters()
+
+    @reactive.Calc
+    def applied_filters():
+        """The filters the table is showing: settled changes, or the last applied batch"""
+        if input.filter_auto_apply():
+            return settled_filters()
+        # Batch mode: only pick up the filters when Apply Filters is clicked
+        input.apply_filters()
+        with reactive.isolate():
+            return get_active_filters()
+
+    # Index of the page shown by data_table, reset when the row set changes
+    table_page = reactive.Value(0)
 
-        # Collect assessment filters
-        for name, subjects in organized_cols["Assessments"].items():
-            for subject, years in subjects.items():
-                for year, _ in years.items():
-                    # Sanitize filter ID
-                    sanitized_name = ''.join(
-                        c if c.isalnum() else '_' for c in name)
-                    sanitized_subject = ''.join(
-                        c if c.isalnum() else '_' for c in subject)
-                    sanitized_year = ''.join(
-                        c if c.isalnum() else '_' for c in year)
-                    filter_id = f"filter_{sanitized_name}_{sanitized_subject}_{sanitized_year}"
-
-                    if filter_id in input and input[filter_id]():
-                        if name not in filters["assessments"]:
-                            filters["assessments"][name] = {}
-                        if subject not in filters["assessments"][name]:
-                            filters["assessments"][name][subject] = {}
-                        filters["assessments"][name][subject][year] = input[filter_id]()
-
-        # Collect grades filters
-        for subject, periods in organized_cols["Grades"].items():
-            for period in periods.keys():
-                # Sanitize filter ID
-                sanitized_subject = ''.join(
-                    c if c.isalnum() else '_' for c in subject)
-                sanitized_period = ''.join(
-                    c if c.isalnum() else '_' for c in period)
-                filter_id = f"filter_grades_{sanitized_subject}_{sanitized_period}"
-
-                if filter_id in input and input[filter_id]():
-                    if subject not in filters["grades"]:
-                        filters["grades"][subject] = {}
-                    filters["grades"][subject][period] = input[filter_id]()
-
-        # Collect student info filters
-        for col in organized_cols["Student Info"]:
-            if col not in ['SSID', 'STUDENT_NAME'] and not 'ID' in col:
-                # Sanitize filter ID
-                sanitized_col = ''.join(c if c.isalnum() else '_' for c in col)
-                filter_id = f"filter_{sanitized_col}"
-
-                if filter_id in input and input[filter_id]():
-                    filters["student_info"][col] = input[filter_id]()
-
-        return filters
+    @reactive.Calc
+    def filtered_rows():
+        """Row indices of the students that pass the active filters"""
+        return current_dataset().filter_rows(applied_filters())
+
+    @reactive.Calc
+    def sorted_rows():
+        """Filtered row indices in the order chosen with the sort controls"""
+        dataset = current_dataset()
+        rows = filtered_rows()
+        sort_col = input.table_sort_col()
+        if sort_col and sort_col in dataset.schema:
+            return dataset.sort_rows(rows, sort_col, descending=input.table_sort_desc())
+        return rows
+
+    def page_size():
+        try:
+            return int(input.table_page_size())
+        except (TypeError, ValueError):
+            return DEFAULT_TABLE_PAGE_SIZE
+
+    def last_page():
+        return max(0, math.ceil(len(sorted_rows()) / page_size()) - 1)
+
+    @reactive.Effect
+    @reactive.event(sorted_rows, input.table_page_size)
+    def _():
+        table_page.set(0)
+
+    @reactive.Effect
+    @reactive.event(input.table_prev)
+    def _():
+        table_page.set(max(0, table_page() - 1))
+
+    @reactive.Effect
+    @reactive.event(input.table_next)
+    def _():
+        table_page.set(min(last_page(), table_page() + 1))
+
+    @reactive.Effect
+    @reactive.event(ordered_columns)
+    def _():
+        # Offer the displayed columns as sort keys, keeping the current choice if possible
+        cols = ordered_columns()
+        selected = input.table_sort_col()
+        ui.update_select(
+            "table_sort_col",
+            choices={"": "(default order)", **{col: col for col in cols}},
+            selected=selected if selected in cols else ""
+        )
+
+    @output
+    @render.text
+    def table_pager():
+        total = len(sorted_rows())
+        if total == 0:
+            return "No matching students"
+        start = table_page() * page_size()
+        end = min(start + page_size(), total)
+        return f"Rows {start + 1:,}\u2013{end:,} of {total:,}"
+
+    @reactive.Calc
+    def table_columns():
+        """The ordered columns that exist in the dataset, as data_table shows them"""
+        dataset = current_dataset()
+        return [col for col in ordered_columns() if col in dataset.schema]
 
     @output
     @render.data_frame
     def data_table():
-        # Get the ordered columns
-        ordered_cols = ordered_columns()
-
-        # Ensure all ordered columns exist in the DataFrame
-        valid_cols = [col for col in ordered_cols if col in df.columns]
+        valid_cols = table_columns()
+        dataset = current_dataset()
 
         # If no columns are selected, return an empty DataFrame with a message
         if not valid_cols:
-            return df.head(0)
-
-        # Get active filters
-        filters = get_active_filters()
-
-        # Start with the original dataframe
-        filtered_df = df.copy()
-
-        # Apply student info filters
-        for col, values in filters["student_info"].items():
-            if values and col in filtered_df.columns:
-                # Filter out empty string values that might come from selectize
-                valid_values = [v for v in values if v != ""]
-                if valid_values:
-                    filtered_df = filtered_df[filtered_df[col].isin(
-                        valid_values)]
-
-        # Apply assessment filters
-        for name, subjects in filters["assessments"].items():
-            for subject, years in subjects.items():
-                for year, values in years.items():
-                    if not values:
-                        continue
-
-                    # Filter out empty string values that might come from selectize
-                    valid_values = [v for v in values if v != ""]
-                    if not valid_values:
-                        continue
-
-                    # Find all PL columns for this assessment/subject/year
-                    matching_columns = []
-                    for col in filtered_df.columns:
-                        if name in col and subject in col and year in col and "PL" in col:
-                            matching_columns.append(col)
-
-                    # Apply filter to any matching columns
-                    if matching_columns:
-                        # Create a condition that checks if ANY of the columns has ANY of the values
-                        condition = None
-                        for col in matching_columns:
-                            col_condition = filtered_df[col].isin(values)
-                            if condition is None:
-                                condition = col_condition
-                            else:
-                                condition = condition | col_condition
-
-                        if condition is not None:
-                            filtered_df = filtered_df[condition]
-
-        # Apply grades filters
-        for subject, periods in filters["grades"].items():
-            for period, values in periods.items():
-                if not values:
-                    continue
-
-                # Filter out empty string values that might come from selectize
-                valid_values = [v for v in values if v != ""]
-                if not valid_values:
-                    continue
-
-                # Find matching grade columns
-                matching_columns = []
-                for col in filtered_df.columns:
-                    if col.startswith(f"GR_{subject}_{period}"):
-                        matching_columns.append(col)
-
-                # Apply filter to any matching columns
-                if matching_columns:
-                    # Create a condition that checks if ANY of the columns has ANY of the values
-                    condition = None
-                    for col in matching_columns:
-                        # Convert values to the same type as the column data
-                        typed_values = []
-                        for val in values:
-                            try:
-                                if filtered_df[col].dtype == 'int64':
-                                    typed_values.append(int(val))
-                                elif filtered_df[col].dtype == 'float64':
-                                    typed_values.append(float(val))
-                                else:
-                                    typed_values.append(val)
-                            except (ValueError, TypeError):
-                                typed_values.append(val)
-
-                        col_condition = filtered_df[col].isin(typed_values)
-                        if condition is None:
-                            condition = col_condition
-                        else:
-                            condition = condition | col_condition
-
-                    if condition is not None:
-                        filtered_df = filtered_df[condition]
-
-        # Return the filtered DataFrame with selected columns in the user-defined order
-        return filtered_df[valid_cols]
+            return dataset.frame.head(0)
+
+        # Only the rows of the current page are materialized and sent
+        start = table_page() * page_size()
+        return display_frame(
+            dataset.take(valid_cols, sorted_rows().slice(start, page_size())))
+
+    @reactive.Effect
+    @reactive.event(data_table.sort)
+    async def _():
+        # The grid only holds the current page, so its own header sort would
+        # reorder just that page. Apply the clicked column to the whole row set
+        # through the sort controls instead, and clear the grid's sort.
+        sort = data_table.sort()
+        if not sort:
+            return
+        cols = table_columns()
+        if sort[0]["col"] < len(cols):
+            ui.update_select("table_sort_col", selected=cols[sort[0]["col"]])
+            ui.update_checkbox("table_sort_desc", value=sort[0]["desc"])
+        await data_table.update_sort(None)
 
 
 app = App(app_ui, server, static_assets=str(
     pathlib.Path(__file__).parent/"static"))
+
+# Report how long each startup phase took, if MTSS_STARTUP_REPORT is set
+if STARTUP_REPORT:
+    write_startup_report(page_bytes=len(str(app_ui).encode()))
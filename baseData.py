@@ -1,81 +1,680 @@
 import polars as pl
 import os
 from dotenv import load_dotenv
-import re
-from functools import lru_cache
+import functools
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from mtss.memory import MemoryWatch
+from mtss.startup import phase
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-@lru_cache(maxsize=1)  # Cache the result for better performance
-def get_base_data():
+# Column of mtss_assessments that only grows as rows are loaded (e.g. a load
+# timestamp or serial id); setting it enables incremental refreshes
+ASSESSMENT_WATERMARK = os.getenv("MTSS_ASSESSMENT_WATERMARK", "")
 
-    query = "SELECT * FROM mtss_base"
-    assementQuery = "SELECT * FROM mtss_assessments"
+# How assessments are extracted:
+# "full"   - every row (SELECT *); latest_assessments() keeps the latest per test
+# "latest" - the database keeps the latest row per test with ROW_NUMBER() and
+#            returns only the columns the app uses
+ASSESSMENT_EXTRACTION = os.getenv("MTSS_ASSESSMENT_EXTRACTION", "full")
 
-    df = pl.read_database_uri(query=query, uri=os.getenv("DB_URL"))
-    assesment_df = pl.read_database_uri(
-        query=assementQuery, uri=os.getenv("DB_URL"))
-    # fill nulls with empty strings
-    assesment_df = assesment_df.fill_null("")
+# Assessment columns built for tests with a test date (e.g. i-Ready):
+# "date"   - one PL/SS column per test date
+# "period" - one PL/SS column per testing period (see TESTING_PERIODS) with
+#            each student's latest result in it
+ASSESSMENT_COLUMNS = os.getenv("MTSS_ASSESSMENT_COLUMNS", "date")
 
-    # Convert TEST_DATE to Date type, handling potential errors
-    assesment_df = assesment_df.with_columns(
-        pl.col("TEST_DATE").str.strptime(pl.Date, format="%Y-%m-%d",
-                                         strict=False).alias("TEST_DATE_PARSED")
-    )
+# TEST_NAMEs that keep one column per test date in "period" mode, comma-separated
+# (e.g. "i-Ready,DIBELS"); the sidebar lists each date of those tests on its own
+DATE_COLUMN_TESTS = [name.strip() for name in
+                     os.getenv("MTSS_DATE_COLUMN_TESTS", "").split(",") if name.strip()]
 
-    # Sort by SSID, TEST_NAME, SUBJECT, SCHOOL_YEAR, and then by TEST_DATE_PARSED (descending)
-    # This ensures the latest test date is picked for each assessment type within a school year
-    # For ELPAC/CAASPP without test dates, the latest school year will be picked due to the grouping
-    latest_assessments = assesment_df.sort(
-        ["SSID", "TEST_NAME", "SUBJECT", "SCHOOL_YEAR", "TEST_DATE_PARSED"],
-        descending=[False, False, False, False, True]
-    ).group_by(["SSID", "TEST_NAME", "SUBJECT", "SCHOOL_YEAR"]).first()
-
-    pivoted = latest_assessments.pivot(
-        index='SSID',
-        columns=['TEST_NAME', 'SUBJECT', 'SCHOOL_YEAR',
-                 'TEST_DATE'],  # Keep TEST_DATE for column naming
-        values=['PL', 'SS'],
-        aggregate_function='first'
-    )
+# Testing period of a dated assessment, by test month (Aug-Jul school year)
+TESTING_PERIODS = {
+    8: "Fall", 9: "Fall", 10: "Fall", 11: "Fall",
+    12: "Winter", 1: "Winter", 2: "Winter",
+    3: "Spring", 4: "Spring", 5: "Spring", 6: "Spring", 7: "Spring",
+}
 
-    def clean_col(col):
-        if isinstance(col, str) and '{' in col and '}' in col:
-            # Extract the prefix (PL or SS)
-            prefix, rest = col.split('_', 1)
-            # Remove curly braces and quotes
-            rest_clean = re.sub(r'[{}"]', '', rest)
-            # Replace commas (delimiters from pivot) with spaces for readability
-            rest_clean = rest_clean.replace(',', ' ')
-            return f"{rest_clean} {prefix}"
-        return str(col)
-    pivoted.columns = [clean_col(col) for col in pivoted.columns]
-    assem_data = pivoted
-    # left join the df to dd on SSID
-    dd = df.join(assem_data, on='SSID', how='left')
-    g = get_grades()
-    # left join the grades data on SSID
-    dd = dd.join(g, on='SSID', how='left')
-    # rename the column call ESL to Language
-    dd = dd.rename({"ESL": "Language"})
-    # make the return a lazy frame
+# A test date counts as a date when its text is shaped YYYY-MM-DD, and such
+# dates sort correctly as text; anything else (e.g. 2024-1-5) counts as a
+# missing date everywhere. latest_assessments() ranks rows and
+# long_assessments() places them in testing periods with iso_test_date(), and
+# the database ranks them with TEST_DATE_TEXT/TEST_DATE_IS_ISO (plain LIKE and
+# REPLACE, so it runs anywhere, and DATE columns are compared by their ISO text).
+ISO_DATE_PATTERN = r"^[0-9]{4}-[0-9]{2}-[0-9]{2}$"
+TEST_DATE_TEXT = 'cast("TEST_DATE" as varchar(32))'
+TEST_DATE_IS_ISO = "{text} like '____-__-__' and {digits_removed} = '--'".format(
+    text=TEST_DATE_TEXT,
+    digits_removed=functools.reduce(
+        lambda expr, digit: f"replace({expr}, '{digit}', '')", "0123456789", TEST_DATE_TEXT))
+
+# Latest row per (SSID, TEST_NAME, SUBJECT, SCHOOL_YEAR), in the order
+# latest_assessments() uses: rows without a test date first, then newest date
+# first. Same-day retakes go to the highest watermark (the last row loaded),
+# then the highest SS and PL compared as text, so the pick is deterministic.
+LATEST_ASSESSMENTS_QUERY = f'''select "SSID", "TEST_NAME", "SUBJECT", "SCHOOL_YEAR", "TEST_DATE", "PL", "SS"{{watermark}}
+from (
+    select a.*, row_number() over (
+        partition by "SSID", "TEST_NAME", "SUBJECT", "SCHOOL_YEAR"
+        order by case when {TEST_DATE_IS_ISO} then 1 else 0 end,
+            case when {TEST_DATE_IS_ISO} then {TEST_DATE_TEXT} else '' end desc{{tie_break}},
+            coalesce(cast("SS" as varchar(64)), '') desc,
+            coalesce(cast("PL" as varchar(64)), '') desc
+        ) as latest_rank{{partition_watermark}}
+    from mtss_assessments a{{where}}) ranked
+where latest_rank = 1'''
 
-    return dd
 
+def assessments_query(where=""):
+    """
+    SQL for extracting assessment rows in the ASSESSMENT_EXTRACTION mode.
 
-@lru_cache(maxsize=1)  # Cache the result for better performance
-def get_grades():
-    elQuery = '''select me.*
+    Args:
+        where: Optional "where ..." clause on mtss_assessments (aliased a)
+
+    Returns:
+        Query string
+    """
+    where = f"\n    {where}" if where else ""
+    if ASSESSMENT_EXTRACTION != "latest":
+        return f"select * from mtss_assessments a{where}"
+    watermark = partition_watermark = tie_break = ""
+    if ASSESSMENT_WATERMARK:
+        tie_break = (f',\n            case when "{ASSESSMENT_WATERMARK}" is null then 1 else 0 end, '
+                     f'"{ASSESSMENT_WATERMARK}" desc')
+        # Keep the highest watermark of each test's rows, not just the latest
+        # row's, so the frame's maximum is still the table's maximum
+        watermark = f', latest_watermark as "{ASSESSMENT_WATERMARK}"'
+        partition_watermark = (
+            f',\n        max("{ASSESSMENT_WATERMARK}") over (partition by "SSID", '
+            f'"TEST_NAME", "SUBJECT", "SCHOOL_YEAR") as latest_watermark')
+    return LATEST_ASSESSMENTS_QUERY.format(
+        watermark=watermark, partition_watermark=partition_watermark, tie_break=tie_break,
+        where=where)
+
+
+# Size estimate for budgeted builds: raw row count, bytes per row from a small
+# sample, and SSID boundaries that split the students into equal chunks
+ASSESSMENT_COUNT_QUERY = 'select count(*) as "ROWS" from mtss_assessments'
+ASSESSMENT_SAMPLE_QUERY = "select * from mtss_assessments limit 1000"
+SSID_CHUNKS_QUERY = '''select min("SSID") as "LOW" from (
+    select "SSID", ntile({chunks}) over (order by "SSID") as chunk
+    from mtss_base) ranked
+group by chunk
+order by chunk'''
+
+# Peak memory of building one chunk, as a multiple of its raw extracted size:
+# the driver's buffers, the raw rows, the parsed dates and the grouped/long
+# copies (about 15x measured on SQLite with connectorx)
+BUILD_MEMORY_FACTOR = 15
+
+# Limits of a budgeted build: below MIN_CHUNK_HEADROOM_MB left after the
+# student queries, or past MAX_ASSESSMENT_CHUNKS chunks, the budget is too
+# small to build the assessments in and the build stops with a MemoryError
+MIN_CHUNK_HEADROOM_MB = 16
+MAX_ASSESSMENT_CHUNKS = 256
+
+# Source queries, keyed by the name used in timings and extract_sources()
+SOURCE_QUERIES = {
+    "base": "SELECT * FROM mtss_base",
+    "assessments": assessments_query(),
+    "elgrades": '''select me.*
     from mtss_base mb 
-    inner join mtss_elgrades me on me."SSID" = mb."SSID" '''
-    secQuery = '''select ms.*
+    inner join mtss_elgrades me on me."SSID" = mb."SSID" ''',
+    "segrades": '''select ms.*
     from mtss_base mb 
-    inner join mtss_segrades ms  on ms."SSID" = mb."SSID"'''
+    inner join mtss_segrades ms  on ms."SSID" = mb."SSID"''',
+}
+
+# connectorx partitioned reads, opted into per source query: with
+# MTSS_DB_PARTITION_ON="assessments=LOAD_ID" (comma-separated NAME=COLUMN
+# pairs) the assessments query is split into MTSS_DB_PARTITIONS ranges of
+# LOAD_ID. connectorx can only split on integer columns; a query whose column
+# is not one is read in a single partition, with a warning.
+DB_PARTITION_ON = dict(
+    item.strip().split("=", 1)
+    for item in os.getenv("MTSS_DB_PARTITION_ON", "").split(",") if "=" in item)
+DB_PARTITIONS = int(os.getenv("MTSS_DB_PARTITIONS", "1"))
+
+# Wall-clock seconds of the most recent read of each source, plus "total"
+query_timings = {}
+
+# Memory report of the most recent build: peak_mb (growth over the starting
+# RSS), budget_mb (0 if unbounded) and chunks (assessment extraction chunks)
+build_memory = {}
+
+# Compact dtypes of the loaded values. Labels (performance levels and letter
+# grades) repeat a handful of strings across every student, so they are
+# stored as categorical codes; scale scores are plain integers. Missing
+# values stay null; the empty string is only a display concern.
+LABEL_DTYPE = pl.Categorical("lexical")
+SCORE_DTYPE = pl.Int32
+
+# One string cache for the whole process, so label columns from different
+# loads (e.g. incremental patches) share codes and concatenate without
+# re-encoding
+pl.enable_string_cache()
+
+# Raw assessment columns that identify a test; nulls become "" so they can
+# be grouped on and joined into column names
+ASSESSMENT_KEYS = ["TEST_NAME", "SUBJECT", "SCHOOL_YEAR", "TEST_DATE"]
+
+# Typed description of every assessment and grade column, built alongside the
+# data so nothing downstream has to parse column names. CATEGORY is
+# "Assessments" (TEST_NAME through TYPE are set; TEST_DATE is "" for tests
+# without dates; PERIOD is set for testing period columns, whose TEST_DATE is
+# the latest date in them) or "Grades" (SUBJECT and PERIOD are set).
+CATALOG_SCHEMA = {
+    "COLUMN": pl.String,
+    "CATEGORY": pl.String,
+    "TEST_NAME": pl.String,
+    "SUBJECT": pl.String,
+    "SCHOOL_YEAR": pl.String,
+    "TEST_DATE": pl.String,
+    "TYPE": pl.String,
+    "PERIOD": pl.String,
+}
+
+# Grade column name parts spelled out by get_grades(), e.g. GR_M_T1 -> GR_Math_T1
+GRADE_NAME_PARTS = {
+    'E': 'English',
+    'M': 'Math',
+    'R': 'Reading',
+    'LW': 'LanguageWriting',
+    'S': 'Science',
+    'SS': 'SocialStudies',
+    # 'GR', 'T', 'Q', 'S' are kept as is
+}
+
+
+def partition_options(source, query):
+    """
+    Get the connectorx partitioning arguments for a source query.
+
+    Args:
+        source: Key of SOURCE_QUERIES the query reads
+        query: Query string
+
+    Returns:
+        Keyword arguments for pl.read_database_uri(); empty to read the
+        query in one partition
+    """
+    col = DB_PARTITION_ON.get(source)
+    if DB_PARTITIONS <= 1 or not col:
+        return {}
+    try:
+        dtype = pl.read_database_uri(query=f'select "{col}" from ({query}) probe limit 1',
+                                     uri=os.getenv("DB_URL")).dtypes[0]
+    except Exception:
+        logger.warning("Cannot read partition column %s of %s; reading it in one partition",
+                       col, source, exc_info=True)
+        return {}
+    if not dtype.is_integer():
+        logger.warning("Partition column %s of %s is %s, not an integer; reading it in "
+                       "one partition", col, source, dtype)
+        return {}
+    return {"partition_on": col, "partition_num": DB_PARTITIONS}
+
+
+def read_source(name, query=None, source=None):
+    """
+    Run one source query, recording how long it took.
+
+    Args:
+        name: Name for timings and logs; also the key of SOURCE_QUERIES to
+            run when query is not given
+        query: Query string to run instead of SOURCE_QUERIES[name]
+        source: Key of SOURCE_QUERIES the query reads, for partitioning
+            (defaults to name)
+
+    Returns:
+        Polars DataFrame
+    """
+    query = query or SOURCE_QUERIES[name]
+    kwargs = partition_options(source or name, query)
+    start = time.perf_counter()
+    with phase(f"query {name}") as details:
+        df = pl.read_database_uri(query=query, uri=os.getenv("DB_URL"), **kwargs)
+        details["rows"] = df.height
+    query_timings[name] = time.perf_counter() - start
+    logger.info("Query %s: %d rows in %.2fs",
+                name, df.height, query_timings[name])
+    return df
+
+
+@phase("extract sources")
+def extract_sources(names=tuple(SOURCE_QUERIES)):
+    """
+    Run the source queries concurrently, one connection each.
+
+    Args:
+        names: Keys of SOURCE_QUERIES to read
+
+    Returns:
+        Dictionary mapping each name to its Polars DataFrame
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        futures = {name: pool.submit(read_source, name) for name in names}
+        sources = {name: future.result() for name, future in futures.items()}
+    query_timings["total"] = time.perf_counter() - start
+    logger.info("Extracted %s in %.2fs", ", ".join(names),
+                query_timings["total"])
+    return sources
+
+
+def assessment_watermark(assesment_df):
+    """Highest ASSESSMENT_WATERMARK value in a raw assessments frame, or None."""
+    if not ASSESSMENT_WATERMARK or assesment_df.height == 0:
+        return None
+    return assesment_df.get_column(ASSESSMENT_WATERMARK).max()
+
+
+def iso_test_date():
+    """Expression: whether TEST_DATE counts as a date (matches ISO_DATE_PATTERN)."""
+    return pl.col("TEST_DATE").str.contains(ISO_DATE_PATTERN)
+
+
+def latest_assessments(assesment_df):
+    """
+    Keep the latest row per student, test, subject and school year.
+
+    Args:
+        assesment_df: Raw mtss_assessments rows (DataFrame or LazyFrame)
+
+    Returns:
+        LazyFrame with one row per test, keys filled with "" instead of null
+    """
+    # fill nulls in the test keys with empty strings; PL and SS keep real nulls
+    assesment_lf = assesment_df.lazy().with_columns(
+        pl.col(ASSESSMENT_KEYS).cast(pl.String).fill_null(""))
+
+    # The database already kept one row per test (see assessments_query)
+    if ASSESSMENT_EXTRACTION == "latest":
+        return assesment_lf
+
+    # The latest test date is picked for each assessment type within a school year;
+    # for ELPAC/CAASPP without test dates, the grouping keeps one row per school year.
+    # Keeping the rows that match their group's latest date avoids sorting every
+    # row. Rows whose date is missing or not an ISO date rank above every date,
+    # as they did when the rows were sorted by date descending (nulls first);
+    # LATEST_ASSESSMENTS_QUERY ranks the same way.
+    group = ["SSID", "TEST_NAME", "SUBJECT", "SCHOOL_YEAR"]
+    # An ISO date read as the integer YYYYMMDD orders exactly as its text
+    rank = pl.when(iso_test_date()).then(
+        pl.col("TEST_DATE").str.replace_all("-", "", literal=True).cast(pl.Int32, strict=False)
+    ).otherwise(pl.lit(2**31 - 1, dtype=pl.Int32))
+    # About one row per test is left, plus same-day retakes; sorting those is
+    # cheap and gives the query's tie-break (watermark, then SS and PL as text)
+    tie_break = [pl.col(field).cast(pl.String).fill_null("") for field in ("SS", "PL")]
+    if ASSESSMENT_WATERMARK:
+        tie_break.insert(0, pl.col(ASSESSMENT_WATERMARK))
+    return assesment_lf.filter(rank == rank.max().over(group)).sort(
+        tie_break, descending=True, nulls_last=True).unique(group, keep="first")
+
+
+def as_labels(expr):
+    """Cast a label column (performance level, letter grade) to LABEL_DTYPE."""
+    return expr.cast(pl.String).cast(LABEL_DTYPE)
+
+
+def as_scores(expr):
+    """
+    Cast a scale score column to SCORE_DTYPE.
+
+    Values that are not numbers, or are out of SCORE_DTYPE's range (including
+    NaN and infinity), become null; fractional scores are truncated.
+    """
+    return (expr.cast(pl.String).str.strip_chars().cast(pl.Float64, strict=False)
+            .cast(SCORE_DTYPE, strict=False))
+
+
+def merge_catalogs(*catalogs):
+    """
+    Combine column catalogs, keeping the last entry for a repeated column.
+
+    Args:
+        *catalogs: Frames with CATALOG_SCHEMA
+
+    Returns:
+        One catalog frame, sorted by COLUMN
+    """
+    return pl.concat(catalogs).unique("COLUMN", keep="last").sort("COLUMN")
+
+
+@phase("long assessments")
+def long_assessments(assesment_df):
+    """
+    Latest assessment values in long format, one row per student and column.
+
+    Args:
+        assesment_df: Raw mtss_assessments rows
 
-    df = pl.read_database_uri(query=elQuery, uri=os.getenv("DB_URL"))
-    sec_df = pl.read_database_uri(query=secQuery, uri=os.getenv("DB_URL"))
+    Returns:
+        Tuple of (Polars DataFrame with SSID, COLUMN (the wide column name),
+        PL and SS; catalog of the assessment columns). PL columns have their
+        value in PL (LABEL_DTYPE) and SS columns in SS (SCORE_DTYPE); missing
+        results are left out.
+    """
+    # Same names the pivot used to produce: "<test> <subject> <year> <date> <PL|SS>"
+    # with braces and quotes removed and commas turned into spaces. The keys
+    # are cleaned one by one so the catalog holds the same parts.
+    keys = [pl.col(key).str.replace_all(r'[{}"]', '').str.replace_all(",", " ", literal=True)
+            for key in ASSESSMENT_KEYS]
+
+    # In period mode, "<date>" becomes the testing period of the month of
+    # dates that count as dates, by the same rule latest_assessments() ranks
+    # with, except for tests listed in DATE_COLUMN_TESTS
+    if ASSESSMENT_COLUMNS == "period":
+        month = pl.when(iso_test_date() & ~pl.col("TEST_NAME").is_in(DATE_COLUMN_TESTS)).then(
+            pl.col("TEST_DATE").str.slice(5, 2).cast(pl.Int8, strict=False))
+        period = month.replace_strict(TESTING_PERIODS, default=None, return_dtype=pl.String)
+    else:
+        period = pl.lit(None, dtype=pl.String)
+
+    # One lazy plan for both outputs, collected together on the streaming
+    # engine so the raw rows are never copied in full
+    latest = latest_assessments(assesment_df).select(
+        "SSID",
+        *keys,
+        as_labels(pl.col("PL")),
+        as_scores(pl.col("SS")),
+        period.alias("PERIOD"),
+    ).with_columns(
+        pl.concat_str(*ASSESSMENT_KEYS[:-1], pl.coalesce("PERIOD", "TEST_DATE"),
+                      separator=" ").alias("LABEL")).cache()
+
+    parts = {
+        atype: latest.filter(pl.col(atype).is_not_null()).with_columns(
+            (pl.col("LABEL") + f" {atype}").alias("COLUMN"), pl.lit(atype).alias("TYPE"))
+        for atype in ("PL", "SS")
+    }
+    long_df = pl.concat([
+        parts["PL"].select(
+            "SSID", "COLUMN", "PL", pl.lit(None, dtype=SCORE_DTYPE).alias("SS")),
+        parts["SS"].select(
+            "SSID", "COLUMN", pl.lit(None, dtype=LABEL_DTYPE).alias("PL"), "SS"),
+    ])
+    # A testing period column spans several dates; ISO dates sort as text
+    catalog = pl.concat([
+        part.group_by("COLUMN").agg(
+            pl.col("TEST_NAME", "SUBJECT", "SCHOOL_YEAR").first(),
+            pl.col("TEST_DATE").max(),
+            pl.col("TYPE", "PERIOD").first())
+        for part in parts.values()
+    ]).select(
+        pl.col("COLUMN"),
+        pl.lit("Assessments").alias("CATEGORY"),
+        *ASSESSMENT_KEYS,
+        "TYPE",
+        "PERIOD",
+    ).sort("COLUMN")
+    long_df, catalog = pl.collect_all([long_df, catalog], engine="streaming")
+    return long_df, catalog
+
+
+def plan_assessment_chunks(headroom_mb):
+    """
+    Choose how many SSID chunks to extract assessments in.
+
+    Args:
+        headroom_mb: Memory the assessment build may still use, in MB
+
+    Returns:
+        Number of chunks whose estimated build peak fits the headroom
+
+    Raises:
+        MemoryError: If the headroom is below MIN_CHUNK_HEADROOM_MB, or
+            fitting it would take more than MAX_ASSESSMENT_CHUNKS chunks
+    """
+    if headroom_mb < MIN_CHUNK_HEADROOM_MB:
+        raise MemoryError(
+            f"Only {headroom_mb:.0f} MB of the build budget is left after the student "
+            f"queries; assessments need at least {MIN_CHUNK_HEADROOM_MB} MB "
+            f"(raise MTSS_BUILD_MEMORY_MB)")
+    uri = os.getenv("DB_URL")
+    rows = pl.read_database_uri(query=ASSESSMENT_COUNT_QUERY, uri=uri).item()
+    sample = pl.read_database_uri(query=ASSESSMENT_SAMPLE_QUERY, uri=uri)
+    row_bytes = sample.estimated_size() / max(sample.height, 1)
+    estimate = rows * row_bytes * BUILD_MEMORY_FACTOR
+    chunks = max(1, math.ceil(estimate / (headroom_mb * 1024 * 1024)))
+    if chunks > MAX_ASSESSMENT_CHUNKS:
+        raise MemoryError(
+            f"Assessments need an estimated {estimate / (1024 * 1024):.0f} MB to build; "
+            f"the {headroom_mb:.0f} MB left in the build budget would take {chunks} "
+            f"chunks (at most {MAX_ASSESSMENT_CHUNKS}; raise MTSS_BUILD_MEMORY_MB)")
+    return chunks
+
+
+def assessment_chunks(chunks):
+    """
+    Split mtss_assessments into SSID ranges holding similar numbers of students.
+
+    Args:
+        chunks: Number of ranges
+
+    Returns:
+        List of "where ..." clauses for assessments_query(), together covering
+        every SSID
+    """
+    if chunks <= 1:
+        return [""]
+    lows = pl.read_database_uri(query=SSID_CHUNKS_QUERY.format(chunks=chunks),
+                                uri=os.getenv("DB_URL")).get_column("LOW").to_list()
+    clauses = []
+    for i in range(len(lows)):
+        conditions = []
+        if i > 0:
+            conditions.append(f'a."SSID" >= {_sql_literal(lows[i])}')
+        if i < len(lows) - 1:
+            conditions.append(f'a."SSID" < {_sql_literal(lows[i + 1])}')
+        clauses.append("where " + " and ".join(conditions) if conditions else "")
+    return clauses
+
+
+def build_long_assessments(chunk_clauses, watch, assesment_df=None):
+    """
+    Build long assessments chunk by chunk, checking memory after each one.
+
+    Latest-per-test selection only looks at one student's rows, so SSID
+    chunks can be built independently and concatenated.
+
+    Args:
+        chunk_clauses: Where clauses from assessment_chunks()
+        watch: MemoryWatch of the running build
+        assesment_df: Already extracted rows, used instead of querying when
+            there is a single chunk
+
+    Returns:
+        Tuple of (long assessments frame, assessment catalog, watermark or None)
+    """
+    parts, catalogs, watermarks = [], [], []
+    for i, where in enumerate(chunk_clauses):
+        if assesment_df is None:
+            name = "assessments" if len(chunk_clauses) == 1 else f"assessments {i + 1}"
+            assesment_df = read_source(name, assessments_query(where), "assessments")
+        watermarks.append(assessment_watermark(assesment_df))
+        long_df, catalog = long_assessments(assesment_df)
+        assesment_df = None
+        parts.append(long_df)
+        catalogs.append(catalog)
+        watch.check(f"assessment chunk {i + 1} of {len(chunk_clauses)}")
+    watermarks = [w for w in watermarks if w is not None]
+    return (pl.concat(parts), merge_catalogs(*catalogs),
+            max(watermarks) if watermarks else None)
+
+
+@phase("pivot assessments")
+def pivot_long_assessments(long_df):
+    """Pivot long assessments (see long_assessments) to one column per test."""
+    wide = [
+        long_df.filter(pl.col(field).is_not_null()).pivot(
+            on="COLUMN", index="SSID", values=field, aggregate_function="first")
+        for field in ("PL", "SS")
+    ]
+    return wide[0].join(wide[1], on="SSID", how="full", coalesce=True)
+
+
+@phase("student data")
+def get_student_data_with_watermark():
+    """
+    Load student rows and long-format assessments from the database.
+
+    Returns:
+        Tuple of (students frame with base info and grades, long assessments
+        frame, column catalog (CATALOG_SCHEMA) of the assessment and grade
+        columns, assessment watermark or None)
+    """
+    with MemoryWatch() as watch:
+        # With a memory budget, the student queries run first and assessments
+        # are then read and built in SSID chunks sized to the budget left
+        budgeted = watch.budget_bytes > 0
+        names = [name for name in SOURCE_QUERIES if not budgeted or name != "assessments"]
+        sources = extract_sources(tuple(names))
+        students, grades_catalog = get_students(sources)
+        watch.check("student queries")
+
+        chunks = plan_assessment_chunks(watch.headroom_mb) if budgeted else 1
+        long_df, assessment_catalog, watermark = build_long_assessments(
+            assessment_chunks(chunks), watch, sources.get("assessments"))
+
+    build_memory.update(peak_mb=round(watch.peak_mb, 1),
+                        budget_mb=watch.budget_bytes / (1024 * 1024), chunks=chunks)
+    logger.info("Built dataset in %d assessment chunk(s), peak %.1f MB over start",
+                chunks, watch.peak_mb)
+    return students, long_df, merge_catalogs(assessment_catalog, grades_catalog), watermark
+
+
+def get_students(sources=None):
+    """
+    Join base info and grades into one row per student.
+
+    Args:
+        sources: Frames from extract_sources(); the student tables are
+            queried if not given
+
+    Returns:
+        Tuple of (students frame with base info and grades, catalog of the
+        grade columns)
+    """
+    if sources is None:
+        sources = extract_sources(("base", "elgrades", "segrades"))
+    df = sources["base"]
+
+    g, grades_catalog = get_grades(sources)
+    # left join the grades data on SSID
+    students = df.join(g, on='SSID', how='left')
+    # rename the column call ESL to Language
+    return students.rename({"ESL": "Language"}), grades_catalog
+
+
+# Not cached here: mtss.data.store holds the loaded data and refreshes it
+def get_base_data():
+    students, long_df, _, _ = get_student_data_with_watermark()
+    # left join the pivoted assessments on SSID
+    return students.join(pivot_long_assessments(long_df), on='SSID', how='left')
+
+
+def _sql_literal(value):
+    """Render a watermark value as a SQL literal."""
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def get_changed_assessments(watermark):
+    """
+    Fetch the full assessment history of every student with rows past the watermark.
+
+    Latest-per-test selection needs all of a student's rows, not just the new
+    ones, so the query covers every row for the affected SSIDs (deduplicated
+    by the database in "latest" extraction mode).
+
+    Args:
+        watermark: Highest ASSESSMENT_WATERMARK value already loaded
+
+    Returns:
+        Tuple of (raw assessments frame for changed students, new watermark)
+    """
+    query = assessments_query(f'''where a."SSID" in (
+        select "SSID" from mtss_assessments
+        where "{ASSESSMENT_WATERMARK}" > {_sql_literal(watermark)})''')
+    start = time.perf_counter()
+    changed = pl.read_database_uri(query=query, uri=os.getenv("DB_URL"))
+    query_timings["assessments_incremental"] = time.perf_counter() - start
+    logger.info("Incremental query: %d rows for %d students in %.2fs",
+                changed.height, changed.get_column("SSID").n_unique(),
+                query_timings["assessments_incremental"])
+    new_watermark = assessment_watermark(changed)
+    return changed, watermark if new_watermark is None else max(watermark, new_watermark)
+
+
+def get_assessments_incremental(catalog, watermark):
+    """
+    Reprocess only the students with assessment rows past the watermark.
+
+    Args:
+        catalog: Column catalog of the data being brought up to date
+        watermark: Watermark that data was built at
+
+    Returns:
+        Tuple of (Series of the changed SSIDs, their long assessments from
+        long_assessments() or None if there are none, catalog with any new
+        assessment columns added, new watermark)
+    """
+    changed, new_watermark = get_changed_assessments(watermark)
+    ssids = changed.get_column("SSID").unique()
+    if changed.height == 0:
+        return ssids, None, catalog, new_watermark
+    long_df, changed_catalog = long_assessments(changed)
+    return ssids, long_df, merge_catalogs(catalog, changed_catalog), new_watermark
+
+
+def grade_catalog(columns):
+    """
+    Catalog the grade columns among renamed get_grades() columns.
+
+    Args:
+        columns: Column names of the grades frame, e.g. GR_Math_T1
+
+    Returns:
+        Frame with CATALOG_SCHEMA; columns not shaped GR_<subject>_<period>
+        are left out (they are student info)
+    """
+    rows = []
+    for col in columns:
+        prefix, *parts = col.split("_")
+        if prefix == "GR" and len(parts) >= 2:
+            rows.append({"COLUMN": col, "CATEGORY": "Grades",
+                         "SUBJECT": parts[0], "PERIOD": "_".join(parts[1:])})
+    return pl.DataFrame(rows, schema=CATALOG_SCHEMA)
+
+
+@phase("grades (join/clean columns)")
+def get_grades(sources=None):
+    """
+    Combine elementary and secondary grades into one row per student.
+
+    Args:
+        sources: Frames from extract_sources(); the grade tables are queried
+            if not given
+
+    Returns:
+        Tuple of (grades frame with SSID and GR_<subject>_<period> columns,
+        catalog of the grade columns)
+    """
+    # Reuse frames already extracted by get_base_data, otherwise fetch both
+    if sources is None:
+        sources = extract_sources(("elgrades", "segrades"))
+    df = sources["elgrades"]
+    sec_df = sources["segrades"]
     # combaine the two dataframes insert blank columns for the other
     df = df.join(sec_df, on='SSID', how='full')
     # merge the SSID and SSID_right columns
@@ -86,34 +685,17 @@ def get_grades():
     )
     # drop the SSID_right column
     df = df.drop("SSID_right")
-    df = df.fill_null("")
-
-    # Rename columns according to mapping
-    col_map = {
-        'E': 'English',
-        'M': 'Math',
-        'R': 'Reading',
-        'LW': 'LanguageWriting',
-        'S': 'Science',
-        'SS': 'SocialStudies',
-        # 'GR', 'T', 'Q', 'S' are kept as is
-    }
 
-    def rename_col(col):
-        # Only replace if the column matches exactly or as a suffix/prefix
-        for k, v in col_map.items():
-            # Replace only if the column is exactly k or starts/ends with k separated by _
-            if col == k:
-                return v
-            # Replace _k_ with _v_, _k with _v, k_ with v_
-            col = re.sub(rf'(?<=_)({k})(?=_)', v, col)
-            col = re.sub(rf'^({k})(?=_)', v, col)
-            col = re.sub(rf'(?<=_)({k})$', v, col)
-        return col
-    df.columns = [rename_col(col) for col in df.columns]
+    # Spell out the "_"-separated name parts, e.g. GR_M_T1 -> GR_Math_T1
+    df.columns = ["_".join(GRADE_NAME_PARTS.get(part, part) for part in col.split("_"))
+                  for col in df.columns]
 
-    return df
+    # Letter grades repeat a few labels across every student; other columns
+    # of the grade tables keep their type
+    catalog = grade_catalog(df.columns)
+    df = df.with_columns(as_labels(pl.col(catalog.get_column("COLUMN").to_list())))
+    return df, catalog
 
 
 if __name__ == "__main__":
-    print(get_grades())
+    print(*get_grades(), sep="\n")
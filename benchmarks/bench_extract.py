@@ -0,0 +1,88 @@
+"""
+Extraction benchmark for the full vs latest assessment extraction modes.
+
+Runs the assessment query and the latest-per-test step in each
+MTSS_ASSESSMENT_EXTRACTION mode, in a fresh process per mode, and reports
+the rows and bytes pulled from the database, the query time and the Polars
+time spent picking the latest rows. Both modes must produce the same long
+assessments.
+
+Usage:
+    DB_URL=... python benchmarks/bench_extract.py [--repeat 3]
+
+Works with any DB_URL; sqlite:///path/to/mtss.db is a convenient local
+stand-in for the production database.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODES = ("full", "latest")
+
+
+def run_mode(repeat):
+    """Time extraction in the current process's mode and print a JSON report."""
+    import polars as pl
+
+    import baseData
+
+    best = {}
+
+    def timed(name, fn):
+        start = time.perf_counter()
+        result = fn()
+        best[name] = min(best.get(name, float("inf")), time.perf_counter() - start)
+        return result
+
+    for _ in range(repeat):
+        raw = timed("query_secs", lambda: baseData.read_source("assessments"))
+        latest = timed("latest_secs", lambda: baseData.latest_assessments(raw).collect())
+        long_df, catalog = timed("long_secs", lambda: baseData.long_assessments(raw))
+
+    # Order-independent fingerprint of the long assessments
+    digest = long_df.with_columns(pl.all().cast(pl.String)).sort(
+        ["SSID", "COLUMN"]).hash_rows().sum()
+    print(json.dumps({
+        "mode": baseData.ASSESSMENT_EXTRACTION,
+        "rows_extracted": raw.height,
+        "columns_extracted": raw.width,
+        "extracted_mb": round(raw.estimated_size("mb"), 2),
+        "latest_rows": latest.height,
+        "long_rows": long_df.height,
+        "catalog_columns": catalog.height,
+        **{name: round(secs, 4) for name, secs in best.items()},
+        "digest": str(digest),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assessment extraction benchmark")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.repeat)
+        return
+
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--mode", mode,
+             "--repeat", str(args.repeat)],
+            env={**os.environ, "MTSS_ASSESSMENT_EXTRACTION": mode},
+            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    results["results_agree"] = results["full"]["digest"] == results["latest"]["digest"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
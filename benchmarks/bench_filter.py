@@ -0,0 +1,161 @@
+"""
+Latency benchmark for the data_table filter path.
+
+Compares the original pandas mask-chaining implementation with the lazy
+Polars filter engine, with and without the bitmap index, on a synthetic
+wide frame.
+
+Usage:
+    python benchmarks/bench_filter.py [--rows 100000] [--tests 250] [--repeat 5]
+
+--tests controls the number of (test, subject, year) groups; each adds a PL
+and an SS column, so 1000 tests gives a 2k-column frame.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import polars as pl
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from baseData import CATALOG_SCHEMA  # noqa: E402
+from mtss.data.bitmap_index import BitmapIndex  # noqa: E402
+from mtss.data.column_index import ColumnIndex  # noqa: E402
+from mtss.data.filter_engine import apply_filters  # noqa: E402
+from mtss.data.organize import organize_columns  # noqa: E402
+
+PL_LEVELS = ["Standard Exceeded", "Standard Met",
+             "Standard Nearly Met", "Standard Not Met", ""]
+SCHOOLS = ["Lincoln", "Adams", "Jefferson", "Madison", "Monroe"]
+GRADES = ["A", "B", "C", "D", "F", ""]
+
+
+def make_frame(rows, tests, seed=0):
+    """Build a synthetic wide frame shaped like get_base_data() output, and its catalog."""
+    rng = np.random.default_rng(seed)
+    catalog = []
+    data = {
+        "SSID": [str(1000000 + i) for i in range(rows)],
+        "Grade": rng.integers(0, 13, rows).astype(str),
+        "School": rng.choice(SCHOOLS, rows),
+    }
+    for t in range(tests):
+        year = f"{2015 + t % 8}-{2016 + t % 8}"
+        name = f"TEST{t // 8}"
+        data[f"{name} ELA {year}  PL"] = rng.choice(PL_LEVELS, rows)
+        data[f"{name} ELA {year}  SS"] = rng.integers(
+            2000, 2800, rows).astype(str)
+        catalog += [{"COLUMN": f"{name} ELA {year}  {atype}", "CATEGORY": "Assessments",
+                     "TEST_NAME": name, "SUBJECT": "ELA", "SCHOOL_YEAR": year,
+                     "TEST_DATE": "", "TYPE": atype} for atype in ("PL", "SS")]
+    for period in ["T1", "T2", "T3"]:
+        data[f"GR_Math_{period}"] = rng.choice(GRADES, rows)
+        catalog.append({"COLUMN": f"GR_Math_{period}", "CATEGORY": "Grades",
+                        "SUBJECT": "Math", "PERIOD": period})
+    return pl.DataFrame(data), pl.DataFrame(catalog, schema=CATALOG_SCHEMA)
+
+
+def legacy_filter(df, filters, valid_cols):
+    """The pre-engine pandas implementation of data_table, kept for comparison."""
+    filtered_df = df.copy()
+
+    for col, values in filters["student_info"].items():
+        valid_values = [v for v in values if v != ""]
+        if valid_values and col in filtered_df.columns:
+            filtered_df = filtered_df[filtered_df[col].isin(valid_values)]
+
+    for name, subjects in filters["assessments"].items():
+        for subject, years in subjects.items():
+            for year, values in years.items():
+                matching_columns = [
+                    col for col in filtered_df.columns
+                    if name in col and subject in col and year in col and "PL" in col]
+                condition = None
+                for col in matching_columns:
+                    col_condition = filtered_df[col].isin(values)
+                    condition = col_condition if condition is None else condition | col_condition
+                if condition is not None:
+                    filtered_df = filtered_df[condition]
+
+    for subject, periods in filters["grades"].items():
+        for period, values in periods.items():
+            matching_columns = [col for col in filtered_df.columns
+                                if col.startswith(f"GR_{subject}_{period}")]
+            condition = None
+            for col in matching_columns:
+                col_condition = filtered_df[col].isin(values)
+                condition = col_condition if condition is None else condition | col_condition
+            if condition is not None:
+                filtered_df = filtered_df[condition]
+
+    return filtered_df[valid_cols]
+
+
+def time_call(fn, repeat):
+    """Return the best wall-clock time of `repeat` calls, in milliseconds."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--tests", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frame, catalog = make_frame(args.rows, args.tests)
+    pandas_frame = frame.to_pandas()
+
+    filters = {
+        "student_info": {"School": ["Lincoln", "Adams"]},
+        "assessments": {"TEST0": {"ELA": {"2015-2016": ["Standard Met", "Standard Exceeded"]}}},
+        "grades": {"Math": {"T1": ["A", "B"]}},
+    }
+    select_cols = ["SSID", "School", "TEST0 ELA 2015-2016  PL",
+                   "TEST0 ELA 2015-2016  SS", "GR_Math_T1"]
+
+    legacy_ms, legacy_result = time_call(
+        lambda: legacy_filter(pandas_frame, filters, select_cols), args.repeat)
+    column_index = ColumnIndex(organize_columns(frame.columns, catalog))
+    engine_ms, engine_result = time_call(
+        lambda: apply_filters(frame, filters, select_cols, column_index), args.repeat)
+
+    filterable = ["Grade", "School"] + [
+        col for (_, _, _, atype), cols in column_index.assessments.items()
+        if atype == "PL" for col in cols
+    ] + [col for cols in column_index.grades.values() for col in cols]
+    build_start = time.perf_counter()
+    bitmap_index = BitmapIndex(frame, filterable)
+    build_ms = (time.perf_counter() - build_start) * 1000
+    bitmap_ms, bitmap_result = time_call(
+        lambda: apply_filters(frame, filters, select_cols, column_index, bitmap_index),
+        args.repeat)
+
+    print(json.dumps({
+        "rows": frame.height,
+        "columns": frame.width,
+        "legacy_pandas_ms": round(legacy_ms, 2),
+        "polars_engine_ms": round(engine_ms, 2),
+        "polars_bitmap_ms": round(bitmap_ms, 2),
+        "speedup": round(legacy_ms / engine_ms, 1) if engine_ms else None,
+        "bitmap_speedup": round(legacy_ms / bitmap_ms, 1) if bitmap_ms else None,
+        "bitmap_build_ms": round(build_ms, 2),
+        "bitmap_index_mb": round(bitmap_index.nbytes / (1024 * 1024), 2),
+        "rows_matched": engine_result.height,
+        "results_agree": (engine_result.height == len(legacy_result)
+                          and bitmap_result.equals(engine_result)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Memory benchmark for the shared dataset.
+
+Imports the app the way a worker does and reports resident memory next to
+the size of the stored data, compared with the fully pivoted wide frame the
+app used to keep in memory.
+
+Usage:
+    DB_URL=... [MTSS_BUILD_MEMORY_MB=...] python benchmarks/bench_memory.py
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mtss.memory import rss_bytes  # noqa: E402
+
+
+def current_rss_mb():
+    """Return the current resident set size of this process in MB."""
+    return rss_bytes() / (1024 * 1024)
+
+
+def main():
+    rss_start = current_rss_mb()
+
+    import baseData
+    from mtss.data import get_dataset
+    dataset = get_dataset()
+    rss_loaded = current_rss_mb()
+
+    import app  # noqa: F401  builds the sidebar like a worker would
+    from mtss.sidebar import main as sidebar_main
+    from mtss.sidebar import filters
+    rss_app = current_rss_mb()
+
+    # What the app would hold if every column were pivoted wide
+    wide_mb = dataset.project(dataset.columns).estimated_size("mb")
+
+    report = {
+        "rows": dataset.height,
+        "columns": len(dataset.columns),
+        "students_frame_mb": round(dataset.frame.estimated_size("mb"), 2),
+        "long_assessments_mb": round(dataset.assessments.estimated_size("mb"), 2),
+        "wide_equivalent_mb": round(wide_mb, 2),
+        "bitmap_index_mb": round(dataset.bitmap_index.nbytes / (1024 * 1024), 2),
+        "range_index_mb": round(dataset.range_index.nbytes / (1024 * 1024), 2),
+        "rss_start_mb": round(rss_start, 2),
+        "rss_after_load_mb": round(rss_loaded, 2),
+        "rss_after_app_import_mb": round(rss_app, 2),
+        # Peak of the dataset build; empty when the dataset came from a snapshot
+        "build_memory": baseData.build_memory,
+        "shared_dataset": sidebar_main.dataset is dataset and filters.get_dataset() is dataset,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
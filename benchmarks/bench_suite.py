@@ -0,0 +1,265 @@
+"""
+End-to-end benchmark of the load -> filter -> render path on synthetic data.
+
+Generates source tables with benchmarks/synthetic.py, points the app at
+them, and times each step of serving the dashboard:
+
+- import app (the cold start: dataset load and sidebar)
+- get_base_data, get_grades, Dataset.load, organize_columns
+- sidebar construction (widget IDs, menus and filters, rendered to HTML)
+- get_active_filters and the data_table path (filter, sort, page)
+- serialization of a table page and of the dataset snapshot
+
+Each step reports its best and median time over --repeat runs. The report
+is JSON; with --baseline (a report from an earlier run on the same machine
+and scale) any step slower than the baseline by more than --tolerance is
+listed under "regressions" and the exit status is 1, so it can gate a
+deploy.
+
+Usage:
+    python benchmarks/bench_suite.py [--students 5000] [--tests 4] [--years 3]
+        [--periods 3] [--repeat 3] [--json report.json]
+        [--baseline baseline.json] [--tolerance 0.25]
+
+The database is a temporary SQLite file unless --db is given (an existing
+file is reused). Other MTSS_* settings, e.g. MTSS_ASSESSMENT_COLUMNS, apply
+as usual; snapshots are disabled so every load reads the database.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate_database  # noqa: E402
+
+# Steps faster than this are never reported as regressions (timer noise)
+MIN_REGRESSION_SECS = 0.005
+
+# Rows per data_table page, as in the app's default
+PAGE_SIZE = 100
+
+
+class Timings:
+    """Best and median wall-clock time of each named step."""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.samples = {}
+
+    def run(self, name, fn, repeat=None):
+        """Call fn repeat times (default self.repeat), recording each; return the last result."""
+        result = None
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            result = fn()
+            self.samples.setdefault(name, []).append(time.perf_counter() - start)
+        return result
+
+    def report(self):
+        return {name: {"best_secs": round(min(samples), 5),
+                       "median_secs": round(statistics.median(samples), 5),
+                       "runs": len(samples)}
+                for name, samples in self.samples.items()}
+
+
+class FilterInputs(dict):
+    """Filter ID -> value, readable the way the server reads Shiny inputs."""
+
+    def __getitem__(self, filter_id):
+        value = dict.__getitem__(self, filter_id)
+        return lambda: value
+
+
+def pick_filters(dataset, ids):
+    """
+    Choose filter inputs a user might set: two schools, two levels of the
+    first assessment filter and two letter grades of the first grades filter.
+    """
+    inputs = FilterInputs()
+    for filter_id, col in ids.student_info_filters.items():
+        if col == "School":
+            inputs[filter_id] = sorted(dataset.unique_values(col))[:2]
+    for filter_id, (name, subject, year) in list(ids.assessment_filters.items())[:1]:
+        cols = dataset.column_index.assessments.get((name, subject, year, "PL"), [])
+        if cols:
+            inputs[filter_id] = sorted(map(str, dataset.unique_values(cols[0])))[:2]
+    for filter_id, (subject, period) in list(ids.grades_filters.items())[:1]:
+        cols = dataset.column_index.grades.get((subject, period), [])
+        if cols:
+            inputs[filter_id] = sorted(map(str, dataset.unique_values(cols[0])))[:2]
+    return inputs
+
+
+def run_suite(timings):
+    """Time every step against the database in DB_URL; return data sizes."""
+    import polars as pl
+    from shiny import render
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        # The cold start happens once per process
+        timings.run("import app", lambda: __import__("app"), repeat=1)
+        import app
+        import baseData
+        from mtss.data import Dataset, get_dataset, organize_columns
+        from mtss.data.snapshot import read_snapshot, write_snapshot
+        from mtss.sidebar import baseColumns, collect_active_filters
+        from mtss.sidebar.assessment_menu import create_assessment_menu
+        from mtss.sidebar.filters import (
+            create_assessment_filter,
+            create_grades_filter,
+            create_student_info_filter,
+        )
+        from mtss.sidebar.grades_menu import create_grades_menu
+        from mtss.sidebar.ids import WidgetIds
+
+        wide = timings.run("get_base_data", baseData.get_base_data)
+        sources = baseData.extract_sources(("base", "elgrades", "segrades"))
+        timings.run("get_grades", lambda: baseData.get_grades(sources))
+        timings.run("Dataset.load", Dataset.load)
+
+        dataset = get_dataset()
+        organized = timings.run(
+            "organize_columns", lambda: organize_columns(dataset.columns, dataset.catalog))
+
+        def build_sidebar():
+            ids = WidgetIds(organized)
+            parts = [
+                create_assessment_menu(organized["Assessments"], ids),
+                create_grades_menu(organized["Grades"], ids),
+                create_assessment_filter(organized["Assessments"], ids),
+                create_grades_filter(organized["Grades"], ids),
+                create_student_info_filter(organized["Student Info"], ids),
+            ]
+            return ids, sum(len(str(part).encode()) for part in parts)
+        ids, sidebar_bytes = timings.run("sidebar construction", build_sidebar)
+
+        inputs = pick_filters(dataset, ids)
+        filters = timings.run("get_active_filters",
+                              lambda: collect_active_filters(inputs, ids))
+
+        # data_table: filter (without the shared cache, so every run computes),
+        # sort, and materialize one page of the default columns
+        columns = [col for col in baseColumns if col in dataset.schema]
+        columns += list(dataset.assessments.columns[:4])
+        rows = timings.run("data_table filter", lambda: dataset.filter_rows(filters, cache=None))
+        rows = timings.run("data_table sort", lambda: dataset.sort_rows(rows, "STUDENT_NAME"))
+        page = timings.run("data_table page", lambda: app.display_frame(
+            dataset.take(columns, rows.slice(0, PAGE_SIZE))))
+
+        payload = timings.run("serialize page",
+                              lambda: json.dumps(render.DataGrid(page).to_payload()))
+        timings.run("snapshot write", lambda: write_snapshot(
+            dataset.frame, dataset.assessments.aligned_frame(), dataset.catalog,
+            "bench", snapshot_dir))
+        timings.run("snapshot read", lambda: read_snapshot("bench", snapshot_dir))
+
+        return {
+            "students": dataset.height,
+            "columns": len(dataset.columns),
+            "wide_columns": wide.width,
+            "filtered_rows": len(rows),
+            "students_mb": round(dataset.frame.estimated_size("mb"), 2),
+            "long_assessments_mb": round(dataset.assessments.estimated_size("mb"), 2),
+            "wide_mb": round(wide.estimated_size("mb"), 2),
+            "bitmap_index_mb": round(dataset.bitmap_index.nbytes / (1024 * 1024), 2),
+            "range_index_mb": round(dataset.range_index.nbytes / (1024 * 1024), 2),
+            "build_peak_mb": baseData.build_memory.get("peak_mb"),
+            "sidebar_bytes": sidebar_bytes,
+            "page_payload_bytes": len(payload),
+            "polars_version": pl.__version__,
+        }
+
+
+def regressions(report, baseline, tolerance):
+    """
+    Compare step timings with a baseline report.
+
+    Args:
+        report: Report of this run
+        baseline: Report of an earlier run
+        tolerance: Allowed slowdown as a fraction (0.25 = 25% slower)
+
+    Returns:
+        List of messages, empty if no step regressed
+    """
+    messages = []
+    if baseline.get("params") != report["params"]:
+        messages.append(f"baseline params {baseline.get('params')} differ from "
+                        f"{report['params']}; timings are not comparable")
+        return messages
+    for name, timing in report["timings"].items():
+        before = baseline.get("timings", {}).get(name)
+        if before is None:
+            continue
+        best, limit = timing["best_secs"], before["best_secs"] * (1 + tolerance)
+        if best > limit and best - before["best_secs"] > MIN_REGRESSION_SECS:
+            messages.append(f"{name}: {best:.4f}s, baseline {before['best_secs']:.4f}s "
+                            f"(+{(best / before['best_secs'] - 1) * 100:.0f}%)")
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--tests", type=int, default=4)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--periods", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--db", help="SQLite file to use; generated if missing")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--baseline", help="Report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    params = {"students": args.students, "tests": args.tests, "years": args.years,
+              "periods": args.periods, "seed": args.seed,
+              "assessment_columns": os.getenv("MTSS_ASSESSMENT_COLUMNS", "date"),
+              "assessment_extraction": os.getenv("MTSS_ASSESSMENT_EXTRACTION", "full")}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db or os.path.join(tmp, "mtss.db")
+        timings = Timings(args.repeat)
+        source_rows = None
+        if not os.path.exists(path):
+            source_rows = timings.run("generate", lambda: generate_database(
+                path, args.students, args.tests, args.years, args.periods, args.seed), repeat=1)
+
+        # Settings are read when the app modules are imported, inside run_suite()
+        os.environ["DB_URL"] = f"sqlite:///{os.path.abspath(path)}"
+        os.environ["MTSS_SNAPSHOT_DIR"] = ""
+        os.environ["MTSS_REFRESH_INTERVAL"] = "0"
+        os.environ["MTSS_DATASET_MODE"] = "local"
+        os.chdir(ROOT)
+        data = run_suite(timings)
+
+    report = {
+        "params": params,
+        "python": platform.python_version(),
+        "source_rows": source_rows,
+        "data": data,
+        "timings": timings.report(),
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = regressions(report, json.load(f), args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text)
+    for message in report.get("regressions", []):
+        print(f"Regression: {message}", file=sys.stderr)
+    sys.exit(1 if report.get("regressions") else 0)
+
+
+if __name__ == "__main__":
+    main()
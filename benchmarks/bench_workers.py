@@ -0,0 +1,117 @@
+"""
+Per-worker memory benchmark for local vs shared dataset mode.
+
+Starts several worker processes at once, the way several uvicorn workers
+would start, and reports each one's memory after loading and indexing the
+dataset:
+
+- local:  every worker loads from the database on its own (no snapshots)
+- shared: one loader run publishes a snapshot and every worker maps it
+
+RSS counts mapped snapshot pages in every worker, so PSS (which splits
+shared pages between the processes using them) and anonymous memory are
+reported as well.
+
+Usage:
+    DB_URL=... python benchmarks/bench_workers.py [--workers 4]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def memory_mb():
+    """Return RSS, anonymous, file-backed and proportional memory of this process in MB."""
+    stats = {}
+    for path, fields in (("/proc/self/status", ("VmRSS", "RssAnon", "RssFile")),
+                         ("/proc/self/smaps_rollup", ("Pss",))):
+        try:
+            with open(path) as f:
+                for line in f:
+                    name, _, value = line.partition(":")
+                    if name in fields:
+                        stats[name] = int(value.split()[0]) / 1024
+        except OSError:
+            pass
+    return {name: round(value, 2) for name, value in stats.items()}
+
+
+def run_worker():
+    """Load the dataset like an app worker and print a JSON report."""
+    start = time.perf_counter()
+    import baseData
+    from mtss.data import get_dataset
+    dataset = get_dataset()
+    dataset.build_indexes()
+    # Touch a few wide columns the way a table render would
+    dataset.project(dataset.columns[:20])
+    report = {
+        "pid": os.getpid(),
+        "load_secs": round(time.perf_counter() - start, 3),
+        "source_queries": len([name for name in baseData.query_timings if name != "total"]),
+        **memory_mb(),
+    }
+    print(json.dumps(report), flush=True)
+    # Stay alive until told to exit so all workers are measured side by side
+    sys.stdin.read()
+
+
+def start_workers(count, env):
+    """Start count workers together and collect their reports."""
+    workers = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "--worker"],
+                         env=env, cwd=ROOT, stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(count)
+    ]
+    reports = [json.loads(worker.stdout.readline()) for worker in workers]
+    for worker in workers:
+        worker.communicate("")
+    return reports
+
+
+def summarize(reports):
+    keys = ["load_secs", "source_queries", "VmRSS", "RssAnon", "RssFile", "Pss"]
+    return {
+        "workers": reports,
+        "mean": {key: round(sum(r.get(key, 0) for r in reports) / len(reports), 2)
+                 for key in keys},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory benchmark")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker()
+        return
+
+    results = {}
+    local_env = {**os.environ, "MTSS_DATASET_MODE": "local", "MTSS_SNAPSHOT_DIR": ""}
+    results["local"] = summarize(start_workers(args.workers, local_env))
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        shared_env = {**os.environ, "MTSS_DATASET_MODE": "shared",
+                      "MTSS_SNAPSHOT_DIR": snapshot_dir}
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "mtss.data.loader", "--interval", "0",
+                        "--dir", snapshot_dir],
+                       env={**shared_env, "MTSS_DATASET_MODE": "local"}, cwd=ROOT, check=True)
+        results["loader_secs"] = round(time.perf_counter() - start, 3)
+        results["shared"] = summarize(start_workers(args.workers, shared_env))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Synthetic MTSS source tables for benchmarks.
+
+Writes mtss_base, mtss_assessments, mtss_elgrades and mtss_segrades to a
+SQLite file, shaped like the production tables:
+
+- CAASPP (ELA, Math) and ELPAC (Overall) once per school year, without a
+  test date
+- dated tests (i-Ready, STAR, ...) in ELA and Math, given in every testing
+  window of the year; each student tests on their own day in the window,
+  and some retake, so there are many distinct dates and superseded rows
+- letter grades per grading period: elementary (grades K-5) by trimester,
+  secondary (6-12) by quarter
+- a LOAD_ID column that only grows, usable as MTSS_ASSESSMENT_WATERMARK
+
+The same arguments and seed always produce the same file.
+
+Usage:
+    python benchmarks/synthetic.py mtss.db [--students 5000] [--tests 4]
+        [--years 3] [--periods 3] [--seed 0]
+
+Then point the app or a benchmark at it with DB_URL=sqlite:///path/to/mtss.db.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import sqlite3
+
+SCHOOLS = ["Lincoln", "Adams", "Jefferson", "Madison", "Monroe", "Roosevelt"]
+LANGUAGES = ["EO", "EL", "RFEP", "IFEP", "TBD"]
+RACES = ["Hispanic", "White", "Asian", "Black", "Filipino", "Two or More"]
+
+CAASPP_LEVELS = ["Standard Exceeded", "Standard Met",
+                 "Standard Nearly Met", "Standard Not Met"]
+DATED_LEVELS = ["Early On Grade Level", "Mid or Above Grade Level",
+                "One Grade Level Below", "Two Grade Levels Below",
+                "Three or More Grade Levels Below"]
+DATED_TEST_NAMES = ["i-Ready", "STAR", "DIBELS", "MAP", "Renaissance", "Lexia"]
+SUBJECTS = ["ELA", "Math"]
+
+# Grading period prefix and subjects of each grades table (see get_grades)
+EL_GRADES = ("T", ["M", "R", "LW", "S"])
+SE_GRADES = ("Q", ["E", "M", "S", "SS"])
+LETTER_GRADES = ["A", "B", "C", "D", "F"]
+
+# First month of each testing window, spread over the school year (Aug-Jul)
+WINDOW_MONTHS = [9, 1, 5, 11, 3, 7]
+
+# Share of students who sit a given dated test window, and who retake it
+TAKE_RATE = 0.9
+RETAKE_RATE = 0.05
+
+
+def school_years(years):
+    """The last `years` school years as "YYYY-YYYY", oldest first."""
+    return [f"{2024 - years + i}-{2025 - years + i}" for i in range(1, years + 1)]
+
+
+def window_dates(year, periods):
+    """First day of each testing window of a school year."""
+    start = int(year[:4])
+    months = sorted(WINDOW_MONTHS[:periods], key=lambda m: (m < 8, m))
+    return [datetime.date(start if month >= 8 else start + 1, month, 1) for month in months]
+
+
+def generate_database(path, students=5000, tests=4, years=3, periods=3, seed=0):
+    """
+    Write synthetic source tables to a new SQLite file.
+
+    Args:
+        path: Output file; replaced if it exists
+        students: Number of students
+        tests: Number of dated tests (each in ELA and Math)
+        years: Number of school years
+        periods: Testing windows per year for dated tests, and grading
+            periods per year for grades
+        seed: Random seed
+
+    Returns:
+        Dictionary with the row count of each table
+    """
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    con = sqlite3.connect(path)
+    con.execute('create table mtss_base ("SSID" text, "STUDENT_NAME" text, "Grade" text, '
+                '"School" text, "ESL" text, "Race" text, "Teacher" text)')
+    con.execute('create table mtss_assessments ("SSID" text, "TEST_NAME" text, "SUBJECT" text, '
+                '"SCHOOL_YEAR" text, "TEST_DATE" text, "PL" text, "SS" text, "LOAD_ID" integer)')
+    el_period, el_subjects = EL_GRADES
+    se_period, se_subjects = SE_GRADES
+    el_columns = [f"GR_{subject}_{el_period}{i}" for subject in el_subjects
+                  for i in range(1, periods + 1)]
+    se_columns = [f"GR_{subject}_{se_period}{i}" for subject in se_subjects
+                  for i in range(1, periods + 1)]
+    con.execute("create table mtss_elgrades (" + ", ".join(
+        f'"{col}" text' for col in ["SSID", *el_columns]) + ")")
+    con.execute("create table mtss_segrades (" + ", ".join(
+        f'"{col}" text' for col in ["SSID", *se_columns]) + ")")
+
+    dated_tests = [DATED_TEST_NAMES[i % len(DATED_TEST_NAMES)] + ("" if i < len(DATED_TEST_NAMES)
+                   else f" {i // len(DATED_TEST_NAMES) + 1}") for i in range(tests)]
+    year_windows = {year: window_dates(year, periods) for year in school_years(years)}
+
+    base, assessments, elgrades, segrades = [], [], [], []
+    for i in range(students):
+        ssid = str(1000000 + i)
+        grade = rng.randint(0, 12)
+        base.append((ssid, f"Student {i}", "K" if grade == 0 else str(grade),
+                     rng.choice(SCHOOLS), rng.choice(LANGUAGES), rng.choice(RACES),
+                     f"T{rng.randint(1, max(1, students // 25))}"))
+
+        for year, windows in year_windows.items():
+            for subject in SUBJECTS:
+                assessments.append((ssid, "CAASPP", subject, year, None,
+                                    rng.choice(CAASPP_LEVELS), str(rng.randint(2200, 2800))))
+            assessments.append((ssid, "ELPAC", "Overall", year, None,
+                                str(rng.randint(1, 4)), str(rng.randint(1400, 1700))))
+            for test in dated_tests:
+                for subject in SUBJECTS:
+                    for window in windows:
+                        if rng.random() > TAKE_RATE:
+                            continue
+                        sittings = 2 if rng.random() < RETAKE_RATE else 1
+                        for _ in range(sittings):
+                            day = window + datetime.timedelta(days=rng.randint(0, 20))
+                            # A few results have a level but no score
+                            score = str(rng.randint(300, 700)) if rng.random() > 0.02 else None
+                            assessments.append((ssid, test, subject, year, day.isoformat(),
+                                                rng.choice(DATED_LEVELS), score))
+
+        if grade <= 5:
+            elgrades.append((ssid, *(rng.choice(LETTER_GRADES) for _ in el_columns)))
+        else:
+            segrades.append((ssid, *(rng.choice(LETTER_GRADES) for _ in se_columns)))
+
+    # Rows arrive in load order, so LOAD_ID grows with the row position
+    con.executemany("insert into mtss_base values (?, ?, ?, ?, ?, ?, ?)", base)
+    con.executemany("insert into mtss_assessments values (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (row + (load_id,) for load_id, row in enumerate(assessments, 1)))
+    con.executemany(f"insert into mtss_elgrades values ({', '.join('?' * (len(el_columns) + 1))})",
+                    elgrades)
+    con.executemany(f"insert into mtss_segrades values ({', '.join('?' * (len(se_columns) + 1))})",
+                    segrades)
+    con.commit()
+    con.close()
+    return {"mtss_base": len(base), "mtss_assessments": len(assessments),
+            "mtss_elgrades": len(elgrades), "mtss_segrades": len(segrades)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="SQLite file to write")
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--tests", type=int, default=4)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--periods", type=int, default=3, choices=range(1, len(WINDOW_MONTHS) + 1))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rows = generate_database(args.path, args.students, args.tests, args.years,
+                             args.periods, args.seed)
+    print(json.dumps(rows, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Data access layer shared by the app and the sidebar builders.
+"""
+from .dataset import Dataset
+from .store import DatasetStore, dataset_store, get_dataset, REFRESH_INTERVAL_SECS
+from .bitmap_index import BitmapIndex
+from .column_index import ColumnIndex
+from .long_assessments import LongAssessments
+from .range_index import RangeIndex
+from .value_index import ValueIndex
+from .organize import organize_columns
+from .filter_engine import apply_filters, build_filter_expression
+from .filter_cache import FilterCache, filter_cache, canonical_filters
+
+__all__ = ['Dataset', 'DatasetStore', 'dataset_store', 'get_dataset',
+           'REFRESH_INTERVAL_SECS', 'BitmapIndex', 'ColumnIndex',
+           'LongAssessments', 'RangeIndex', 'ValueIndex', 'organize_columns',
+           'apply_filters', 'build_filter_expression',
+           'FilterCache', 'filter_cache', 'canonical_filters']
@@ -0,0 +1,152 @@
+"""
+Module for the inverted (bitmap) index over filterable column values.
+"""
+import numpy as np
+import polars as pl
+
+# Same cap the sidebar uses to decide whether a filter embeds its choices
+# or loads them from the server as the user types
+MAX_FILTER_CARDINALITY = 50
+
+
+def row_dtype(height):
+    """Smallest unsigned numpy dtype that holds every row index of a frame."""
+    return np.uint16 if height <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+
+def present_values(frame, col):
+    """
+    Get the non-null values of one column with their row indices.
+
+    Args:
+        frame: Polars DataFrame or Dataset
+        col: Column name
+
+    Returns:
+        Polars DataFrame with ROW (UInt32) and VALUE, in row order
+    """
+    if not isinstance(frame, pl.DataFrame):
+        return frame.present_values(col)
+    return pl.DataFrame([
+        pl.int_range(0, frame.height, dtype=pl.UInt32, eager=True).alias("ROW"),
+        frame.get_column(col).alias("VALUE"),
+    ]).filter(pl.col("VALUE").is_not_null())
+
+
+class BitmapIndex:
+    """
+    Matching rows for every distinct value of a column.
+
+    Only low-cardinality columns are indexed. Each value keeps whichever is
+    smaller: a packed bitmap (one bit per row) or the sorted indices of its
+    rows. Most assessment columns only have results for a fraction of the
+    students, so their values are stored as row indices and cost memory in
+    proportion to the results, not the students. A filter combination then
+    resolves with bitwise OR/AND instead of scanning rows.
+    """
+
+    def __init__(self, frame, columns, max_cardinality=MAX_FILTER_CARDINALITY):
+        """
+        Args:
+            frame: Polars DataFrame or Dataset to index
+            columns: Candidate column names to index
+            max_cardinality: Skip columns with more distinct values than this
+        """
+        self.height = frame.height
+        self.max_cardinality = max_cardinality
+        self.bitmaps = {}
+
+        for col in columns:
+            if col not in frame.schema:
+                continue
+            entries = self._index_column(present_values(frame, col))
+            if entries is not None:
+                self.bitmaps[col] = entries
+
+    def _index_column(self, present):
+        """
+        Build the entries of one column.
+
+        Args:
+            present: Frame with ROW and VALUE from present_values()
+
+        Returns:
+            Dictionary of value -> packed bitmap (uint8) or sorted row
+            indices, or None if the column has too many distinct values
+        """
+        if present.get_column("VALUE").n_unique() > self.max_cardinality:
+            return None
+        dtype = row_dtype(self.height)
+        packed_bytes = (self.height + 7) // 8
+        entries = {}
+        groups = present.group_by("VALUE").agg(pl.col("ROW"))
+        for value, rows in zip(groups.get_column("VALUE").to_list(),
+                               groups.get_column("ROW").to_list()):
+            rows = np.array(rows, dtype=dtype)
+            if rows.nbytes < packed_bytes:
+                entries[value] = np.sort(rows)
+            else:
+                mask = np.zeros(self.height, dtype=bool)
+                mask[rows] = True
+                entries[value] = np.packbits(mask)
+        return entries
+
+    def updated(self, frame, changed, columns):
+        """
+        Copy the index with only some columns rebuilt.
+
+        Args:
+            frame: Polars DataFrame or Dataset with the same rows
+            changed: Names of the columns whose values changed
+            columns: Candidate column names, as given to the constructor
+
+        Returns:
+            New BitmapIndex sharing the entries of every unchanged column
+        """
+        index = BitmapIndex(frame, [col for col in columns if col in changed], self.max_cardinality)
+        index.bitmaps = {**{col: entry for col, entry in self.bitmaps.items()
+                           if col not in changed}, **index.bitmaps}
+        return index
+
+    def __contains__(self, col):
+        return col in self.bitmaps
+
+    @property
+    def nbytes(self):
+        """Total memory held by the bitmaps and row indices, in bytes."""
+        return sum(entry.nbytes
+                   for col_bitmaps in self.bitmaps.values()
+                   for entry in col_bitmaps.values())
+
+    def lookup(self, terms):
+        """
+        OR together the bitmaps for a filter group.
+
+        Args:
+            terms: List of (column, values) pairs; a row matches if any
+                column holds any of its values
+
+        Returns:
+            Packed bitmap (numpy uint8 array), or None if a column is not indexed
+        """
+        if any(col not in self.bitmaps for col, _ in terms):
+            return None
+
+        result = np.zeros((self.height + 7) // 8, dtype=np.uint8)
+        mask = None
+        for col, values in terms:
+            col_bitmaps = self.bitmaps[col]
+            for value in values:
+                entry = col_bitmaps.get(value)
+                if entry is None:
+                    continue
+                if entry.dtype == np.uint8:
+                    np.bitwise_or(result, entry, out=result)
+                else:
+                    # Row indices are set in one unpacked mask and packed once
+                    if mask is None:
+                        mask = np.zeros(self.height, dtype=bool)
+                    mask[entry] = True
+        if mask is not None:
+            np.bitwise_or(result, np.packbits(mask), out=result)
+        return result
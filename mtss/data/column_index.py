@@ -0,0 +1,61 @@
+"""
+Module for exact lookups from filter keys to dataset columns.
+"""
+
+
+class ColumnIndex:
+    """
+    Precomputed mapping from filter keys to the exact columns they cover.
+
+    Built once from the output of organize_columns(), so the filter path can
+    resolve an assessment or grade filter with a dictionary lookup instead of
+    substring-matching every column name.
+    """
+
+    def __init__(self, organized):
+        """
+        Args:
+            organized: Dictionary returned by organize_columns()
+        """
+        self.assessments = {}
+        self.grades = {}
+
+        for name, subjects in organized["Assessments"].items():
+            for subject, years in subjects.items():
+                for year, testing_periods in years.items():
+                    for assessment_types in testing_periods.values():
+                        for atype, cols in assessment_types.items():
+                            self.assessments.setdefault(
+                                (name, subject, year, atype), []).extend(cols)
+
+        for subject, periods in organized["Grades"].items():
+            for period, cols in periods.items():
+                self.grades[(subject, period)] = list(cols)
+
+    def assessment_columns(self, name, subject, year, atype="PL"):
+        """
+        Get every column for an assessment/subject/year of the given type.
+
+        Args:
+            name: Assessment name
+            subject: Assessment subject
+            year: School year
+            atype: Assessment type, "PL" or "SS"
+
+        Returns:
+            List of column names (empty if none)
+        """
+        return self.assessments.get((name, subject, year, atype), [])
+
+    def grade_columns(self, subject, period):
+        """
+        Get the grade columns for a subject and grading period.
+
+        Args:
+            subject: Grade subject
+            period: Grading period
+
+        Returns:
+            List of column names (empty if none)
+        """
+        return self.grades.get((subject, period), [])
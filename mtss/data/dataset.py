@@ -0,0 +1,378 @@
+"""
+Module for the shared, process-wide student dataset.
+"""
+import polars as pl
+
+from .bitmap_index import BitmapIndex, present_values
+from .column_index import ColumnIndex
+from .filter_cache import canonical_filters, filter_cache, filters_from_predicates
+from .filter_engine import build_filter_expression
+from .long_assessments import LongAssessments
+from .range_index import RangeIndex
+from .organize import organize_columns
+from .snapshot import DATASET_MODE, load_assessments_incremental, load_student_data
+from .value_index import ValueIndex
+from mtss.startup import phase
+
+
+class Dataset:
+    """
+    Owner of the student data for the whole process.
+
+    Student info and grades are kept as a narrow Polars frame, and assessment
+    results in long format (see LongAssessments). Callers ask for the wide
+    columns they need through project() or query(), so only those columns are
+    ever materialized. The column catalog built with the data describes every
+    assessment and grade column, so column names are never parsed.
+    """
+
+    def __init__(self, frame, assessments, catalog, version=0, watermark=None):
+        """
+        Args:
+            frame: Polars DataFrame with one row per student (base info and grades)
+            assessments: Long assessments frame with SSID, COLUMN, PL and SS
+                (or COLUMN, ROW, PL and SS, see LongAssessments), or a
+                LongAssessments over the same students
+            catalog: Column catalog (baseData.CATALOG_SCHEMA) of the assessment
+                and grade columns
+            version: Load counter, increased on every refresh
+            watermark: Highest assessment watermark included in the data
+        """
+        self.frame = frame
+        if isinstance(assessments, LongAssessments):
+            self.assessments = assessments
+        else:
+            self.assessments = LongAssessments(assessments, frame.get_column("SSID"))
+        self.catalog = catalog
+        self.version = version
+        self.watermark = watermark
+        self.schema = {**frame.schema, **self.assessments.schema}
+        self._organized = None
+        self._column_index = None
+        self._bitmap_index = None
+        self._range_index = None
+        self._value_indexes = {}
+
+    @classmethod
+    @phase("load dataset")
+    def load(cls, version=0, rebuild=False):
+        """
+        Build a fully indexed Dataset from a fresh snapshot or the database.
+
+        Args:
+            version: Version number to stamp on the new Dataset
+            rebuild: Skip the snapshot and query the database (see
+                load_student_data())
+
+        Returns:
+            Dataset with its indexes already built
+        """
+        frame, assessments, catalog, watermark = load_student_data(rebuild=rebuild)
+        dataset = cls(frame, assessments, catalog, version=version, watermark=watermark)
+        dataset.build_indexes()
+        return dataset
+
+    def load_incremental(self, version):
+        """
+        Build a new Dataset with only the changed students reprocessed.
+
+        The assessments are patched in place of a rebuild (see
+        LongAssessments.patch()), and only the index entries of the columns
+        the changed students touch are rebuilt; the rest are shared with
+        this Dataset.
+
+        Falls back to a full load when this Dataset has no watermark, in
+        shared mode, where the loader process does the incremental work, and
+        when the base or grade rows changed, which only a full load picks up.
+
+        Args:
+            version: Version number to stamp on the new Dataset
+
+        Returns:
+            New Dataset with its indexes already built
+        """
+        if self.watermark is None or DATASET_MODE == "shared":
+            return Dataset.load(version)
+        patched = load_assessments_incremental(
+            self.frame, self.assessments, self.catalog, self.watermark)
+        if patched is None:
+            # A snapshot for the current fingerprint may predate the change
+            return Dataset.load(version, rebuild=True)
+        assessments, changed, catalog, watermark = patched
+        dataset = Dataset(self.frame, assessments, catalog,
+                          version=version, watermark=watermark)
+        dataset.build_indexes(previous=self, changed=changed)
+        return dataset
+
+    @property
+    def columns(self):
+        """List of all column names: student columns, then assessment columns."""
+        return list(self.schema)
+
+    @property
+    def height(self):
+        """Number of student rows."""
+        return self.frame.height
+
+    @property
+    def organized(self):
+        """Columns organized by organize_columns(), computed once."""
+        if self._organized is None:
+            with phase("organize_columns"):
+                self._organized = organize_columns(self.columns, self.catalog)
+        return self._organized
+
+    @property
+    def column_index(self):
+        """ColumnIndex built from the organized columns, computed once."""
+        if self._column_index is None:
+            with phase("column index"):
+                self._column_index = ColumnIndex(self.organized)
+        return self._column_index
+
+    @property
+    def bitmap_index(self):
+        """BitmapIndex over every filterable column, computed once."""
+        if self._bitmap_index is None:
+            with phase("bitmap index"):
+                self._bitmap_index = BitmapIndex(self, self.filterable_columns())
+        return self._bitmap_index
+
+    @property
+    def range_index(self):
+        """RangeIndex over every scale score (SS) column, computed once."""
+        if self._range_index is None:
+            with phase("range index"):
+                self._range_index = RangeIndex(self, self.scale_score_columns())
+        return self._range_index
+
+    def filterable_columns(self):
+        """
+        Get the columns the sidebar can build selectize filters for.
+
+        Returns:
+            List of student info, assessment PL and grade column names
+        """
+        student_info = [col for col in self.organized["Student Info"]
+                        if col not in ['SSID', 'STUDENT_NAME'] and not 'ID' in col]
+        assessment_pl = [col
+                         for (_, _, _, atype), cols in self.column_index.assessments.items()
+                         if atype == "PL"
+                         for col in cols]
+        grades = [col for cols in self.column_index.grades.values()
+                  for col in cols]
+        return student_info + assessment_pl + grades
+
+    def scale_score_columns(self):
+        """
+        Get the assessment scale score columns the sidebar can range-filter.
+
+        Returns:
+            List of SS column names
+        """
+        return [col
+                for (_, _, _, atype), cols in self.column_index.assessments.items()
+                if atype == "SS"
+                for col in cols]
+
+    def build_indexes(self, previous=None, changed=()):
+        """
+        Build the organized columns and every lookup index up front.
+
+        Args:
+            previous: Dataset with the same students this one was patched
+                from; its index entries are reused for unchanged columns
+            changed: Names of the columns whose values differ from previous
+        """
+        self.organized
+        self.column_index
+        if previous is not None:
+            with phase("bitmap index"):
+                self._bitmap_index = previous.bitmap_index.updated(
+                    self, changed, self.filterable_columns())
+            with phase("range index"):
+                self._range_index = previous.range_index.updated(
+                    self, changed, self.scale_score_columns())
+            self._value_indexes = {col: index for col, index in previous._value_indexes.items()
+                                   if col not in changed}
+        self.bitmap_index
+        self.range_index
+
+    def present_values(self, col):
+        """
+        Get the non-null values of one column with their row indices,
+        without materializing assessment columns.
+
+        Args:
+            col: Column name
+
+        Returns:
+            Polars DataFrame with ROW (UInt32) and VALUE, in row order
+        """
+        if col in self.assessments:
+            return self.assessments.values(col)
+        return present_values(self.frame, col)
+
+    def get_column(self, col):
+        """
+        Get one column aligned to the student rows.
+
+        Args:
+            col: Column name
+
+        Returns:
+            Polars Series
+        """
+        if col in self.assessments:
+            return self.assessments.column(col)
+        return self.frame.get_column(col)
+
+    def project(self, cols):
+        """
+        Materialize a wide frame with only the requested columns.
+
+        Args:
+            cols: Column names, in output order
+
+        Returns:
+            Polars DataFrame with one row per student
+        """
+        student_cols = [col for col in cols if col in self.frame.schema]
+        assessment_cols = [self.assessments.column(col)
+                           for col in cols if col in self.assessments]
+        return self.frame.select(student_cols).with_columns(assessment_cols).select(cols)
+
+    def take(self, cols, rows):
+        """
+        Materialize the requested columns for a subset of student rows.
+
+        Args:
+            cols: Column names, in output order
+            rows: Series of row indices
+
+        Returns:
+            Polars DataFrame with one row per entry in rows
+        """
+        return pl.DataFrame([self.get_column(col).gather(rows) for col in cols])
+
+    def filter_rows(self, filters, cache=filter_cache):
+        """
+        Find the student rows that pass the active filters.
+
+        Results are shared through the process-wide FilterCache. On a miss,
+        a cached result for a subset of the filters narrows the rows that
+        need checking. Groups covered by the bitmap or range index are
+        resolved with bitwise operations; only the columns of the remaining
+        groups are materialized.
+
+        Args:
+            filters: Dictionary returned by get_active_filters()
+            cache: FilterCache to use, or None to always compute
+
+        Returns:
+            UInt32 Series of matching row indices, in row order
+        """
+        predicates = canonical_filters(filters)
+        if not predicates:
+            return pl.int_range(0, self.height, dtype=pl.UInt32, eager=True).alias("ROW")
+        if cache is None:
+            return self._filter_rows(filters)
+
+        rows = cache.get(self.version, predicates)
+        if rows is not None:
+            return rows
+        superset = cache.get_superset(self.version, predicates)
+        if superset is None:
+            rows = self._filter_rows(filters)
+        else:
+            cached_predicates, cached_rows = superset
+            rows = self._filter_rows(
+                filters_from_predicates(predicates - cached_predicates), cached_rows)
+        cache.put(self.version, predicates, rows)
+        return rows
+
+    def _filter_rows(self, filters, rows=None):
+        """
+        Apply filters to all rows, or only to the given row indices.
+
+        Args:
+            filters: Dictionary returned by get_active_filters()
+            rows: Optional UInt32 Series of candidate row indices
+
+        Returns:
+            UInt32 Series of the matching row indices, in the order of rows
+        """
+        subset = rows is not None
+        if not subset:
+            rows = pl.int_range(0, self.height, dtype=pl.UInt32, eager=True).alias("ROW")
+        expression = build_filter_expression(
+            filters, self.schema, self.column_index, self.bitmap_index, self.range_index,
+            row_col="ROW" if subset else None)
+        if expression is None:
+            return rows
+
+        filter_cols = dict.fromkeys(expression.meta.root_names())
+        filter_cols.pop("ROW", None)
+        columns = [self.get_column(col) for col in filter_cols]
+        if subset:
+            columns = [column.gather(rows) for column in columns]
+        frame = pl.DataFrame([rows.alias("ROW")] + columns)
+        return frame.lazy().filter(expression).collect().get_column("ROW")
+
+    def sort_rows(self, rows, col, descending=False):
+        """
+        Order row indices by the values of one column.
+
+        Args:
+            rows: Series of row indices
+            col: Column to sort by
+            descending: Sort from largest to smallest
+
+        Returns:
+            The same row indices in sorted order (nulls last)
+        """
+        keys = self.get_column(col).gather(rows)
+        return rows.gather(keys.arg_sort(descending=descending, nulls_last=True))
+
+    def query(self, filters, select_cols):
+        """
+        Filter students and return the selected columns.
+
+        Args:
+            filters: Dictionary returned by get_active_filters()
+            select_cols: Columns to return, in display order
+
+        Returns:
+            Filtered Polars DataFrame with only select_cols
+        """
+        return self.take(select_cols, self.filter_rows(filters))
+
+    def unique_values(self, col):
+        """
+        Get the distinct non-null values of a column.
+
+        Args:
+            col: Column name
+
+        Returns:
+            List of unique values (unordered)
+        """
+        if col in self.assessments:
+            return self.assessments.unique_values(col)
+        if col not in self.frame.schema:
+            return []
+        return self.frame.get_column(col).drop_nulls().unique().to_list()
+
+    def value_index(self, col):
+        """
+        Get the sorted ValueIndex of a column, built on first use.
+
+        Args:
+            col: Column name
+
+        Returns:
+            ValueIndex over the column's distinct values
+        """
+        if col not in self._value_indexes:
+            self._value_indexes[col] = ValueIndex(self.unique_values(col))
+        return self._value_indexes[col]
@@ -0,0 +1,198 @@
+"""
+Module for the process-wide cache of filtered row sets.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+# Memory bound for cached row sets, shared by every session in the process
+FILTER_CACHE_MB = float(os.getenv("MTSS_FILTER_CACHE_MB", "64"))
+
+
+def _canonical_values(values):
+    """Selected values without the empty placeholder, as a sorted tuple of strings."""
+    return tuple(sorted({str(v) for v in values or [] if v != ""}))
+
+
+def canonical_filters(filters):
+    """
+    Reduce the output of get_active_filters() to an order-independent form.
+
+    Every active filter becomes one predicate tuple, e.g.
+    ("student_info", "School", ("A", "B")) or
+    ("assessment_ranges", name, subject, year, (low, high)). A row passes the
+    filters if it passes every predicate, so predicate sets compare like row
+    sets in reverse: a subset of predicates selects a superset of rows.
+
+    Args:
+        filters: Dictionary returned by get_active_filters()
+
+    Returns:
+        Frozenset of predicate tuples (empty if no filter is active)
+    """
+    predicates = set()
+    for col, values in filters.get("student_info", {}).items():
+        values = _canonical_values(values)
+        if values:
+            predicates.add(("student_info", col, values))
+    for name, subjects in filters.get("assessments", {}).items():
+        for subject, years in subjects.items():
+            for year, values in years.items():
+                values = _canonical_values(values)
+                if values:
+                    predicates.add(("assessments", name, subject, year, values))
+    for name, subjects in filters.get("assessment_ranges", {}).items():
+        for subject, years in subjects.items():
+            for year, (low, high) in years.items():
+                predicates.add(("assessment_ranges", name, subject, year,
+                                (float(low), float(high))))
+    for subject, periods in filters.get("grades", {}).items():
+        for period, values in periods.items():
+            values = _canonical_values(values)
+            if values:
+                predicates.add(("grades", subject, period, values))
+    return frozenset(predicates)
+
+
+def filters_from_predicates(predicates):
+    """
+    Rebuild a get_active_filters() style dictionary from predicate tuples.
+
+    Args:
+        predicates: Iterable of predicates from canonical_filters()
+
+    Returns:
+        Dictionary accepted by build_filter_expression()
+    """
+    filters = {"student_info": {}, "assessments": {},
+               "assessment_ranges": {}, "grades": {}}
+    for kind, *key, values in predicates:
+        if kind == "student_info":
+            filters[kind][key[0]] = list(values)
+        elif kind == "grades":
+            filters[kind].setdefault(key[0], {})[key[1]] = list(values)
+        else:
+            name, subject, year = key
+            filters[kind].setdefault(name, {}).setdefault(subject, {})[year] = (
+                values if kind == "assessment_ranges" else list(values))
+    return filters
+
+
+def filter_key(version, predicates):
+    """
+    Hash a dataset version and predicate set into a stable cache key.
+
+    Args:
+        version: Dataset version the rows were computed on
+        predicates: Frozenset from canonical_filters()
+
+    Returns:
+        Hex digest that is the same in every process
+    """
+    payload = repr((version, sorted(predicates)))
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class FilterCache:
+    """
+    LRU cache of filtered row indices, bounded by their memory size.
+
+    Entries are keyed by filter_key(), so sessions that land on the same
+    filter combination share one result. A request whose predicates extend
+    a cached entry's predicates can start from that entry's (smaller) row
+    set and only apply the extra predicates.
+    """
+
+    def __init__(self, max_bytes=int(FILTER_CACHE_MB * 1024 * 1024)):
+        """
+        Args:
+            max_bytes: Evict least recently used entries above this total size
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (version, predicates, rows)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, version, predicates):
+        """
+        Get the cached rows for exactly these predicates.
+
+        Args:
+            version: Dataset version
+            predicates: Frozenset from canonical_filters()
+
+        Returns:
+            Series of row indices, or None
+        """
+        key = filter_key(version, predicates)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def get_superset(self, version, predicates):
+        """
+        Find the smallest cached row set whose predicates are a strict subset.
+
+        Args:
+            version: Dataset version
+            predicates: Frozenset from canonical_filters()
+
+        Returns:
+            Tuple of (cached predicates, rows), or None
+        """
+        with self._lock:
+            best_key, best = None, None
+            for key, (entry_version, entry_predicates, rows) in self._entries.items():
+                if (entry_version == version and entry_predicates < predicates
+                        and (best is None or len(rows) < len(best[1]))):
+                    best_key, best = key, (entry_predicates, rows)
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self.partial_hits += 1
+            return best
+
+    def put(self, version, predicates, rows):
+        """
+        Store rows for a predicate set, evicting old entries to stay in bounds.
+
+        Args:
+            version: Dataset version
+            predicates: Frozenset from canonical_filters()
+            rows: Series of row indices
+        """
+        size = rows.estimated_size()
+        if size > self.max_bytes:
+            return
+        key = filter_key(version, predicates)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2].estimated_size()
+            self._entries[key] = (version, predicates, rows)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted.estimated_size()
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# Shared by every session in the process
+filter_cache = FilterCache()
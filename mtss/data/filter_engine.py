@@ -0,0 +1,218 @@
+"""
+Module for compiling sidebar filters into a single lazy Polars query.
+"""
+import numpy as np
+import polars as pl
+
+
+def _valid_values(values):
+    """Drop the empty placeholder that selectize inputs can send."""
+    return [v for v in values if v != ""] if values else []
+
+
+def _parse_datetime(value, dtype):
+    """Parse a datetime in any format Polars can infer (e.g. str() of a datetime), or None."""
+    try:
+        return pl.Series([value], dtype=pl.String).str.to_datetime(
+            time_unit=dtype.time_unit, time_zone=dtype.time_zone, strict=False).item()
+    except pl.exceptions.ComputeError:
+        return None
+
+
+def _coerce_values(values, dtype):
+    """
+    Convert selectize string values to the dtype of the column they filter.
+
+    Strings are cast the way Polars casts a String column, leniently: values
+    that do not parse as the dtype are dropped. Booleans accept "true" and
+    "false" in any case, and datetimes any format Polars can infer.
+
+    Args:
+        values: List of values from the UI
+        dtype: Polars dtype of the target column
+
+    Returns:
+        List of values comparable with the column
+    """
+    if dtype == pl.String or dtype == pl.Categorical or dtype == pl.Enum:
+        return list(values)
+
+    strings = [str(val) for val in values]
+    if dtype == pl.Boolean:
+        booleans = {"true": True, "false": False}
+        typed_values = [booleans.get(val.strip().lower()) for val in strings]
+    elif dtype == pl.Datetime:
+        typed_values = [_parse_datetime(val, dtype) for val in strings]
+    else:
+        typed_values = pl.Series(strings, dtype=pl.String).cast(dtype, strict=False).to_list()
+    return [val for val in typed_values if val is not None]
+
+
+def _any_column_in(terms):
+    """Build `col1.is_in(values1) | col2.is_in(values2) | ...`."""
+    condition = None
+    for col, values in terms:
+        col_condition = pl.col(col).is_in(values).fill_null(False)
+        condition = col_condition if condition is None else condition | col_condition
+    return condition
+
+
+def _any_column_between(terms):
+    """Build `col1.is_between(low1, high1) | ...` over numeric casts of the columns."""
+    condition = None
+    for col, (low, high) in terms:
+        col_condition = (pl.col(col).cast(pl.Float64, strict=False)
+                         .is_between(low, high).fill_null(False))
+        condition = col_condition if condition is None else condition | col_condition
+    return condition
+
+
+def filter_groups(filters, schema, column_index):
+    """
+    Expand the output of get_active_filters() into filter groups.
+
+    A row passes a group if any of the group's columns holds any of the
+    selected values; a row is kept only if it passes every group.
+
+    Args:
+        filters: Dictionary with "student_info", "assessments" and "grades" filters
+        schema: Polars schema (column name -> dtype) of the frame being filtered
+        column_index: ColumnIndex mapping filter keys to their columns
+
+    Returns:
+        List of groups, each a list of (column, typed values) pairs
+    """
+    groups = []
+
+    def add_group(columns, values):
+        terms = [(col, _coerce_values(values, schema[col]))
+                 for col in columns if col in schema]
+        if terms:
+            groups.append(terms)
+
+    for col, values in filters.get("student_info", {}).items():
+        valid_values = _valid_values(values)
+        if valid_values:
+            add_group([col], valid_values)
+
+    for name, subjects in filters.get("assessments", {}).items():
+        for subject, years in subjects.items():
+            for year, values in years.items():
+                valid_values = _valid_values(values)
+                if valid_values:
+                    add_group(column_index.assessment_columns(
+                        name, subject, year), valid_values)
+
+    for subject, periods in filters.get("grades", {}).items():
+        for period, values in periods.items():
+            valid_values = _valid_values(values)
+            if valid_values:
+                add_group(column_index.grade_columns(
+                    subject, period), valid_values)
+
+    return groups
+
+
+def range_groups(filters, schema, column_index):
+    """
+    Expand the "assessment_ranges" filters of get_active_filters() into groups.
+
+    A row passes a group if any of the group's scale score columns holds a
+    value within the range.
+
+    Args:
+        filters: Dictionary returned by get_active_filters()
+        schema: Polars schema (column name -> dtype) of the frame being filtered
+        column_index: ColumnIndex mapping filter keys to their columns
+
+    Returns:
+        List of groups, each a list of (column, (low, high)) pairs
+    """
+    groups = []
+    for name, subjects in filters.get("assessment_ranges", {}).items():
+        for subject, years in subjects.items():
+            for year, (low, high) in years.items():
+                terms = [(col, (low, high))
+                         for col in column_index.assessment_columns(name, subject, year, "SS")
+                         if col in schema]
+                if terms:
+                    groups.append(terms)
+    return groups
+
+
+def build_filter_expression(filters, schema, column_index, bitmap_index=None,
+                            range_index=None, row_col=None):
+    """
+    Compile the output of get_active_filters() into one boolean expression.
+
+    Each filter group becomes an `is_in` (or, for ranges, `is_between`) test,
+    OR-ed across the columns it matches; the groups are then AND-ed together.
+    Groups whose columns are all covered by the bitmap or range index are
+    resolved with bitwise operations and enter the expression as a single
+    precomputed row mask.
+
+    Args:
+        filters: Dictionary with "student_info", "assessments", "assessment_ranges"
+            and "grades" filters
+        schema: Polars schema (column name -> dtype) of the frame being filtered
+        column_index: ColumnIndex mapping filter keys to their columns
+        bitmap_index: Optional BitmapIndex over the same frame
+        range_index: Optional RangeIndex over the same frame
+        row_col: Column holding each row's index in the indexed frame, for
+            filtering a subset of its rows; None if the frame is the whole one
+
+    Returns:
+        Polars expression, or None if no filter is active
+    """
+    conditions = []
+    bitmap = None
+
+    lookups = [(terms, bitmap_index, _any_column_in)
+               for terms in filter_groups(filters, schema, column_index)]
+    lookups += [(terms, range_index, _any_column_between)
+                for terms in range_groups(filters, schema, column_index)]
+
+    for terms, index, fallback in lookups:
+        group_bitmap = index.lookup(terms) if index is not None else None
+        if group_bitmap is None:
+            conditions.append(fallback(terms))
+        elif bitmap is None:
+            bitmap = group_bitmap
+        else:
+            bitmap &= group_bitmap
+
+    if bitmap is not None:
+        height = bitmap_index.height if bitmap_index is not None else range_index.height
+        mask = np.unpackbits(bitmap, count=height).astype(bool)
+        mask = pl.lit(pl.Series(mask))
+        if row_col is not None:
+            mask = mask.gather(pl.col(row_col))
+        conditions.insert(0, mask)
+    if not conditions:
+        return None
+    return pl.all_horizontal(conditions)
+
+
+def apply_filters(frame, filters, select_cols, column_index, bitmap_index=None):
+    """
+    Filter a frame and project it to the selected columns in a single pass.
+
+    The query is built lazily so Polars only touches the filtered and
+    selected columns and never copies the full table.
+
+    Args:
+        frame: Polars DataFrame to filter
+        filters: Dictionary returned by get_active_filters()
+        select_cols: Columns to return, in display order
+        column_index: ColumnIndex mapping filter keys to their columns
+        bitmap_index: Optional BitmapIndex over the same frame
+
+    Returns:
+        Filtered Polars DataFrame with only select_cols
+    """
+    query = frame.lazy()
+    expression = build_filter_expression(
+        filters, frame.schema, column_index, bitmap_index)
+    if expression is not None:
+        query = query.filter(expression)
+    return query.select(select_cols).collect()
@@ -0,0 +1,80 @@
+"""
+Loader process that builds the dataset once for every app worker.
+
+Run it next to the app workers, which are started with
+MTSS_DATASET_MODE=shared and the same MTSS_SNAPSHOT_DIR. The loader is the
+only process that queries the database; workers memory-map the snapshot it
+publishes, so their pages are shared through the OS page cache.
+
+Usage:
+    DB_URL=... python -m mtss.data.loader [--interval 600] [--dir .snapshots]
+"""
+import argparse
+import logging
+import time
+
+from baseData import get_student_data_with_watermark
+
+from .long_assessments import LongAssessments
+from .snapshot import (
+    SNAPSHOT_DIR,
+    publish_snapshot,
+    published_snapshot,
+    snapshot_expired,
+    source_fingerprint,
+)
+from .store import REFRESH_INTERVAL_SECS
+
+logger = logging.getLogger(__name__)
+
+
+def publish_dataset(directory=SNAPSHOT_DIR):
+    """
+    Build and publish a snapshot if the source tables changed, or if the
+    published one is older than SNAPSHOT_MAX_AGE.
+
+    The assessments are stored in the LongAssessments layout so workers can
+    use the mapped file without joining or sorting it.
+
+    Args:
+        directory: Snapshot directory shared with the workers
+
+    Returns:
+        True if a new snapshot was published, False if it was up to date
+    """
+    key, _ = source_fingerprint()
+    published = published_snapshot(directory)
+    if published is not None and published[0] == key \
+            and not snapshot_expired(key, directory):
+        return False
+
+    students, assessments, catalog, watermark = get_student_data_with_watermark()
+    aligned = LongAssessments(assessments, students.get_column("SSID")).aligned_frame()
+    publish_snapshot(students, aligned, catalog, key, watermark, directory)
+    logger.info("Published snapshot %s (%d students, %d results)",
+                key, students.height, aligned.height)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--interval", type=float, default=REFRESH_INTERVAL_SECS,
+                        help="Seconds between source checks; 0 publishes once and exits")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Snapshot directory")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    while True:
+        try:
+            publish_dataset(args.dir)
+        except Exception:
+            if args.interval <= 0:
+                raise
+            logger.exception("Publishing failed; keeping the current snapshot")
+        if args.interval <= 0:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Module for storing assessment results in long format and projecting them wide.
+"""
+import numpy as np
+import polars as pl
+
+from mtss.startup import phase
+
+# Value fields of the long format, in storage order: performance levels
+# (categorical codes) then scale scores (integers)
+FIELDS = ("PL", "SS")
+
+
+class LongAssessments:
+    """
+    Latest assessment values stored as (student row, value) pairs per column.
+
+    Rows are sorted by column name, so every wide column is a contiguous,
+    zero-copy slice and the column name itself is stored once. Only values
+    that exist are stored, which makes memory scale with the number of
+    results rather than students x columns, and a wide column is only
+    materialized when something asks for it.
+
+    Each field is stored in its own frame with its own compact dtype, so a
+    performance level costs a categorical code and a scale score an integer,
+    with no null placeholder for the other field.
+
+    A refresh that changes a few students goes through patch(), which
+    rebuilds only the columns those students appear in.
+    """
+
+    @phase("align assessments")
+    def __init__(self, long_frame, ssids):
+        """
+        Args:
+            long_frame: Frame with SSID, COLUMN, PL and SS from long_assessments(),
+                or with COLUMN, ROW, PL and SS from aligned_frame(), which is
+                used as is (no copy)
+            ssids: Series of student SSIDs in dataset row order
+        """
+        self.ssids = ssids
+        self.height = len(ssids)
+        if "ROW" in long_frame.columns:
+            # PL rows come first, and they are the rows without a scale score
+            labels = long_frame.get_column("SS").null_count()
+            parts = {"PL": long_frame.slice(0, labels),
+                     "SS": long_frame.slice(labels)}
+        else:
+            parts = self._align(long_frame)
+
+        # field -> empty frame with ROW and VALUE, for the field's dtype
+        self._empty = {}
+        # COLUMN -> (field, frame with ROW and VALUE); frames are zero-copy
+        # slices, so columns can be replaced one at a time (see patch())
+        self._values = {}
+        for field, part in parts.items():
+            self._empty[field] = part.select("ROW", pl.col(field).alias("VALUE")).clear()
+            self._values.update(_split_columns(field, part))
+
+    def _align(self, long_frame):
+        """Join long_assessments() rows to student rows; one part per field, sorted by column and row."""
+        rows = pl.DataFrame({"SSID": self.ssids}).with_row_index("ROW")
+        joined = long_frame.join(rows, on="SSID", how="inner")
+        return {field: joined.filter(pl.col(field).is_not_null()).sort(["COLUMN", "ROW"])
+                for field in FIELDS}
+
+    @phase("patch assessments")
+    def patch(self, ssids, long_frame):
+        """
+        Replace the results of some students.
+
+        Only the columns those students had or now have results in are
+        rebuilt. Every other column keeps its stored slice, and the cost
+        follows the changed students, not the size of the data.
+
+        Args:
+            ssids: Series of the SSIDs whose results are replaced
+            long_frame: All of their results from long_assessments(), or
+                None if they have none
+
+        Returns:
+            Tuple of (new LongAssessments, set of the column names whose
+            values changed, appeared or disappeared)
+        """
+        rows = pl.DataFrame({"SSID": self.ssids}).with_row_index("ROW").filter(
+            pl.col("SSID").is_in(ssids.implode())).get_column("ROW")
+        changed = {}
+        if long_frame is not None:
+            for field, part in self._align(long_frame).items():
+                changed.update(_split_columns(field, part))
+
+        # Columns that held a result of a changed student, found with a binary
+        # search of each column's sorted rows
+        searched = rows.sort().to_numpy()
+        touched = set(changed)
+        for col, (_, values) in self._values.items():
+            col_rows = values.get_column("ROW").to_numpy()
+            found = np.searchsorted(col_rows, searched).clip(max=max(len(col_rows) - 1, 0))
+            if len(col_rows) and np.any(col_rows[found] == searched):
+                touched.add(col)
+
+        patched = LongAssessments.__new__(LongAssessments)
+        patched.ssids, patched.height = self.ssids, self.height
+        patched._empty = self._empty
+        patched._values = dict(self._values)
+        for col in touched:
+            field, values = self._values.get(col) or changed[col]
+            parts = [values.filter(~pl.col("ROW").is_in(rows.implode()))]
+            if col in changed:
+                parts.append(changed[col][1])
+            values = pl.concat(parts).sort("ROW")
+            if values.height:
+                patched._values[col] = (field, values)
+            else:
+                del patched._values[col]
+        return patched, touched
+
+    def __contains__(self, col):
+        return col in self._values
+
+    @property
+    def columns(self):
+        """Wide column names, sorted."""
+        return sorted(self._values)
+
+    @property
+    def schema(self):
+        """Wide column name -> dtype of its materialized column, in column order."""
+        return {col: self._values[col][1].schema["VALUE"] for col in self.columns}
+
+    def estimated_size(self, unit="b"):
+        """Memory held by the stored values and row indices."""
+        return sum(values.estimated_size(unit) for _, values in self._values.values())
+
+    def _column_names(self, cols):
+        """COLUMN value of every row stored for some columns, in their order."""
+        return pl.DataFrame({
+            "COLUMN": cols,
+            "LENGTH": [self._values[col][1].height for col in cols],
+        }, schema={"COLUMN": pl.String, "LENGTH": pl.UInt32}).select(
+            pl.col("COLUMN").repeat_by("LENGTH").explode()
+        ).get_column("COLUMN")
+
+    def _field_frames(self, key):
+        """One frame per field with COLUMN, key (ROW or SSID), PL and SS."""
+        frames = []
+        for field in FIELDS:
+            cols = [col for col in self.columns if self._values[col][0] == field]
+            frame = pl.concat([self._empty[field]] + [self._values[col][1] for col in cols],
+                              rechunk=False)
+            rows = frame.get_column("ROW")
+            other = next(f for f in FIELDS if f != field)
+            frames.append(pl.DataFrame([
+                self._column_names(cols),
+                rows if key == "ROW" else self.ssids.gather(rows).alias("SSID"),
+            ]).with_columns(
+                frame.get_column("VALUE").alias(field),
+                pl.lit(None, dtype=self._empty[other].schema["VALUE"]).alias(other),
+            ).select("COLUMN", key, *FIELDS))
+        return frames
+
+    def long_frame(self):
+        """Rebuild the stored rows as SSID, COLUMN, PL, SS (the long_assessments() shape)."""
+        return pl.concat(self._field_frames("SSID")).select("SSID", "COLUMN", *FIELDS)
+
+    def aligned_frame(self):
+        """
+        Get the stored rows as COLUMN, ROW, PL, SS: PL rows then SS rows, each
+        sorted by column and row.
+
+        This is the layout LongAssessments keeps internally; passing it back
+        to the constructor with the same SSIDs skips the join and sort.
+        """
+        return pl.concat(self._field_frames("ROW"))
+
+    def values(self, col):
+        """
+        Get the stored values of one wide column.
+
+        Args:
+            col: Wide column name
+
+        Returns:
+            Polars DataFrame with ROW and VALUE (a slice, not a copy)
+        """
+        return self._values[col][1]
+
+    def column(self, col):
+        """
+        Materialize one wide column aligned to the dataset rows.
+
+        Args:
+            col: Wide column name
+
+        Returns:
+            Polars Series named col (categorical PL or integer SS), null
+            where a student has no result
+        """
+        values = self.values(col)
+        # Point every student row at its position in the slice and gather, which
+        # (unlike scatter) keeps categorical values intact
+        positions = pl.repeat(None, self.height, dtype=pl.UInt32, eager=True).scatter(
+            values.get_column("ROW"),
+            pl.int_range(0, values.height, dtype=pl.UInt32, eager=True))
+        return values.get_column("VALUE").gather(positions).alias(col)
+
+    def unique_values(self, col):
+        """Distinct non-null values of one wide column."""
+        return self.values(col).get_column("VALUE").drop_nulls().unique().to_list()
+
+
+def _split_columns(field, part):
+    """
+    Split one field's rows, sorted by column, into per-column slices.
+
+    Args:
+        field: "PL" or "SS"
+        part: Frame with COLUMN, ROW and the field, sorted by COLUMN
+
+    Returns:
+        Dictionary of COLUMN -> (field, zero-copy frame with ROW and VALUE)
+    """
+    frame = part.select("ROW", pl.col(field).alias("VALUE"))
+    counts = part.group_by("COLUMN", maintain_order=True).len()
+    offsets = counts.get_column("len").cum_sum() - counts.get_column("len")
+    return {col: (field, frame.slice(offset, length))
+            for col, offset, length in zip(counts.get_column("COLUMN").to_list(),
+                                           offsets.to_list(),
+                                           counts.get_column("len").to_list())}
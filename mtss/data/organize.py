@@ -0,0 +1,52 @@
+"""
+Module for organizing data columns into logical categories and structures.
+"""
+
+
+def organize_columns(columns, catalog):
+    """
+    Organize columns into categories: Assessments, Grades, and Student Info.
+
+    Args:
+        columns: List of column names from the dataframe
+        catalog: Column catalog frame (baseData.CATALOG_SCHEMA) describing the
+            assessment and grade columns; columns without an entry are
+            Student Info
+
+    Returns:
+        Dictionary with organized structure of columns
+    """
+    organized = {
+        "Assessments": {},
+        "Grades": {},
+        "Student Info": []
+    }
+    entries = {entry["COLUMN"]: entry for entry in catalog.iter_rows(named=True)}
+
+    for col in columns:
+        entry = entries.get(col)
+        if entry is None:
+            organized["Student Info"].append(col)
+        elif entry["CATEGORY"] == "Grades":
+            periods = organized["Grades"].setdefault(entry["SUBJECT"], {})
+            periods.setdefault(entry["PERIOD"], []).append(col)
+        else:
+            # name -> subject -> year -> testing period (the period name, else
+            # the test date; "" if undated) -> PL/SS
+            years = organized["Assessments"].setdefault(
+                entry["TEST_NAME"], {}).setdefault(entry["SUBJECT"], {})
+            testing_periods = years.setdefault(entry["SCHOOL_YEAR"], {})
+            assessment_types = testing_periods.setdefault(
+                entry["PERIOD"] or entry["TEST_DATE"], {})
+            assessment_types.setdefault(entry["TYPE"], []).append(col)
+
+    # Testing periods in date order rather than name order (a period
+    # column's TEST_DATE is the latest date in it)
+    for subjects in organized["Assessments"].values():
+        for years in subjects.values():
+            for year, testing_periods in years.items():
+                years[year] = dict(sorted(
+                    testing_periods.items(),
+                    key=lambda item: max(entries[col]["TEST_DATE"]
+                                         for cols in item[1].values() for col in cols)))
+    return organized
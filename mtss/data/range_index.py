@@ -0,0 +1,137 @@
+"""
+Module for the sorted (argsort) index used by numeric range filters.
+"""
+import math
+
+import numpy as np
+import polars as pl
+
+from .bitmap_index import present_values, row_dtype
+
+
+class RangeIndex:
+    """
+    Rows of each numeric column ordered by value.
+
+    A range filter then resolves with two binary searches that bound a
+    contiguous run of row indices, instead of parsing and comparing every
+    value. Results come back as packed bitmaps so they combine with
+    BitmapIndex lookups.
+    """
+
+    def __init__(self, frame, columns):
+        """
+        Args:
+            frame: Polars DataFrame or Dataset to index
+            columns: Column names to index; values that do not parse as
+                numbers are left out
+        """
+        self.height = frame.height
+        self.sorted = {}
+
+        for col in columns:
+            if col not in frame.schema:
+                continue
+            present = present_values(frame, col)
+            values = present.get_column("VALUE")
+            if not values.dtype.is_numeric():
+                values = values.cast(pl.Float64, strict=False)
+            order = values.arg_sort(nulls_last=True).head(values.len() - values.null_count())
+            values = values.gather(order)
+            # Integers keep the smallest dtype that holds them (scale scores
+            # fit in 16 bits) and rows the smallest that holds a row index
+            if values.dtype.is_integer():
+                values = values.shrink_dtype()
+            self.sorted[col] = (
+                values.to_numpy(),
+                present.get_column("ROW").gather(order).to_numpy().astype(row_dtype(self.height)),
+            )
+
+    def updated(self, frame, changed, columns):
+        """
+        Copy the index with only some columns rebuilt.
+
+        Args:
+            frame: Polars DataFrame or Dataset with the same rows
+            changed: Names of the columns whose values changed
+            columns: Candidate column names, as given to the constructor
+
+        Returns:
+            New RangeIndex sharing the entries of every unchanged column
+        """
+        index = RangeIndex(frame, [col for col in columns if col in changed])
+        index.sorted = {**{col: entry for col, entry in self.sorted.items()
+                           if col not in changed}, **index.sorted}
+        return index
+
+    def __contains__(self, col):
+        return col in self.sorted
+
+    @property
+    def nbytes(self):
+        """Total memory held by the sorted values and row indices, in bytes."""
+        return sum(values.nbytes + rows.nbytes for values, rows in self.sorted.values())
+
+    def bounds(self, columns):
+        """
+        Get the smallest and largest value across some indexed columns.
+
+        Args:
+            columns: Column names; columns that are not indexed are ignored
+
+        Returns:
+            Tuple of (min, max), or None if no column has values
+        """
+        lows, highs = [], []
+        for col in columns:
+            if col in self.sorted and len(self.sorted[col][0]):
+                values = self.sorted[col][0]
+                lows.append(values[0])
+                highs.append(values[-1])
+        if not lows:
+            return None
+        return float(min(lows)), float(max(highs))
+
+    def rows_between(self, col, low, high):
+        """
+        Get the rows whose value in col is within [low, high].
+
+        Args:
+            col: Indexed column name
+            low: Lower bound (inclusive)
+            high: Upper bound (inclusive)
+
+        Returns:
+            Numpy array of row indices, ordered by value
+        """
+        values, rows = self.sorted[col]
+        if np.issubdtype(values.dtype, np.integer):
+            # Search with bounds of the values' own type, so numpy does not
+            # convert the whole column to float on every search
+            info = np.iinfo(values.dtype)
+            low, high = max(low, info.min), min(high, info.max)
+            if low > high or math.ceil(low) > math.floor(high):
+                return rows[:0]
+            low, high = values.dtype.type(math.ceil(low)), values.dtype.type(math.floor(high))
+        start = np.searchsorted(values, low, side="left")
+        end = np.searchsorted(values, high, side="right")
+        return rows[start:end]
+
+    def lookup(self, terms):
+        """
+        OR together the rows in range for a filter group.
+
+        Args:
+            terms: List of (column, (low, high)) pairs; a row matches if any
+                column holds a value in its range
+
+        Returns:
+            Packed bitmap (numpy uint8 array), or None if a column is not indexed
+        """
+        if any(col not in self.sorted for col, _ in terms):
+            return None
+
+        mask = np.zeros(self.height, dtype=bool)
+        for col, (low, high) in terms:
+            mask[self.rows_between(col, low, high)] = True
+        return np.packbits(mask)
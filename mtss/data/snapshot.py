@@ -0,0 +1,344 @@
+"""
+Module for caching the loaded student data as on-disk Arrow IPC snapshots.
+"""
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import time
+
+import polars as pl
+
+from mtss.startup import phase
+
+from baseData import (
+    ASSESSMENT_COLUMNS,
+    ASSESSMENT_WATERMARK,
+    DATE_COLUMN_TESTS,
+    get_assessments_incremental,
+    get_student_data_with_watermark,
+    get_students,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape of the stored frames changes so old snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 4
+
+# Directory for snapshot files; set MTSS_SNAPSHOT_DIR="" to disable snapshots
+SNAPSHOT_DIR = os.getenv(
+    "MTSS_SNAPSHOT_DIR",
+    str(pathlib.Path(__file__).resolve().parents[2] / ".snapshots"))
+
+# Number of snapshots kept on disk (the newest ones)
+SNAPSHOT_KEEP = 2
+
+# Seconds after which a snapshot is rebuilt even if the fingerprint still
+# matches, bounding how long in-place updates stay unseen; 0 never expires
+SNAPSHOT_MAX_AGE = float(os.getenv("MTSS_SNAPSHOT_MAX_AGE", "86400"))
+
+# Frames stored in each snapshot; "students" is renamed into place last
+SNAPSHOT_PARTS = ("assessments", "catalog", "students")
+
+# "local": every process loads from its own snapshot or the database.
+# "shared": a loader process (python -m mtss.data.loader) publishes snapshots
+# and app processes only map the published one, never querying the database.
+DATASET_MODE = os.getenv("MTSS_DATASET_MODE", "local")
+
+# How long a shared-mode process waits for the loader's first snapshot
+SHARED_WAIT_SECS = float(os.getenv("MTSS_SHARED_WAIT_SECS", "300"))
+
+# Pointer to the published snapshot, inside the snapshot directory
+PUBLISHED_FILE = "CURRENT.json"
+
+# Row counts and latest values only: inserted and deleted rows, a new school
+# year or test date, and a new watermark change the key, but updates to
+# existing rows do not (SNAPSHOT_MAX_AGE covers those)
+FINGERPRINT_QUERY = '''select
+    (select count(*) from mtss_base) as base_rows,
+    (select count(*) from mtss_assessments) as assessment_rows,
+    (select max("SCHOOL_YEAR") from mtss_assessments) as latest_school_year,
+    (select max("TEST_DATE") from mtss_assessments) as latest_test_date,
+    (select count(*) from mtss_elgrades) as elgrade_rows,
+    (select count(*) from mtss_segrades) as segrade_rows'''
+if ASSESSMENT_WATERMARK:
+    FINGERPRINT_QUERY += f''',
+    (select max("{ASSESSMENT_WATERMARK}") from mtss_assessments) as watermark'''
+
+
+@phase("fingerprint query")
+def source_fingerprint():
+    """
+    Hash the source row counts and latest dates, and the assessment column
+    settings, into a snapshot key.
+
+    Rows updated in place leave the key unchanged; such snapshots are only
+    replaced once older than SNAPSHOT_MAX_AGE.
+
+    Returns:
+        Tuple of (hex key that changes whenever the source tables change,
+        current assessment watermark or None)
+    """
+    stats = pl.read_database_uri(
+        query=FINGERPRINT_QUERY, uri=os.getenv("DB_URL")).row(0, named=True)
+    payload = json.dumps(
+        {"format": SNAPSHOT_FORMAT_VERSION, "columns": ASSESSMENT_COLUMNS,
+         "date_tests": sorted(DATE_COLUMN_TESTS), **stats},
+        sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16], stats.get("watermark")
+
+
+def snapshot_path(key, part, directory=SNAPSHOT_DIR):
+    """Path of one frame of the snapshot for a fingerprint key."""
+    return pathlib.Path(directory) / f"mtss_v{SNAPSHOT_FORMAT_VERSION}_{key}.{part}.arrow"
+
+
+def snapshot_expired(key, directory=SNAPSHOT_DIR, max_age=SNAPSHOT_MAX_AGE):
+    """
+    Whether the snapshot for a key is older than max_age seconds.
+
+    Args:
+        key: Fingerprint from source_fingerprint()
+        directory: Snapshot directory
+        max_age: Maximum age in seconds; 0 never expires
+
+    Returns:
+        True if the snapshot exists and is too old
+    """
+    if max_age <= 0:
+        return False
+    try:
+        written = snapshot_path(key, "students", directory).stat().st_mtime
+    except OSError:
+        return False
+    return time.time() - written > max_age
+
+
+@phase("read snapshot")
+def read_snapshot(key, directory=SNAPSHOT_DIR):
+    """
+    Memory-map the snapshot for a key, if one exists.
+
+    Args:
+        key: Fingerprint from source_fingerprint()
+        directory: Snapshot directory
+
+    Returns:
+        Tuple of (students frame, long assessments frame, column catalog)
+        backed by the mapped files, or None
+    """
+    paths = [snapshot_path(key, part, directory) for part in SNAPSHOT_PARTS]
+    if not all(path.exists() for path in paths):
+        return None
+    assessments, catalog, students = (pl.read_ipc(path, memory_map=True) for path in paths)
+    return students, assessments, catalog
+
+
+@phase("write snapshot")
+def write_snapshot(students, assessments, catalog, key, directory=SNAPSHOT_DIR):
+    """
+    Write the frames as uncompressed Arrow IPC files and prune old snapshots.
+
+    Each file is written under a temporary name and renamed into place, so a
+    reader never maps a partially written snapshot.
+
+    Args:
+        students: Students frame (base info and grades)
+        assessments: Long assessments frame
+        catalog: Column catalog of the assessment and grade columns
+        key: Fingerprint from source_fingerprint()
+        directory: Snapshot directory
+    """
+    frames = {"students": students, "assessments": assessments, "catalog": catalog}
+    pathlib.Path(directory).mkdir(parents=True, exist_ok=True)
+    for part in SNAPSHOT_PARTS:
+        path = snapshot_path(key, part, directory)
+        tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+        frames[part].write_ipc(tmp_path, compression="uncompressed")
+        os.replace(tmp_path, path)
+
+    snapshots = sorted(pathlib.Path(directory).glob("mtss_v*.students.arrow"),
+                       key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in snapshots[SNAPSHOT_KEEP:]:
+        old_key = old.name[:-len(".students.arrow")]
+        for part in SNAPSHOT_PARTS:
+            old.with_name(f"{old_key}.{part}.arrow").unlink(missing_ok=True)
+
+
+def publish_snapshot(students, assessments, catalog, key, watermark=None,
+                     directory=SNAPSHOT_DIR):
+    """
+    Write a snapshot and point PUBLISHED_FILE at it for shared-mode readers.
+
+    Args:
+        students: Students frame (base info and grades)
+        assessments: Assessments frame, preferably LongAssessments.aligned_frame()
+            so readers can map it without re-sorting
+        catalog: Column catalog of the assessment and grade columns
+        key: Fingerprint from source_fingerprint()
+        watermark: Assessment watermark of the data, if any
+        directory: Snapshot directory
+    """
+    write_snapshot(students, assessments, catalog, key, directory)
+    path = pathlib.Path(directory) / PUBLISHED_FILE
+    tmp_path = path.with_suffix(f".tmp{os.getpid()}")
+    tmp_path.write_text(json.dumps({"key": key, "watermark": watermark}, default=str))
+    os.replace(tmp_path, path)
+
+
+def published_snapshot(directory=SNAPSHOT_DIR):
+    """
+    Get the key and watermark of the published snapshot.
+
+    Args:
+        directory: Snapshot directory
+
+    Returns:
+        Tuple of (key, watermark), or None if nothing has been published
+    """
+    try:
+        published = json.loads((pathlib.Path(directory) / PUBLISHED_FILE).read_text())
+    except (OSError, ValueError):
+        return None
+    return published["key"], published.get("watermark")
+
+
+def read_published(directory=SNAPSHOT_DIR, wait_secs=SHARED_WAIT_SECS):
+    """
+    Memory-map the published snapshot, waiting for the loader if needed.
+
+    Args:
+        directory: Snapshot directory
+        wait_secs: Give up after this many seconds without a snapshot
+
+    Returns:
+        Tuple of (students frame, assessments frame, column catalog,
+        assessment watermark)
+
+    Raises:
+        RuntimeError: If no snapshot was published in time
+    """
+    deadline = time.monotonic() + wait_secs
+    while True:
+        published = published_snapshot(directory)
+        if published is not None:
+            key, watermark = published
+            frames = read_snapshot(key, directory)
+            if frames is not None:
+                logger.info("Mapped published snapshot %s", key)
+                return (*frames, watermark)
+        if time.monotonic() >= deadline:
+            raise RuntimeError(
+                f"No published snapshot in {directory}; is the loader running?")
+        time.sleep(1)
+
+
+def _try_fingerprint():
+    """source_fingerprint(), or (None, None) if the query fails."""
+    try:
+        return source_fingerprint()
+    except Exception:
+        logger.exception("Could not fingerprint source tables; skipping snapshot")
+        return None, None
+
+
+def _try_write_snapshot(students, assessments, catalog, key, directory):
+    """write_snapshot(), logging instead of raising on I/O errors."""
+    try:
+        write_snapshot(students, assessments, catalog, key, directory)
+    except OSError:
+        logger.exception("Could not write snapshot %s", key)
+
+
+def source_key(directory=SNAPSHOT_DIR):
+    """
+    Get the key of the data a load would get now, without loading it.
+
+    Args:
+        directory: Snapshot directory
+
+    Returns:
+        The published snapshot key in shared mode, the source fingerprint
+        otherwise, or None if it cannot be determined
+    """
+    if DATASET_MODE == "shared":
+        published = published_snapshot(directory)
+        return None if published is None else published[0]
+    return _try_fingerprint()[0]
+
+
+def load_student_data(directory=SNAPSHOT_DIR, rebuild=False):
+    """
+    Get the student data from a fresh snapshot, or build it and snapshot it.
+
+    Args:
+        directory: Snapshot directory; falsy to always build from the database
+        rebuild: Build from the database even if there is a snapshot for the
+            current fingerprint, and replace it (for changes the fingerprint
+            does not see, such as updated student rows)
+
+    In shared mode the published snapshot is mapped instead and the
+    database is never queried.
+
+    Returns:
+        Tuple of (students frame, long assessments frame, column catalog,
+        assessment watermark or None)
+    """
+    if DATASET_MODE == "shared":
+        return read_published(directory)
+    if not directory:
+        return get_student_data_with_watermark()
+
+    key, watermark = _try_fingerprint()
+    if key is None:
+        return get_student_data_with_watermark()
+
+    if snapshot_expired(key, directory):
+        logger.info("Snapshot %s is older than %ss; rebuilding", key, SNAPSHOT_MAX_AGE)
+        rebuild = True
+    frames = None if rebuild else read_snapshot(key, directory)
+    if frames is not None:
+        logger.info("Loaded snapshot %s", key)
+        return (*frames, watermark)
+
+    students, assessments, catalog, watermark = get_student_data_with_watermark()
+    _try_write_snapshot(students, assessments, catalog, key, directory)
+    return students, assessments, catalog, watermark
+
+
+def load_assessments_incremental(students, assessments, catalog, watermark,
+                                 directory=SNAPSHOT_DIR):
+    """
+    Patch long assessments with rows loaded since the watermark.
+
+    Only assessments are patched, so the base and grade rows are queried
+    again first: if they differ from `students` in any way (new students,
+    updated info or grades) nothing is patched or written, and the caller
+    has to load everything again.
+
+    The fingerprint is taken before querying, so rows that land during the
+    refresh make the written snapshot look stale rather than complete.
+
+    Args:
+        students: Current students frame, stored alongside in the snapshot
+        assessments: LongAssessments to update
+        catalog: Column catalog to extend with new assessment columns
+        watermark: Watermark those assessments were built at
+        directory: Snapshot directory; falsy to skip writing a snapshot
+
+    Returns:
+        Tuple of (patched LongAssessments, set of the columns whose values
+        changed, updated catalog, new watermark), or None if the student
+        rows changed
+    """
+    key = _try_fingerprint()[0] if directory else None
+    current, _ = get_students()
+    if not current.equals(students):
+        logger.info("Student rows changed; an incremental refresh is not enough")
+        return None
+    ssids, changed, catalog, watermark = get_assessments_incremental(catalog, watermark)
+    assessments, columns = assessments.patch(ssids, changed)
+    if key is not None:
+        _try_write_snapshot(students, assessments.aligned_frame(), catalog, key, directory)
+    return assessments, columns, catalog, watermark
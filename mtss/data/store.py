@@ -0,0 +1,170 @@
+"""
+Module for holding the live Dataset and refreshing it in the background.
+"""
+import logging
+import os
+import threading
+import time
+
+from .dataset import Dataset
+from .snapshot import SNAPSHOT_MAX_AGE, source_key
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetStore:
+    """
+    Holder of the live Dataset with background rebuild and atomic swap.
+
+    A refresh builds a complete new Dataset (query, pivot and indexes) on a
+    worker thread while the current one keeps serving requests. The new
+    Dataset replaces the old one with a single reference assignment, so
+    readers always see either the old or the new dataset, never a partial one.
+
+    A refresh is skipped while the source key (fingerprint, or published
+    snapshot in shared mode) is the one the live Dataset was loaded at,
+    unless that Dataset is older than the snapshot max age.
+
+    Only the data is swapped: the sidebar's column tree and widget IDs are
+    built once at import, so columns that first appear in a refresh can be
+    filtered and shown through existing widgets only after a restart.
+    """
+
+    def __init__(self, loader=Dataset.load, key=source_key, max_age=SNAPSHOT_MAX_AGE):
+        """
+        Args:
+            loader: Callable taking a version number and returning a Dataset
+            key: Callable returning the current source key, or None if
+                unknown (which always refreshes)
+            max_age: Seconds after which a refresh reloads even if the key
+                is unchanged; 0 never forces a reload
+        """
+        self._loader = loader
+        self._key = key
+        self._max_age = max_age
+        self._current = None
+        self._current_key = None
+        self._loaded_at = None
+        self._version = 0
+        self._load_lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+        self._schedule_thread = None
+        self._stop = threading.Event()
+
+    @property
+    def current(self):
+        """The live Dataset, loaded synchronously on first access."""
+        if self._current is None:
+            with self._load_lock:
+                if self._current is None:
+                    # Taken first: changes during the load show up as a new key
+                    key = self._key()
+                    self._current = self._loader(self._version)
+                    self._current_key, self._loaded_at = key, time.monotonic()
+        return self._current
+
+    def _unchanged(self, key):
+        """Whether the live Dataset is still current for a source key."""
+        if key is None or key != self._current_key:
+            return False
+        return self._max_age <= 0 or time.monotonic() - self._loaded_at <= self._max_age
+
+    def get_version(self):
+        """
+        Get the version of the live Dataset.
+
+        Cheap enough to be polled from every session.
+
+        Returns:
+            Integer that changes whenever a refresh is swapped in
+        """
+        return self._version
+
+    def _rebuild(self, incremental=False):
+        """Build a new Dataset and swap it in, keeping the old one on failure."""
+        try:
+            with self._load_lock:
+                key = self._key()
+                if self._current is not None and self._unchanged(key):
+                    logger.debug("Source unchanged; keeping version %s", self._version)
+                    return
+                if incremental and self._current is not None:
+                    dataset = self._current.load_incremental(self._version + 1)
+                else:
+                    dataset = self._loader(self._version + 1)
+                self._current = dataset
+                self._current_key, self._loaded_at = key, time.monotonic()
+                self._version = dataset.version
+            logger.info("Dataset refreshed to version %s", self._version)
+        except Exception:
+            logger.exception("Dataset refresh failed; keeping version %s",
+                             self._version)
+
+    def refresh(self, wait=False, incremental=False):
+        """
+        Rebuild the dataset on a background thread.
+
+        A refresh that is already running is reused rather than started twice,
+        and one that finds the source unchanged keeps the live Dataset and its
+        version.
+
+        Args:
+            wait: Block until the refresh has finished
+            incremental: Only re-pivot students with assessments past the
+                current watermark instead of rebuilding everything
+
+        Returns:
+            The refresh thread
+        """
+        with self._refresh_lock:
+            thread = self._refresh_thread
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(
+                    target=self._rebuild, args=(incremental,),
+                    name="dataset-refresh", daemon=True)
+                self._refresh_thread = thread
+                thread.start()
+        if wait:
+            thread.join()
+        return thread
+
+    def start_schedule(self, interval_secs, incremental=False):
+        """
+        Refresh the dataset every `interval_secs` seconds until stopped.
+
+        Args:
+            interval_secs: Seconds between refreshes
+            incremental: Use incremental refreshes (see refresh())
+        """
+        if self._schedule_thread is not None and self._schedule_thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval_secs):
+                self.refresh(wait=True, incremental=incremental)
+
+        self._schedule_thread = threading.Thread(
+            target=run, name="dataset-refresh-schedule", daemon=True)
+        self._schedule_thread.start()
+
+    def stop_schedule(self):
+        """Stop the periodic refresh started by start_schedule()."""
+        self._stop.set()
+
+
+# Seconds between automatic refreshes; 0 disables the schedule
+REFRESH_INTERVAL_SECS = float(os.getenv("MTSS_REFRESH_INTERVAL", "0"))
+
+dataset_store = DatasetStore()
+
+
+def get_dataset():
+    """
+    Get the live process-wide Dataset, loading it on first call.
+
+    Returns:
+        The current Dataset instance
+    """
+    return dataset_store.current
@@ -0,0 +1,60 @@
+"""
+Module for the sorted value index used to search filter choices.
+"""
+from bisect import bisect_left
+
+
+class ValueIndex:
+    """
+    Distinct values of a column, sorted case-insensitively for searching.
+
+    Prefix matches are found with a binary search, so a high-cardinality
+    column can serve selectize options as the user types without scanning
+    or sending every value.
+    """
+
+    def __init__(self, values):
+        """
+        Args:
+            values: Iterable of column values; nulls are skipped and the rest
+                are compared as strings
+        """
+        self.values = sorted({str(v) for v in values if v is not None},
+                             key=lambda v: (v.lower(), v))
+        self._keys = [v.lower() for v in self.values]
+
+    def __len__(self):
+        return len(self.values)
+
+    def search(self, query, limit=1000):
+        """
+        Find values matching a search string, case-insensitively.
+
+        Args:
+            query: Text typed by the user; empty returns the first values
+            limit: Maximum number of values to return
+
+        Returns:
+            List of values starting with query, followed by values that
+            contain it elsewhere
+        """
+        query = query.strip().lower()
+        if not query:
+            return self.values[:limit]
+
+        matches = []
+        start = bisect_left(self._keys, query)
+        end = start
+        while end < len(self._keys) and self._keys[end].startswith(query):
+            end += 1
+        matches.extend(self.values[start:min(end, start + limit)])
+
+        # Fill up with values containing the query after their first character
+        for i, key in enumerate(self._keys):
+            if len(matches) >= limit:
+                break
+            if start <= i < end:
+                continue
+            if query in key:
+                matches.append(self.values[i])
+        return matches
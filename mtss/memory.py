@@ -0,0 +1,107 @@
+"""
+Module for measuring and bounding the memory used while building the dataset.
+"""
+import os
+import resource
+import sys
+import threading
+
+# Memory the dataset build may add on top of the process, in MB; 0 disables
+# the budget. With a budget, assessments are extracted in SSID chunks sized to
+# fit it, and a build that still goes over is aborted (a refresh then keeps
+# serving the current dataset) instead of growing until the OOM killer steps in.
+BUILD_MEMORY_MB = float(os.getenv("MTSS_BUILD_MEMORY_MB", "0"))
+
+# How often the watcher samples resident memory, in seconds
+SAMPLE_SECS = 0.05
+
+
+def rss_bytes():
+    """
+    Current resident set size of this process.
+
+    Reads /proc on Linux; elsewhere falls back to the peak size reported by
+    getrusage, which can only grow.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryWatch:
+    """
+    Track the peak memory a block of work adds to the process.
+
+    Used as a context manager; a background thread samples RSS while the
+    block runs. The build calls check() between steps, so an over-budget
+    build stops at the next step boundary with a MemoryError.
+    """
+
+    def __init__(self, budget_mb=BUILD_MEMORY_MB, interval=SAMPLE_SECS):
+        """
+        Args:
+            budget_mb: Allowed growth over the starting RSS in MB; 0 for none
+            interval: Seconds between samples
+        """
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start_bytes = self.peak_bytes = rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        return False
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Take one RSS sample now."""
+        self.peak_bytes = max(self.peak_bytes, rss_bytes())
+
+    @property
+    def peak_mb(self):
+        """Highest growth over the starting RSS seen so far, in MB."""
+        return (self.peak_bytes - self.start_bytes) / (1024 * 1024)
+
+    @property
+    def headroom_mb(self):
+        """Budget left above the peak so far, in MB; None without a budget."""
+        if not self.budget_bytes:
+            return None
+        return (self.budget_bytes - (self.peak_bytes - self.start_bytes)) / (1024 * 1024)
+
+    def check(self, step):
+        """
+        Raise if the block has gone over budget.
+
+        Args:
+            step: Description of the work just finished, for the error message
+
+        Raises:
+            MemoryError: If a budget is set and the peak growth exceeds it
+        """
+        self.sample()
+        if self.budget_bytes and self.peak_bytes - self.start_bytes > self.budget_bytes:
+            raise MemoryError(
+                f"Dataset build used {self.peak_mb:.0f} MB after {step}, over the "
+                f"{self.budget_bytes / (1024 * 1024):.0f} MB budget (MTSS_BUILD_MEMORY_MB)")
@@ -2,20 +2,21 @@
 Module for creating the assessment menu in the sidebar.
 """
 from shiny import ui
-from baseData import get_base_data
+from mtss.startup import phase
 from .components import create_tree_checkbox
+from .ids import WidgetIds
 
-# Get base data
-df = get_base_data().to_pandas()
 baseColumns = ['SSID', 'STUDENT_NAME', 'Grade', 'School', 'Language', 'Race']
 
 
-def create_assessment_menu(assessments_data):
+@phase("sidebar assessment menu")
+def create_assessment_menu(assessments_data, ids=None):
     """
     Create the assessment menu tree structure for the sidebar.
 
     Args:
         assessments_data: Dictionary with organized assessment data
+        ids: WidgetIds registry; built from assessments_data if not given
 
     Returns:
         UI element representing the assessment menu
@@ -27,6 +28,7 @@ def create_assessment_menu(assessments_data):
         const icon = headerEl.querySelector('.tree-icon');
         
         if (content.classList.contains('collapsed')) {
+            loadLazyContent(content);
             content.classList.remove('collapsed');
             icon.classList.remove('fa-plus-square');
             icon.classList.add('fa-minus-square');
@@ -61,6 +63,9 @@ def create_assessment_menu(assessments_data):
     });
     """
 
+    if ids is None:
+        ids = WidgetIds({"Assessments": assessments_data})
+
     # Top-level assessment names
     assessment_nodes = []
 
@@ -94,24 +99,16 @@ def create_assessment_menu(assessments_data):
                             # For each column, create a checkbox - these are leaf nodes
                             col_nodes = []
                             for col in cols:
-                                # Sanitize ID: replace all non-alphanumeric characters with underscore
-                                col_id = f"col_{''.join(c if c.isalnum() else '_' for c in col)}"
+                                col_id = ids.column_id(col)
                                 is_checked = col in baseColumns
                                 # Pass only column name without test name details - show just value
                                 display_label = atype  # Just show PL or SS
                                 col_nodes.append(create_tree_checkbox(
-                                    col_id, display_label, is_leaf=True, value=is_checked))
+                                    col_id, display_label, is_leaf=True, value=is_checked,
+                                    column=col))
 
                             # Group by assessment type (PL/SS)
-                            sanitized_name = ''.join(
-                                c if c.isalnum() else '_' for c in name)
-                            sanitized_subject = ''.join(
-                                c if c.isalnum() else '_' for c in subject)
-                            sanitized_year = ''.join(
-                                c if c.isalnum() else '_' for c in year)
-                            sanitized_tp = ''.join(
-                                c if c.isalnum() else '_' for c in tp) if tp else ''
-                            type_id = f"type_{sanitized_name}_{sanitized_subject}_{sanitized_year}_{sanitized_tp}_{atype}"
+                            type_id = ids.id_for("type", name, subject, year, tp, atype)
 
                             # If there's no testing period label, just show the assessment type (PL/SS)
                             type_label = atype if not tp_label else f"{tp_label} {atype}"
@@ -119,21 +116,12 @@ def create_assessment_menu(assessments_data):
                                 type_id, type_label, col_nodes))
 
                         # Create testing period node with type nodes as children
-                        sanitized_name = ''.join(
-                            c if c.isalnum() else '_' for c in name)
-                        sanitized_subject = ''.join(
-                            c if c.isalnum() else '_' for c in subject)
-                        sanitized_year = ''.join(
-                            c if c.isalnum() else '_' for c in year)
-                        sanitized_tp = ''.join(
-                            c if c.isalnum() else '_' for c in tp) if tp else ''
-
                         # Skip creating a separate testing period level if there's only one type
                         if len(type_nodes) <= 1:
                             # Add type nodes directly to tp_nodes
                             tp_nodes.extend(type_nodes)
                         else:
-                            tp_id = f"tp_{sanitized_name}_{sanitized_subject}_{sanitized_year}_{sanitized_tp}"
+                            tp_id = ids.id_for("tp", name, subject, year, tp)
                             tp_nodes.append(create_tree_checkbox(
                                 tp_id, tp_label, type_nodes))
                     else:
@@ -156,33 +144,26 @@ def create_assessment_menu(assessments_data):
                         leaf_nodes = []
 
                         if latest_pl_col:
-                            col_id = f"col_{''.join(c if c.isalnum() else '_' for c in latest_pl_col)}"
+                            col_id = ids.column_id(latest_pl_col)
                             is_checked = latest_pl_col in baseColumns
                             leaf_nodes.append(create_tree_checkbox(
-                                col_id, "PL", is_leaf=True, value=is_checked))
+                                col_id, "PL", is_leaf=True, value=is_checked,
+                                column=latest_pl_col))
 
                         if latest_ss_col:
-                            col_id = f"col_{''.join(c if c.isalnum() else '_' for c in latest_ss_col)}"
+                            col_id = ids.column_id(latest_ss_col)
                             is_checked = latest_ss_col in baseColumns
                             leaf_nodes.append(create_tree_checkbox(
-                                col_id, "SS", is_leaf=True, value=is_checked))
+                                col_id, "SS", is_leaf=True, value=is_checked,
+                                column=latest_ss_col))
 
                         # Add the testing period node with just the latest PL/SS as children
                         if leaf_nodes:
-                            sanitized_name = ''.join(
-                                c if c.isalnum() else '_' for c in name)
-                            sanitized_subject = ''.join(
-                                c if c.isalnum() else '_' for c in subject)
-                            sanitized_year = ''.join(
-                                c if c.isalnum() else '_' for c in year)
-                            sanitized_tp = ''.join(
-                                c if c.isalnum() else '_' for c in tp) if tp else ''
-
                             # Skip creating a separate testing period level if there's only one leaf node
                             if len(leaf_nodes) <= 1:
                                 tp_nodes.extend(leaf_nodes)
                             else:
-                                tp_id = f"tp_{sanitized_name}_{sanitized_subject}_{sanitized_year}_{sanitized_tp}"
+                                tp_id = ids.id_for("tp", name, subject, year, tp)
                                 # If there's no testing period label, just show the year
                                 node_label = year if not tp_label else tp_label
                                 tp_nodes.append(create_tree_checkbox(
@@ -190,30 +171,19 @@ def create_assessment_menu(assessments_data):
 
                 # Create year node with testing period nodes as children
                 if tp_nodes:
-                    sanitized_name = ''.join(
-                        c if c.isalnum() else '_' for c in name)
-                    sanitized_subject = ''.join(
-                        c if c.isalnum() else '_' for c in subject)
-                    sanitized_year = ''.join(
-                        c if c.isalnum() else '_' for c in year)
-                    year_id = f"year_{sanitized_name}_{sanitized_subject}_{sanitized_year}"
+                    year_id = ids.id_for("year", name, subject, year)
                     year_nodes.append(create_tree_checkbox(
                         year_id, year, tp_nodes))
 
             # Create subject node with year nodes as children
             if year_nodes:
-                sanitized_name = ''.join(
-                    c if c.isalnum() else '_' for c in name)
-                sanitized_subject = ''.join(
-                    c if c.isalnum() else '_' for c in subject)
-                subject_id = f"subject_{sanitized_name}_{sanitized_subject}"
+                subject_id = ids.id_for("subject", name, subject)
                 subject_nodes.append(create_tree_checkbox(
                     subject_id, subject, year_nodes))
 
         # Create assessment name node with subject nodes as children
         if subject_nodes:
-            sanitized_name = ''.join(c if c.isalnum() else '_' for c in name)
-            name_id = f"assessment_{sanitized_name}"
+            name_id = ids.id_for("assessment", name)
             assessment_nodes.append(
                 create_tree_checkbox(name_id, name, subject_nodes))
 
@@ -3,12 +3,40 @@ Module for reusable UI components used in the sidebar.
 """
 from shiny import ui
 
+# Children of lazy containers that have not been sent to the browser yet,
+# keyed by container ID. The server inserts them on first expand.
+lazy_children = {}
 
-def create_tree_checkbox(id, label, children=None, is_leaf=False, open=False, value=False):
+
+def create_lazy_container(id, children, **attrs):
+    """
+    Create an empty container whose children are rendered on first expand.
+
+    The children are kept in lazy_children; the sidebar JavaScript asks for
+    them through the lazy_content input the first time the container opens.
+
+    Args:
+        id: ID of the container element
+        children: UI elements to insert into the container later
+        **attrs: Other attributes for the container (class_, style, ...)
+
+    Returns:
+        Empty UI element marked as lazy
+    """
+    lazy_children[id] = children
+    return ui.div(id=id, **{"data-lazy": "pending"}, **attrs)
+
+
+def create_tree_checkbox(id, label, children=None, is_leaf=False, open=False, value=False,
+                         column=None, lazy=True):
     """
     Create a tree-like checkbox structure that can be nested.
     Only leaf nodes will have checkboxes.
 
+    Leaf checkboxes are plain HTML inputs rather than Shiny inputs; the sidebar
+    JavaScript reports every checked leaf at once through the selected_columns
+    input.
+
     Args:
         id: ID for the checkbox or tree node
         label: Label text to display
@@ -16,6 +44,8 @@ def create_tree_checkbox(id, label, children=None, is_leaf=False, open=False, va
         is_leaf: Whether this is a leaf node (has a checkbox)
         open: Whether the node should be open by default
         value: Default value for the checkbox (if leaf)
+        column: Original column name the leaf checkbox selects
+        lazy: Render a closed branch's children only when it is first expanded
 
     Returns:
         UI element representing a tree node
@@ -24,7 +54,10 @@ def create_tree_checkbox(id, label, children=None, is_leaf=False, open=False, va
         # Leaf node - just a checkbox for the final level
         return ui.div(
             ui.div(
-                ui.input_checkbox(id, "", value=value),
+                ui.tags.input(
+                    type="checkbox", id=id, checked=True if value else None,
+                    class_="form-check-input column-checkbox",
+                    **{"data-original-name": column or label}),
                 ui.tags.label(
                     label, class_="tree-label text-gray-700 ml-1", **{"for": id}),
                 class_="flex items-center"
@@ -49,11 +82,15 @@ def create_tree_checkbox(id, label, children=None, is_leaf=False, open=False, va
         )
 
         # Create the container for children, initially hidden if not open
-        children_container = ui.div(
-            *children,
-            id=collapsible_id,
-            class_="tree-children" + ("" if open else " collapsed"),
-        )
+        if lazy and not open:
+            children_container = create_lazy_container(
+                collapsible_id, children, class_="tree-children collapsed")
+        else:
+            children_container = ui.div(
+                *children,
+                id=collapsible_id,
+                class_="tree-children" + ("" if open else " collapsed"),
+            )
 
         # Return the branch with its children
         return ui.div(
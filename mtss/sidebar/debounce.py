@@ -0,0 +1,67 @@
+"""
+Module for debouncing reactive values computed from sidebar inputs.
+"""
+import time
+
+from shiny import reactive
+
+_UNSET = object()
+
+
+def debounce(delay_secs):
+    """
+    Decorator turning a reactive calculation into a debounced one.
+
+    The first value passes through immediately. After that, the debounced
+    value only updates once the source has stopped changing for delay_secs,
+    and only if the new value differs from the last one, so a burst of input
+    changes causes a single downstream recalculation.
+
+    Args:
+        delay_secs: Quiet period in seconds; 0 or less disables debouncing
+
+    Returns:
+        Decorator taking a reactive calculation and returning a new one
+    """
+    def wrapper(source):
+        if delay_secs <= 0:
+            return source
+
+        result = reactive.Value(_UNSET)
+        deadline = reactive.Value(None)
+
+        @reactive.Effect(priority=1)
+        def _():
+            value = source()
+            with reactive.isolate():
+                if result() is _UNSET:
+                    result.set(value)
+                else:
+                    deadline.set(time.monotonic() + delay_secs)
+
+        @reactive.Effect
+        def _():
+            due = deadline()
+            if due is None:
+                return
+            remaining = due - time.monotonic()
+            if remaining > 0:
+                reactive.invalidate_later(remaining)
+                return
+            with reactive.isolate():
+                value = source()
+                if value != result():
+                    result.set(value)
+            deadline.set(None)
+
+        @reactive.Calc
+        def debounced():
+            value = result()
+            if value is _UNSET:
+                # Not settled yet: fall back to the source itself
+                return source()
+            return value
+
+        return debounced
+
+    return wrapper
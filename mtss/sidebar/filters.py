@@ -1,43 +1,98 @@
 """
 Module for creating the filters section in the sidebar.
 """
+import math
+import os
+
 from shiny import ui
-from baseData import get_base_data
+from mtss.data import get_dataset
+from mtss.data.bitmap_index import MAX_FILTER_CARDINALITY
+from mtss.startup import phase
+from .components import create_lazy_container
+from .ids import WidgetIds, is_student_info_filter_column
+
+# Quiet period before filter changes are applied to the table
+FILTER_DEBOUNCE_SECS = float(os.getenv("MTSS_FILTER_DEBOUNCE_MS", "400")) / 1000
+
+# Whether filters apply as they change; otherwise only on "Apply Filters"
+FILTER_AUTO_APPLY = os.getenv("MTSS_FILTER_AUTO_APPLY", "1") != "0"
+
+# Filter ID -> column, for filters whose choices are loaded from the server
+server_option_filters = {}
+
+# Range filter ID -> (min, max) of its slider; a slider at its full range is inactive
+range_filter_bounds = {}
+
 
-# Get base data
-df = get_base_data().to_pandas()
+def get_filter_apply_ui():
+    """
+    Get the controls that decide when filter changes reach the table.
+
+    Returns:
+        UI element with the auto-apply switch and the Apply Filters button
+    """
+    return ui.div(
+        ui.input_checkbox(
+            "filter_auto_apply", "Apply filters as they change",
+            value=FILTER_AUTO_APPLY
+        ),
+        ui.input_action_button(
+            "apply_filters", "Apply Filters",
+            class_="px-4 py-2 bg-blue-600 text-white rounded hover:bg-blue-700"
+        ),
+        class_="flex items-center justify-between mt-3 p-2"
+    )
 
 
-def create_student_info_filter(columns):
+@phase("sidebar student info filters")
+def create_student_info_filter(columns, ids=None):
     """
     Create filter controls for student info columns.
 
     Args:
         columns: List of student info column names
+        ids: WidgetIds registry; built from columns if not given
 
     Returns:
         UI element representing the student info filters
     """
+    dataset = get_dataset()
+    if ids is None:
+        ids = WidgetIds({"Student Info": columns})
     filter_items = []
 
     # Filter out any identifier columns like SSID, STUDENT_NAME, ID, etc.
-    filtered_columns = [col for col in columns if col not in [
-        'SSID', 'STUDENT_NAME'] and not 'ID' in col]
+    filtered_columns = [col for col in columns if is_student_info_filter_column(col)]
 
     for col in filtered_columns:
         # Get unique values for this column
-        unique_values = df[col].dropna().unique().tolist()
-
-        # Skip if there are too many unique values (likely an identifier)
-        if len(unique_values) > 50:
-            continue
+        unique_values = dataset.unique_values(col)
 
         # Create select input for this column
-        sanitized_col = ''.join(c if c.isalnum() else '_' for c in col)
-        filter_id = f"filter_{sanitized_col}"
+        filter_id = ids.id_for("filter_student_info", col)
+
+        if len(unique_values) > MAX_FILTER_CARDINALITY:
+            # Too many values to embed: the server sends matching options as the user types
+            server_option_filters[filter_id] = col
+            filter_input = ui.div(
+                ui.input_selectize(
+                    filter_id, "",
+                    choices=[],
+                    multiple=True,
+                    options={"placeholder": "Type to search..."}
+                ),
+                class_="server-options-filter"
+            )
+        else:
+            filter_input = ui.input_selectize(
+                filter_id, "",
+                choices=[""] + sorted(unique_values),
+                selected="",
+                multiple=True
+            )
 
         # Create unique ID for the collapsible section
-        collapse_id = f"collapse_{sanitized_col}"
+        collapse_id = ids.id_for("collapse_student_info", col)
 
         filter_items.append(
             ui.div(
@@ -45,20 +100,16 @@ def create_student_info_filter(columns):
                 ui.div(
                     ui.h4(col, class_="font-medium text-gray-700 mb-1"),
                     ui.tags.i(
-                        class_="fas fa-chevron-down float-right toggle-filter-icon"),
+                        class_="fas fa-chevron-right float-right toggle-filter-icon"),
                     class_="filter-header cursor-pointer",
                     onclick=f"toggleFilterSection('{collapse_id}')"
                 ),
-                # Collapsible content
-                ui.div(
-                    ui.input_selectize(
-                        filter_id, "",
-                        choices=[""] + sorted(unique_values),
-                        selected="",
-                        multiple=True
-                    ),
+                # Collapsible content, rendered on first expand
+                create_lazy_container(
+                    collapse_id,
+                    [filter_input],
                     class_="filter-content mt-2 mb-3",
-                    id=collapse_id
+                    style="display: none;"
                 ),
                 class_="filter-item mb-4 pb-2 border-b border-gray-200"
             )
@@ -70,16 +121,21 @@ def create_student_info_filter(columns):
     )
 
 
-def create_assessment_filter(assessments_data):
+@phase("sidebar assessment filters")
+def create_assessment_filter(assessments_data, ids=None):
     """
-    Create filter controls for assessment data (PL only).
+    Create filter controls for assessment data (PL values and SS ranges).
 
     Args:
         assessments_data: Dictionary with organized assessment data
+        ids: WidgetIds registry; built from assessments_data if not given
 
     Returns:
         UI element representing the assessment filters
     """
+    dataset = get_dataset()
+    if ids is None:
+        ids = WidgetIds({"Assessments": assessments_data})
     assessment_filter_nodes = []
 
     for name, subjects in assessments_data.items():
@@ -89,71 +145,82 @@ def create_assessment_filter(assessments_data):
             year_filters = []
 
             for year, testing_periods in years.items():
-                # For each assessment type, we'll create a filter for PL values only
+                # For each assessment type, we'll create a filter for PL values
+                # and a range filter for SS values
                 pl_columns = []
+                ss_columns = []
 
                 for tp, assessment_types in testing_periods.items():
                     if "PL" in assessment_types:
                         for col in assessment_types["PL"]:
                             pl_columns.append(col)
-
-                # If we have PL columns, create a filter for this year/subject
-                if pl_columns:
-                    # Get unique PL values across all columns
-                    unique_pl_values = set()
-                    for col in pl_columns:
-                        if col in df.columns:
-                            values = df[col].dropna().unique().tolist()
-                            # Only add reasonable length string values
-                            values = [v for v in values if isinstance(
-                                v, str) and len(v) < 50]
-                            unique_pl_values.update(values)
-
-                    # Skip if there are no valid values
-                    if not unique_pl_values:
-                        continue
-
-                    # Create a filter ID based on name, subject, year
-                    # Sanitize ID: replace all non-alphanumeric characters with underscore
-                    sanitized_name = ''.join(
-                        c if c.isalnum() else '_' for c in name)
-                    sanitized_subject = ''.join(
-                        c if c.isalnum() else '_' for c in subject)
-                    sanitized_year = ''.join(
-                        c if c.isalnum() else '_' for c in year)
-                    filter_id = f"filter_{sanitized_name}_{sanitized_subject}_{sanitized_year}"
-
-                    year_filters.append(
+                    if "SS" in assessment_types:
+                        ss_columns.extend(assessment_types["SS"])
+
+                # Get unique PL values across all columns
+                unique_pl_values = set()
+                for col in pl_columns:
+                    if col in dataset.schema:
+                        values = dataset.unique_values(col)
+                        # Only add reasonable length string values
+                        values = [v for v in values if isinstance(
+                            v, str) and len(v) < 50]
+                        unique_pl_values.update(values)
+
+                # Get the scale score range across all SS columns
+                ss_bounds = dataset.range_index.bounds(ss_columns)
+
+                # Skip if there are no valid values
+                if not unique_pl_values and ss_bounds is None:
+                    continue
+
+                # Create a filter ID based on name, subject, year
+                filter_id = ids.id_for("filter_assessment", name, subject, year)
+
+                filter_inputs = []
+                if unique_pl_values:
+                    filter_inputs.append(ui.input_selectize(
+                        filter_id, "",
+                        choices=[""] +
+                        sorted(list(unique_pl_values)),
+                        selected="",
+                        multiple=True
+                    ))
+                if ss_bounds is not None:
+                    range_id = ids.id_for("filter_assessment_range", name, subject, year)
+                    low, high = math.floor(ss_bounds[0]), math.ceil(ss_bounds[1])
+                    range_filter_bounds[range_id] = (low, high)
+                    filter_inputs.append(ui.input_slider(
+                        range_id, "Scale score",
+                        min=low, max=high, value=(low, high), step=1
+                    ))
+
+                year_filters.append(
+                    ui.div(
+                        # Collapsible header for year
                         ui.div(
-                            # Collapsible header for year
-                            ui.div(
-                                ui.h4(
-                                    f"{year}", class_="font-medium text-gray-700 mb-1"),
-                                ui.tags.i(
-                                    class_="fas fa-chevron-down float-right toggle-filter-icon"),
-                                class_="filter-header cursor-pointer",
-                                onclick=f"toggleFilterSection('collapse_{filter_id}')"
-                            ),
-                            # Collapsible content
-                            ui.div(
-                                ui.input_selectize(
-                                    filter_id, "",
-                                    choices=[""] +
-                                    sorted(list(unique_pl_values)),
-                                    selected="",
-                                    multiple=True
-                                ),
-                                class_="filter-content mt-2 mb-3",
-                                id=f"collapse_{filter_id}"
-                            ),
-                            class_="filter-item mb-3 pb-2 border-b border-gray-200"
-                        )
+                            ui.h4(
+                                f"{year}", class_="font-medium text-gray-700 mb-1"),
+                            ui.tags.i(
+                                class_="fas fa-chevron-right float-right toggle-filter-icon"),
+                            class_="filter-header cursor-pointer",
+                            onclick=f"toggleFilterSection('collapse_{filter_id}')"
+                        ),
+                        # Collapsible content, rendered on first expand
+                        create_lazy_container(
+                            f"collapse_{filter_id}",
+                            filter_inputs,
+                            class_="filter-content mt-2 mb-3",
+                            style="display: none;"
+                        ),
+                        class_="filter-item mb-3 pb-2 border-b border-gray-200"
                     )
+                )
 
             # If we have year filters, add them to subject filters
             if year_filters:
                 # Create a unique ID for subject collapsible section
-                subject_collapse_id = f"collapse_subject_{sanitized_name}_{sanitized_subject}"
+                subject_collapse_id = ids.id_for("collapse_subject", name, subject)
 
                 subject_filters.append(
                     ui.div(
@@ -162,15 +229,15 @@ def create_assessment_filter(assessments_data):
                             ui.h3(
                                 subject, class_="font-semibold text-blue-800 mb-2"),
                             ui.tags.i(
-                                class_="fas fa-chevron-down float-right toggle-filter-icon"),
+                                class_="fas fa-chevron-right float-right toggle-filter-icon"),
                             class_="filter-header cursor-pointer",
                             onclick=f"toggleFilterSection('{subject_collapse_id}')"
                         ),
-                        # Collapsible content
-                        ui.div(
-                            *year_filters,
-                            class_="ml-3",
-                            id=subject_collapse_id
+                        # Collapsible content, rendered on first expand
+                        create_lazy_container(
+                            subject_collapse_id, year_filters,
+                            class_="filter-content ml-3",
+                            style="display: none;"
                         ),
                         class_="mb-4"
                     )
@@ -179,7 +246,7 @@ def create_assessment_filter(assessments_data):
         # If we have subject filters, add them to assessment filters
         if subject_filters:
             # Create a unique ID for assessment collapsible section
-            assessment_collapse_id = f"collapse_assessment_{sanitized_name}"
+            assessment_collapse_id = ids.id_for("collapse_assessment", name)
 
             assessment_filter_nodes.append(
                 ui.div(
@@ -187,15 +254,15 @@ def create_assessment_filter(assessments_data):
                     ui.div(
                         ui.h2(name, class_="text-lg font-bold text-blue-900 mb-2"),
                         ui.tags.i(
-                            class_="fas fa-chevron-down float-right toggle-filter-icon"),
+                            class_="fas fa-chevron-right float-right toggle-filter-icon"),
                         class_="filter-header cursor-pointer",
                         onclick=f"toggleFilterSection('{assessment_collapse_id}')"
                     ),
-                    # Collapsible content
-                    ui.div(
-                        *subject_filters,
-                        class_="ml-3",
-                        id=assessment_collapse_id
+                    # Collapsible content, rendered on first expand
+                    create_lazy_container(
+                        assessment_collapse_id, subject_filters,
+                        class_="filter-content ml-3",
+                        style="display: none;"
                     ),
                     class_="mb-5 pb-3 border-b border-gray-300"
                 )
@@ -207,16 +274,21 @@ def create_assessment_filter(assessments_data):
     )
 
 
-def create_grades_filter(grades_data):
+@phase("sidebar grades filters")
+def create_grades_filter(grades_data, ids=None):
     """
     Create filter controls for grades data.
 
     Args:
         grades_data: Dictionary with organized grades data
+        ids: WidgetIds registry; built from grades_data if not given
 
     Returns:
         UI element representing the grades filters
     """
+    dataset = get_dataset()
+    if ids is None:
+        ids = WidgetIds({"Grades": grades_data})
     subject_filter_nodes = []
 
     for subject, periods in grades_data.items():
@@ -226,8 +298,8 @@ def create_grades_filter(grades_data):
             # Get unique grade values
             unique_values = set()
             for col in cols:
-                if col in df.columns:
-                    values = df[col].dropna().unique().tolist()
+                if col in dataset.schema:
+                    values = dataset.unique_values(col)
                     # Only include grade-like values (short strings or numbers)
                     values = [v for v in values if (isinstance(
                         v, str) and len(v) < 5) or isinstance(v, (int, float))]
@@ -238,11 +310,7 @@ def create_grades_filter(grades_data):
                 continue
 
             # Create filter ID
-            sanitized_subject = ''.join(
-                c if c.isalnum() else '_' for c in subject)
-            sanitized_period = ''.join(
-                c if c.isalnum() else '_' for c in period)
-            filter_id = f"filter_grades_{sanitized_subject}_{sanitized_period}"
+            filter_id = ids.id_for("filter_grades", subject, period)
 
             # Create unique ID for period collapsible section
             period_collapse_id = f"collapse_{filter_id}"
@@ -253,21 +321,22 @@ def create_grades_filter(grades_data):
                     ui.div(
                         ui.h4(period, class_="font-medium text-gray-700 mb-1"),
                         ui.tags.i(
-                            class_="fas fa-chevron-down float-right toggle-filter-icon"),
+                            class_="fas fa-chevron-right float-right toggle-filter-icon"),
                         class_="filter-header cursor-pointer",
                         onclick=f"toggleFilterSection('{period_collapse_id}')"
                     ),
-                    # Collapsible content
-                    ui.div(
-                        ui.input_selectize(
+                    # Collapsible content, rendered on first expand
+                    create_lazy_container(
+                        period_collapse_id,
+                        [ui.input_selectize(
                             filter_id, "",
                             choices=[""] +
                             sorted(list(unique_values), key=str),
                             selected="",
                             multiple=True
-                        ),
+                        )],
                         class_="filter-content mt-2 mb-3",
-                        id=period_collapse_id
+                        style="display: none;"
                     ),
                     class_="filter-item mb-3 pb-2 border-b border-gray-200"
                 )
@@ -276,7 +345,7 @@ def create_grades_filter(grades_data):
         # If we have period filters, add them to subject filters
         if period_filters:
             # Create unique ID for subject collapsible section
-            subject_collapse_id = f"collapse_grades_subject_{sanitized_subject}"
+            subject_collapse_id = ids.id_for("collapse_grades_subject", subject)
 
             subject_filter_nodes.append(
                 ui.div(
@@ -284,15 +353,15 @@ def create_grades_filter(grades_data):
                     ui.div(
                         ui.h3(subject, class_="font-semibold text-blue-800 mb-2"),
                         ui.tags.i(
-                            class_="fas fa-chevron-down float-right toggle-filter-icon"),
+                            class_="fas fa-chevron-right float-right toggle-filter-icon"),
                         class_="filter-header cursor-pointer",
                         onclick=f"toggleFilterSection('{subject_collapse_id}')"
                     ),
-                    # Collapsible content
-                    ui.div(
-                        *period_filters,
-                        class_="ml-3",
-                        id=subject_collapse_id
+                    # Collapsible content, rendered on first expand
+                    create_lazy_container(
+                        subject_collapse_id, period_filters,
+                        class_="filter-content ml-3",
+                        style="display: none;"
                     ),
                     class_="mb-4 pb-2 border-b border-gray-200"
                 )
@@ -302,3 +371,56 @@ def create_grades_filter(grades_data):
         *subject_filter_nodes,
         class_="filter-section p-2"
     )
+
+
+def collect_active_filters(input, ids, range_bounds=range_filter_bounds):
+    """
+    Collect all active filters from the filter inputs.
+
+    Args:
+        input: Shiny session inputs, or any mapping of input ID -> callable
+            returning the current value
+        ids: WidgetIds registry the filters were built with
+        range_bounds: Range filter ID -> (min, max) of its slider
+
+    Returns:
+        Dictionary of assessments, assessment_ranges, grades and student_info
+        filters, as used by Dataset.filter_rows()
+    """
+    filters = {
+        "assessments": {},
+        "assessment_ranges": {},
+        "grades": {},
+        "student_info": {}
+    }
+
+    # Collect assessment filters
+    for filter_id, (name, subject, year) in ids.assessment_filters.items():
+        if filter_id in input and input[filter_id]():
+            if name not in filters["assessments"]:
+                filters["assessments"][name] = {}
+            if subject not in filters["assessments"][name]:
+                filters["assessments"][name][subject] = {}
+            filters["assessments"][name][subject][year] = input[filter_id]()
+
+    # Collect scale score range filters that have been narrowed
+    for filter_id, (name, subject, year) in ids.assessment_range_filters.items():
+        if filter_id in input and input[filter_id]():
+            low, high = input[filter_id]()
+            if (low, high) != range_bounds.get(filter_id):
+                filters["assessment_ranges"].setdefault(
+                    name, {}).setdefault(subject, {})[year] = (low, high)
+
+    # Collect grades filters
+    for filter_id, (subject, period) in ids.grades_filters.items():
+        if filter_id in input and input[filter_id]():
+            if subject not in filters["grades"]:
+                filters["grades"][subject] = {}
+            filters["grades"][subject][period] = input[filter_id]()
+
+    # Collect student info filters
+    for filter_id, col in ids.student_info_filters.items():
+        if filter_id in input and input[filter_id]():
+            filters["student_info"][col] = input[filter_id]()
+
+    return filters
@@ -2,38 +2,40 @@
 Module for creating the grades menu in the sidebar.
 """
 from shiny import ui
-from baseData import get_base_data
+from mtss.startup import phase
 from .components import create_tree_checkbox
+from .ids import WidgetIds
 
-# Get base data
-df = get_base_data().to_pandas()
 baseColumns = ['SSID', 'STUDENT_NAME', 'Grade', 'School', 'Language', 'Race']
 
 
-def create_grades_menu(grades_data):
+@phase("sidebar grades menu")
+def create_grades_menu(grades_data, ids=None):
     """
     Create the grades menu tree structure for the sidebar.
 
     Args:
         grades_data: Dictionary with organized grades data
+        ids: WidgetIds registry; built from grades_data if not given
 
     Returns:
         UI element representing the grades menu
     """
+    if ids is None:
+        ids = WidgetIds({"Grades": grades_data})
+
     subject_nodes = []
     for subject, periods in grades_data.items():
         period_nodes = []
         for period, cols in periods.items():
             for col in cols:
-                col_id = f"col_{''.join(c if c.isalnum() else '_' for c in col)}"
+                col_id = ids.column_id(col)
                 is_checked = col in baseColumns
                 period_nodes.append(create_tree_checkbox(
-                    col_id, period, is_leaf=True, value=is_checked))
+                    col_id, period, is_leaf=True, value=is_checked, column=col))
 
         if period_nodes:
-            sanitized_subject = ''.join(
-                c if c.isalnum() else '_' for c in subject)
-            subject_id = f"subject_grades_{sanitized_subject}"
+            subject_id = ids.id_for("grades_subject", subject)
             subject_nodes.append(create_tree_checkbox(
                 subject_id, subject, period_nodes))
 
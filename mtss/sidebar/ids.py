@@ -0,0 +1,128 @@
+"""
+Module for the registry of sidebar widget IDs.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Student info columns that never get a filter
+NON_FILTER_COLUMNS = ['SSID', 'STUDENT_NAME']
+
+
+def sanitize(text):
+    """Replace every non-alphanumeric character with an underscore."""
+    return ''.join(c if c.isalnum() else '_' for c in text)
+
+
+def is_student_info_filter_column(col):
+    """Whether a student info column gets a filter (identifiers do not)."""
+    return col not in NON_FILTER_COLUMNS and not 'ID' in col
+
+
+class WidgetIds:
+    """
+    Widget IDs for every column checkbox, tree node and filter in the sidebar.
+
+    Built once from organize_columns() output, so the UI builders and the
+    server share one mapping instead of sanitizing names on every use. Keys
+    are tuples starting with the kind of widget, e.g. ("col", column) or
+    ("filter_grades", subject, period). If two keys sanitize to the same ID
+    the later one gets a numeric suffix and a warning is logged.
+    """
+
+    def __init__(self, organized):
+        """
+        Args:
+            organized: Dictionary returned by organize_columns(); missing
+                sections are treated as empty
+        """
+        self._ids = {}   # key -> widget ID
+        self._keys = {}  # widget ID -> key
+        self.collisions = []
+
+        # Widget ID -> original column, for assessment and grade checkboxes
+        self.columns = {}
+        # Filter ID -> (name, subject, year)
+        self.assessment_filters = {}
+        # Scale score range filter ID -> (name, subject, year)
+        self.assessment_range_filters = {}
+        # Filter ID -> (subject, period)
+        self.grades_filters = {}
+        # Filter ID -> student info column
+        self.student_info_filters = {}
+
+        for name, subjects in organized.get("Assessments", {}).items():
+            self._register(("assessment", name), "assessment", name)
+            self._register(("collapse_assessment", name), "collapse_assessment", name)
+            for subject, years in subjects.items():
+                self._register(("subject", name, subject), "subject", name, subject)
+                self._register(("collapse_subject", name, subject),
+                               "collapse_subject", name, subject)
+                for year, testing_periods in years.items():
+                    self._register(("year", name, subject, year), "year", name, subject, year)
+                    filter_id = self._register(("filter_assessment", name, subject, year),
+                                               "filter", name, subject, year)
+                    self.assessment_filters[filter_id] = (name, subject, year)
+                    range_id = self._register(("filter_assessment_range", name, subject, year),
+                                              "range", name, subject, year)
+                    self.assessment_range_filters[range_id] = (name, subject, year)
+                    for tp, assessment_types in testing_periods.items():
+                        self._register(("tp", name, subject, year, tp),
+                                       "tp", name, subject, year, tp)
+                        for atype, cols in assessment_types.items():
+                            self._register(("type", name, subject, year, tp, atype),
+                                           "type", name, subject, year, tp, atype)
+                            for col in cols:
+                                self._register_column(col)
+
+        for subject, periods in organized.get("Grades", {}).items():
+            self._register(("grades_subject", subject), "subject_grades", subject)
+            self._register(("collapse_grades_subject", subject),
+                           "collapse_grades_subject", subject)
+            for period, cols in periods.items():
+                filter_id = self._register(("filter_grades", subject, period),
+                                           "filter_grades", subject, period)
+                self.grades_filters[filter_id] = (subject, period)
+                for col in cols:
+                    self._register_column(col)
+
+        for col in organized.get("Student Info", []):
+            if is_student_info_filter_column(col):
+                filter_id = self._register(("filter_student_info", col), "filter", col)
+                self.student_info_filters[filter_id] = col
+                self._register(("collapse_student_info", col), "collapse", col)
+
+    def _register(self, key, prefix, *parts):
+        """Assign the ID prefix_part1_part2... to key, suffixing it on collision."""
+        widget_id = "_".join([prefix] + [sanitize(part) if part else '' for part in parts])
+        if widget_id in self._keys:
+            base_id, n = widget_id, 2
+            while f"{base_id}_{n}" in self._keys:
+                n += 1
+            widget_id = f"{base_id}_{n}"
+            self.collisions.append((self._keys[base_id], key))
+            logger.warning("Widget ID %s for %r already used by %r; using %s",
+                           base_id, key, self._keys[base_id], widget_id)
+        self._ids[key] = widget_id
+        self._keys[widget_id] = key
+        return widget_id
+
+    def _register_column(self, col):
+        key = ("col", col)
+        if key not in self._ids:
+            self.columns[self._register(key, "col", col)] = col
+
+    def __contains__(self, widget_id):
+        return widget_id in self._keys
+
+    def id_for(self, *key):
+        """Widget ID for a key such as ("year", name, subject, year)."""
+        return self._ids[key]
+
+    def key_for(self, widget_id):
+        """Key a widget ID was registered for."""
+        return self._keys[widget_id]
+
+    def column_id(self, col):
+        """ID of the leaf checkbox that selects an assessment or grade column."""
+        return self._ids[("col", col)]
@@ -77,6 +77,51 @@ def get_sidebar_javascript():
             }
         }
         
+        // Report every checked assessment and grade checkbox as one input.
+        // The set is kept here because unexpanded branches have no checkboxes in the page yet.
+        var selectedColumnIds = null;
+        function storeSelectedColumns(checkbox) {
+            const selectedInput = document.getElementById('selected_columns');
+            if (!selectedInput) {
+                return;
+            }
+            if (selectedColumnIds === null) {
+                selectedColumnIds = new Set(JSON.parse(selectedInput.value || '[]'));
+            }
+            if (checkbox.checked) {
+                selectedColumnIds.add(checkbox.id);
+            } else {
+                selectedColumnIds.delete(checkbox.id);
+            }
+            selectedInput.value = JSON.stringify(Array.from(selectedColumnIds));
+            selectedInput.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+
+        document.addEventListener('change', function(event) {
+            if (event.target.matches('input.column-checkbox')) {
+                storeSelectedColumns(event.target);
+            }
+            if (event.target.matches('input[type="checkbox"]')) {
+                // Update the column order list when checkboxes change
+                updateColumnOrderList();
+            }
+        });
+
+        // Ask the server to attach its option search to a high-cardinality filter once bound
+        $(document).on('shiny:bound', function(event) {
+            if ($(event.target).closest('.server-options-filter').length) {
+                Shiny.setInputValue('server_options_filter', event.target.id, { priority: 'event' });
+            }
+        });
+
+        // Ask the server for the children of a lazy container the first time it opens
+        function loadLazyContent(content) {
+            if (content && content.getAttribute('data-lazy') === 'pending' && window.Shiny) {
+                content.setAttribute('data-lazy', 'loaded');
+                Shiny.setInputValue('lazy_content', content.id, { priority: 'event' });
+            }
+        }
+
         // Update the column order list based on selected columns
         function updateColumnOrderList() {
             var columnOrderList = document.getElementById('column-order-list');
@@ -185,6 +230,7 @@ def get_sidebar_javascript():
             const icon = header.querySelector('.toggle-filter-icon');
             
             if (section.style.display === 'none' || section.style.display === '') {
+                loadLazyContent(section);
                 section.style.display = 'block';
                 icon.classList.remove('fa-chevron-right');
                 icon.classList.add('fa-chevron-down');
@@ -209,15 +255,6 @@ def get_sidebar_javascript():
                 }
             });
             
-            // Listen for changes in checkbox selections
-            var checkboxes = document.querySelectorAll('input[type="checkbox"]');
-            checkboxes.forEach(function(checkbox) {
-                checkbox.addEventListener('change', function() {
-                    // Update the column order list when checkboxes change
-                    updateColumnOrderList();
-                });
-            });
-            
             // Initialize the column order list
             updateColumnOrderList();
         });
@@ -1,26 +1,35 @@
 """
 Main module for creating the sidebar UI.
 """
-from .organize import organize_columns
 from shiny import ui
-from baseData import get_base_data
+from mtss.data import get_dataset
 from .assessment_menu import create_assessment_menu
 from .grades_menu import create_grades_menu
 from .filters import (
     create_student_info_filter,
     create_assessment_filter,
-    create_grades_filter
+    create_grades_filter,
+    get_filter_apply_ui
 )
 from .javascript import get_sidebar_javascript
 from .styles import get_sidebar_styles
 from .column_order import get_column_order_ui
+from .ids import WidgetIds
+from mtss.startup import phase
 
-# Define base columns and get base data
+# Define base columns and get the shared dataset
 baseColumns = ['SSID', 'STUDENT_NAME', 'Grade', 'School', 'Language', 'Race']
-df = get_base_data().to_pandas()
+dataset = get_dataset()
 
 # Get organized columns (will be imported from __init__)
-organized_cols = organize_columns(df.columns)
+organized_cols = dataset.organized
+
+
+# Widget IDs for every column, tree node and filter, shared with the server.
+# Built once from the dataset loaded at import: columns a refresh adds are
+# not in the sidebar until the app restarts
+with phase("sidebar widget ids"):
+    widget_ids = WidgetIds(organized_cols)
 
 # Create the sidebar UI
 app_sidebar = ui.sidebar(
@@ -37,9 +46,9 @@ app_sidebar = ui.sidebar(
     ui.div(
         ui.navset_card_tab(
             ui.nav_panel("Assessments", create_assessment_menu(
-                organized_cols["Assessments"])),
+                organized_cols["Assessments"], widget_ids)),
             ui.nav_panel("Grades", create_grades_menu(
-                organized_cols["Grades"])),
+                organized_cols["Grades"], widget_ids)),
             ui.nav_panel("Student Info",
                          ui.div(
                              ui.input_checkbox_group(
@@ -52,6 +61,10 @@ app_sidebar = ui.sidebar(
                          )
                          )
         ),
+        # Hidden input with the IDs of all checked assessment and grade checkboxes;
+        # empty at first, since the base columns are all Student Info columns
+        ui.input_text("selected_columns", "", value="[]"),
+        ui.tags.style("#selected_columns { display: none; }"),
         id="column-selection-content"
     ),
     # Divider
@@ -69,12 +82,13 @@ app_sidebar = ui.sidebar(
     ui.div(
         ui.navset_card_tab(
             ui.nav_panel("Assessments", create_assessment_filter(
-                organized_cols["Assessments"])),
+                organized_cols["Assessments"], widget_ids)),
             ui.nav_panel("Grades", create_grades_filter(
-                organized_cols["Grades"])),
+                organized_cols["Grades"], widget_ids)),
             ui.nav_panel("Student Info", create_student_info_filter(
-                organized_cols["Student Info"]))
+                organized_cols["Student Info"], widget_ids))
         ),
+        get_filter_apply_ui(),
         id="filters-content",
         style="display: block;"  # Make filters visible by default
     ),
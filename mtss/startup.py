@@ -0,0 +1,203 @@
+"""
+Module for timing the phases of a cold start and checking them against a budget.
+
+Importing app loads the dataset and builds the sidebar as side effects; the
+modules involved wrap each step in phase(), so a slow start can be traced to
+the query, transformation or UI builder that dominates it.
+
+Usage:
+    DB_URL=... python -m mtss.startup [--budget 30] [--phase "query assessments=10"]
+        [--json startup.json]
+
+Exits with status 1 when the import or a named phase is over budget, so it
+can fail a CI step. Setting MTSS_STARTUP_REPORT=<path> makes a normal app
+start write the same report (with the page size) once the UI is built.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Where app.py writes the startup report; "" disables it
+STARTUP_REPORT = os.getenv("MTSS_STARTUP_REPORT", "")
+
+# Recorded phases, in the order they finished
+startup_phases = []
+
+_started = time.perf_counter()
+_lock = threading.Lock()
+_local = threading.local()
+_main_stack = []
+
+
+def _stack():
+    """Open phases of this thread; the main thread's stack is shared for parents."""
+    if threading.current_thread() is threading.main_thread():
+        return _main_stack
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def phase(name, **details):
+    """
+    Time a block of startup work and record it as a phase.
+
+    Phases nest: a phase opened inside another one records it as its parent.
+    Phases opened on a worker thread (e.g. concurrent source queries) take the
+    innermost open phase of the main thread as their parent, and are only
+    recorded while the main thread is inside a phase, so background refreshes
+    after startup do not grow the report.
+
+    Args:
+        name: Phase name shown in the report
+        **details: Extra values to store with the phase (e.g. row counts);
+            the block can add more through the yielded dictionary
+    """
+    stack = _stack()
+    if stack is not _main_stack and not _main_stack:
+        yield details
+        return
+    parent_stack = stack or _main_stack
+    parent = parent_stack[-1] if parent_stack else None
+    stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield details
+    finally:
+        end = time.perf_counter()
+        stack.pop()
+        with _lock:
+            startup_phases.append({
+                "name": name,
+                "parent": parent,
+                "start_secs": round(start - _started, 4),
+                "secs": round(end - start, 4),
+                **details,
+            })
+
+
+def startup_report(**extra):
+    """
+    Summarize the recorded phases.
+
+    Args:
+        **extra: Additional top-level values (e.g. HTML sizes)
+
+    Returns:
+        Dictionary with the process uptime, every phase in start order, and the
+        slowest top-level phases first under "top"
+    """
+    with _lock:
+        phases = sorted(startup_phases, key=lambda p: p["start_secs"])
+    return {
+        "uptime_secs": round(time.perf_counter() - _started, 4),
+        "phases": phases,
+        "top": sorted((p for p in phases if p["parent"] is None),
+                      key=lambda p: p["secs"], reverse=True),
+        **extra,
+    }
+
+
+def budget_violations(report, total_secs=None, phase_secs=None):
+    """
+    Compare a startup report with a time budget.
+
+    Args:
+        report: Dictionary from startup_report()
+        total_secs: Budget for the whole start, checked against "import app"
+            if recorded, otherwise the uptime
+        phase_secs: Dictionary of phase name -> budget in seconds; a name that
+            was recorded several times is checked on the sum
+
+    Returns:
+        List of messages, empty if everything is within budget
+    """
+    totals = {}
+    for p in report["phases"]:
+        totals[p["name"]] = totals.get(p["name"], 0) + p["secs"]
+
+    violations = []
+    if total_secs is not None:
+        total = totals.get("import app", report["uptime_secs"])
+        if total > total_secs:
+            violations.append(f"startup took {total:.2f}s, budget {total_secs:.2f}s")
+    for name, budget in (phase_secs or {}).items():
+        if name not in totals:
+            violations.append(f"phase {name!r} was not recorded")
+        elif totals[name] > budget:
+            violations.append(f"phase {name!r} took {totals[name]:.2f}s, budget {budget:.2f}s")
+    return violations
+
+
+def write_startup_report(path=STARTUP_REPORT, **extra):
+    """
+    Write startup_report() as JSON, if a path is configured.
+
+    Args:
+        path: Output file; "-" logs the report instead, "" does nothing
+        **extra: Passed to startup_report()
+    """
+    if not path:
+        return
+    report = json.dumps(startup_report(**extra), indent=2)
+    if path == "-":
+        logger.info("Startup report:\n%s", report)
+        return
+    with open(path, "w") as f:
+        f.write(report)
+
+
+def _parse_phase_budget(text):
+    name, sep, secs = text.rpartition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=SECS, got {text!r}")
+    return name, float(secs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, help="Seconds allowed for importing app")
+    parser.add_argument("--phase", type=_parse_phase_budget, action="append", default=[],
+                        metavar="NAME=SECS", help="Budget for one phase (repeatable)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    # Run as __main__, this module is a separate copy; record through the one
+    # the app modules import
+    from mtss import startup
+
+    sys.path.insert(0, os.getcwd())
+    with startup.phase("import app"):
+        import app
+
+    # Initial page size; lazy sections are sent later, on expand
+    with startup.phase("render html") as sizes:
+        sizes["page_bytes"] = len(str(app.app_ui).encode())
+        sizes["lazy_bytes"] = sum(len(str(children).encode())
+                                  for children in app.lazy_children.values())
+
+    report = startup.startup_report()
+    violations = startup.budget_violations(report, args.budget, dict(args.phase))
+    report["violations"] = violations
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text)
+    for message in violations:
+        print(f"Over budget: {message}", file=sys.stderr)
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Shared fixtures: a small synthetic source database, and the settings the
+app modules read when they are imported.
+"""
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Read when baseData and mtss.data are imported, so set before any test imports them
+os.environ.setdefault("MTSS_SNAPSHOT_DIR", "")
+os.environ.setdefault("MTSS_ASSESSMENT_WATERMARK", "LOAD_ID")
+os.environ.setdefault("MTSS_REFRESH_INTERVAL", "0")
+os.environ.setdefault("MTSS_DATASET_MODE", "local")
+
+from benchmarks.synthetic import generate_database  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def synthetic_db(tmp_path_factory):
+    """Path of a small synthetic database, generated once per test run."""
+    path = tmp_path_factory.mktemp("source") / "mtss.db"
+    generate_database(str(path), students=120, tests=2, years=2, periods=2, seed=1)
+    return path
+
+
+@pytest.fixture
+def source_db(synthetic_db, tmp_path, monkeypatch):
+    """A private copy of the synthetic database, set as DB_URL."""
+    path = tmp_path / "mtss.db"
+    shutil.copy(synthetic_db, path)
+    monkeypatch.setenv("DB_URL", f"sqlite:///{path}")
+    return path
+
+
+@pytest.fixture
+def add_results(source_db):
+    """
+    Function appending assessment rows (SSID, TEST_NAME, SUBJECT, SCHOOL_YEAR,
+    TEST_DATE, PL, SS) to the source database, loaded after every existing row.
+    """
+    def add(rows):
+        with sqlite3.connect(source_db) as con:
+            load_id = con.execute('select max("LOAD_ID") from mtss_assessments').fetchone()[0]
+            con.executemany("insert into mtss_assessments values (?, ?, ?, ?, ?, ?, ?, ?)",
+                            [(*row, load_id + i) for i, row in enumerate(rows, 1)])
+    return add
+
+
+@pytest.fixture
+def add_student(source_db):
+    """Function adding a student with only an SSID and a name to the source database."""
+    def add(ssid):
+        with sqlite3.connect(source_db) as con:
+            con.execute('insert into mtss_base ("SSID", "STUDENT_NAME") values (?, ?)',
+                        (ssid, f"Student {ssid}"))
+    return add
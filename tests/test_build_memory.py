@@ -0,0 +1,24 @@
+"""
+Chunk planning for budgeted builds.
+"""
+import pytest
+
+import baseData
+
+
+def test_chunks_fit_the_headroom(source_db, monkeypatch):
+    assert baseData.plan_assessment_chunks(1024) == 1
+    monkeypatch.setattr(baseData, "BUILD_MEMORY_FACTOR", 2000)
+    assert 1 < baseData.plan_assessment_chunks(64) < baseData.plan_assessment_chunks(16)
+
+
+@pytest.mark.parametrize("headroom_mb", [0, -5, baseData.MIN_CHUNK_HEADROOM_MB - 1])
+def test_too_little_headroom_raises(source_db, headroom_mb):
+    with pytest.raises(MemoryError, match="MTSS_BUILD_MEMORY_MB"):
+        baseData.plan_assessment_chunks(headroom_mb)
+
+
+def test_too_many_chunks_raises(source_db, monkeypatch):
+    monkeypatch.setattr(baseData, "BUILD_MEMORY_FACTOR", 10 ** 6)
+    with pytest.raises(MemoryError, match="chunks"):
+        baseData.plan_assessment_chunks(baseData.MIN_CHUNK_HEADROOM_MB)
@@ -0,0 +1,73 @@
+"""
+Debounced reactive calculations collapse bursts of input changes.
+"""
+import asyncio
+
+import pytest
+from shiny import reactive
+
+DELAY_SECS = 0.1
+
+
+@pytest.fixture
+def debounce(source_db):
+    # Importing the sidebar package builds the sidebar, which loads the dataset
+    from mtss.sidebar.debounce import debounce
+    return debounce
+
+
+def watch(debounce, delay_secs):
+    """A reactive source, its debounced calculation, and the values seen downstream."""
+    source = reactive.Value(0)
+    seen = []
+
+    @debounce(delay_secs)
+    @reactive.Calc
+    def debounced():
+        return source()
+
+    @reactive.Effect
+    def _():
+        seen.append(debounced())
+
+    return source, seen
+
+
+async def burst(source, values):
+    """Set each value and flush, faster than the debounce delay."""
+    for value in values:
+        source.set(value)
+        await reactive.flush()
+        await asyncio.sleep(DELAY_SECS / 10)
+
+
+def test_burst_causes_one_update(debounce):
+    async def run():
+        source, seen = watch(debounce, DELAY_SECS)
+        await reactive.flush()
+        await burst(source, [1, 2, 3, 4])
+        assert seen == [0]
+        await asyncio.sleep(DELAY_SECS * 2)
+        await reactive.flush()
+        return seen
+    assert asyncio.run(run()) == [0, 4]
+
+
+def test_burst_back_to_the_same_value_causes_no_update(debounce):
+    async def run():
+        source, seen = watch(debounce, DELAY_SECS)
+        await reactive.flush()
+        await burst(source, [1, 2, 0])
+        await asyncio.sleep(DELAY_SECS * 2)
+        await reactive.flush()
+        return seen
+    assert asyncio.run(run()) == [0]
+
+
+def test_zero_delay_passes_every_change(debounce):
+    async def run():
+        source, seen = watch(debounce, 0)
+        await reactive.flush()
+        await burst(source, [1, 2])
+        return seen
+    assert asyncio.run(run()) == [0, 1, 2]
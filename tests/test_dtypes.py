@@ -0,0 +1,19 @@
+"""
+Compact dtypes of loaded values.
+"""
+import polars as pl
+
+import baseData
+
+
+def test_scores_parse_leniently():
+    raw = pl.Series(["2450", " 2450.7 ", "1e11", "-1e11", "nan", "inf", "n/a", "", None])
+    scores = pl.select(baseData.as_scores(pl.lit(raw))).to_series()
+    assert scores.dtype == baseData.SCORE_DTYPE
+    assert scores.to_list() == [2450, 2450, None, None, None, None, None, None, None]
+
+
+def test_labels_are_categorical():
+    labels = pl.select(baseData.as_labels(pl.lit(pl.Series(["A", None, "B"])))).to_series()
+    assert labels.dtype == baseData.LABEL_DTYPE
+    assert labels.cast(pl.String).to_list() == ["A", None, "B"]
@@ -0,0 +1,59 @@
+"""
+Shared filter cache: exact hits, narrowing from a cached subset of the
+filters, and invalidation when the dataset version changes.
+"""
+import polars as pl
+
+from mtss.data import Dataset
+from mtss.data.filter_cache import FilterCache, canonical_filters
+
+SCHOOLS = {"student_info": {"School": ["Lincoln", "Adams"]}}
+SCHOOLS_AND_GRADES = {"student_info": {"School": ["Adams", "Lincoln", ""],
+                                       "Grade": ["3", "4", "5", "6"]}}
+
+
+def test_canonical_filters_ignore_order_and_placeholders():
+    assert canonical_filters(SCHOOLS) == canonical_filters(
+        {"student_info": {"School": ["Adams", "", "Lincoln"]}, "grades": {"Math": {"T1": []}}})
+    assert canonical_filters(SCHOOLS) < canonical_filters(SCHOOLS_AND_GRADES)
+
+
+def test_cache_hits_and_narrows(source_db):
+    dataset = Dataset.load()
+    cache = FilterCache()
+
+    rows = dataset.filter_rows(SCHOOLS, cache)
+    assert (cache.hits, cache.partial_hits, cache.misses) == (0, 0, 1)
+    assert dataset.filter_rows(SCHOOLS, cache) is rows
+    assert cache.hits == 1
+
+    narrowed = dataset.filter_rows(SCHOOLS_AND_GRADES, cache)
+    assert cache.partial_hits == 1
+    assert narrowed.equals(dataset.filter_rows(SCHOOLS_AND_GRADES, cache=None))
+    assert len(cache) == 2
+
+
+def test_cache_misses_after_version_bump(source_db):
+    dataset = Dataset.load()
+    cache = FilterCache()
+    dataset.filter_rows(SCHOOLS, cache)
+
+    refreshed = Dataset(dataset.frame, dataset.assessments, dataset.catalog, version=1)
+    refreshed.build_indexes()
+    refreshed.filter_rows(SCHOOLS_AND_GRADES, cache)
+    refreshed.filter_rows(SCHOOLS, cache)
+    assert (cache.hits, cache.partial_hits, cache.misses) == (0, 0, 3)
+
+
+def test_cache_evicts_least_recently_used():
+    rows = pl.Series("ROW", range(100), dtype=pl.UInt32)
+    cache = FilterCache(max_bytes=rows.estimated_size() * 2)
+    for school in ["A", "B", "C"]:
+        cache.put(0, canonical_filters({"student_info": {"School": [school]}}), rows)
+        if school == "B":
+            cache.get(0, canonical_filters({"student_info": {"School": ["A"]}}))
+
+    assert len(cache) == 2
+    assert cache.nbytes <= cache.max_bytes
+    assert cache.get(0, canonical_filters({"student_info": {"School": ["B"]}})) is None
+    assert cache.get(0, canonical_filters({"student_info": {"School": ["A"]}})) is not None
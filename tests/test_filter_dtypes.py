@@ -0,0 +1,78 @@
+"""
+Filters on non-string student columns, with the string values the UI sends.
+"""
+import datetime
+
+import polars as pl
+import pytest
+
+from baseData import CATALOG_SCHEMA, LABEL_DTYPE, SCORE_DTYPE
+from mtss.data import Dataset
+
+ROWS = 200
+START = datetime.date(2024, 8, 1)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    frame = pl.DataFrame({
+        "SSID": [str(1000 + i) for i in range(ROWS)],
+        # Few distinct values: resolved through the bitmap index
+        "Enrolled": [START + datetime.timedelta(days=i % 5) for i in range(ROWS)],
+        "Gifted": pl.Series([None if i % 7 == 0 else i % 3 == 0 for i in range(ROWS)],
+                            dtype=pl.Boolean),
+        "Age": pl.Series([10 + i % 4 for i in range(ROWS)], dtype=pl.UInt8),
+        # Too many distinct values for the bitmap index: filtered by expression
+        "Birthday": [START - datetime.timedelta(days=4000 + i) for i in range(ROWS)],
+        "Last Login": [datetime.datetime(2024, 9, 1, 8) + datetime.timedelta(hours=i)
+                       for i in range(ROWS)],
+    })
+    assessments = pl.DataFrame(schema={"SSID": pl.String, "COLUMN": pl.String,
+                                       "PL": LABEL_DTYPE, "SS": SCORE_DTYPE})
+    dataset = Dataset(frame, assessments, pl.DataFrame(schema=CATALOG_SCHEMA))
+    dataset.build_indexes()
+    return dataset
+
+
+def matching_rows(dataset, col, values):
+    return dataset.filter_rows({"student_info": {col: values}}, cache=None).to_list()
+
+
+def expected_rows(dataset, expression):
+    return (dataset.frame.with_row_index("ROW").filter(expression)
+            .get_column("ROW").to_list())
+
+
+def test_date_column(dataset):
+    assert "Enrolled" in dataset.bitmap_index
+    assert matching_rows(dataset, "Enrolled", ["2024-08-02", "2024-08-04", "not a date"]) == \
+        expected_rows(dataset, pl.col("Enrolled").is_in(
+            [datetime.date(2024, 8, 2), datetime.date(2024, 8, 4)]))
+
+
+def test_unindexed_date_column(dataset):
+    assert "Birthday" not in dataset.bitmap_index
+    birthday = dataset.frame.get_column("Birthday")[17]
+    assert matching_rows(dataset, "Birthday", [str(birthday)]) == [17]
+
+
+def test_datetime_column(dataset):
+    login = dataset.frame.get_column("Last Login")[42]
+    assert matching_rows(dataset, "Last Login", [str(login), "yesterday"]) == [42]
+
+
+def test_boolean_column(dataset):
+    assert matching_rows(dataset, "Gifted", ["True"]) == \
+        expected_rows(dataset, pl.col("Gifted") == True)  # noqa: E712
+    assert matching_rows(dataset, "Gifted", ["false", "maybe"]) == \
+        expected_rows(dataset, pl.col("Gifted") == False)  # noqa: E712
+
+
+def test_integer_column(dataset):
+    assert matching_rows(dataset, "Age", ["11", "12.5", "x"]) == \
+        expected_rows(dataset, pl.col("Age") == 11)
+
+
+def test_values_that_never_parse_match_nothing(dataset):
+    assert matching_rows(dataset, "Enrolled", ["soon"]) == []
+    assert matching_rows(dataset, "Gifted", ["maybe"]) == []
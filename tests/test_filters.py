@@ -0,0 +1,72 @@
+"""
+The filter engine selects the same rows as the pandas implementation it replaced.
+"""
+import datetime
+
+import polars as pl
+import pytest
+
+from benchmarks.bench_filter import legacy_filter, make_frame
+from mtss.data.bitmap_index import BitmapIndex
+from mtss.data.column_index import ColumnIndex
+from mtss.data.filter_engine import apply_filters
+from mtss.data.organize import organize_columns
+
+SELECT_COLS = ["SSID", "School", "TEST0 ELA 2015-2016  PL", "GR_Math_T1"]
+
+# Columns the UI filters with string values; the legacy filter compared those
+# with the columns' string form
+TYPED_COLS = ["Enrolled", "Gifted"]
+
+FILTERS = [
+    {"student_info": {"School": ["Lincoln", "Adams"]}, "assessments": {}, "grades": {}},
+    {"student_info": {"School": ["Lincoln", ""], "Grade": ["3", "4", "5"]},
+     "assessments": {}, "grades": {}},
+    {"student_info": {},
+     "assessments": {"TEST0": {"ELA": {"2015-2016": ["Standard Met", "Standard Exceeded"]}}},
+     "grades": {}},
+    {"student_info": {}, "assessments": {}, "grades": {"Math": {"T1": ["A", "B"]}}},
+    {"student_info": {"School": ["Jefferson"]},
+     "assessments": {"TEST0": {"ELA": {"2015-2016": ["Standard Not Met"]},
+                               "Math": {"2015-2016": ["Standard Met"]}}},
+     "grades": {"Math": {"T1": ["A", "B"], "T2": ["C"]}}},
+    {"student_info": {"School": ["Nowhere"]}, "assessments": {}, "grades": {}},
+    # Date and Boolean columns, filtered with the strings the UI sends
+    {"student_info": {"Enrolled": ["2024-08-02", "2024-08-04"]},
+     "assessments": {}, "grades": {}},
+    {"student_info": {"Gifted": ["True"], "School": ["Adams", "Monroe"]},
+     "assessments": {}, "grades": {}},
+    {"student_info": {"Gifted": ["False"], "Enrolled": ["2024-08-01", "someday"]},
+     "assessments": {}, "grades": {"Math": {"T1": ["A"]}}},
+    {"student_info": {}, "assessments": {}, "grades": {}},
+]
+
+
+@pytest.fixture(scope="module")
+def wide():
+    frame, catalog = make_frame(rows=600, tests=16, seed=3)
+    frame = frame.with_columns(
+        Enrolled=pl.Series([datetime.date(2024, 8, 1) + datetime.timedelta(days=i % 5)
+                            for i in range(frame.height)]),
+        Gifted=pl.Series([i % 3 == 0 for i in range(frame.height)]),
+    )
+    column_index = ColumnIndex(organize_columns(frame.columns, catalog))
+    filterable = ["Grade", "School", *TYPED_COLS] + [
+        col for (_, _, _, atype), cols in column_index.assessments.items()
+        if atype == "PL" for col in cols
+    ] + [col for cols in column_index.grades.values() for col in cols]
+    return frame, column_index, BitmapIndex(frame, filterable)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_engine_matches_legacy_filter(wide, filters):
+    frame, column_index, bitmap_index = wide
+    pandas_frame = frame.to_pandas().astype({col: str for col in TYPED_COLS})
+    expected = legacy_filter(pandas_frame, filters, SELECT_COLS)
+
+    result = apply_filters(frame, filters, SELECT_COLS, column_index)
+    assert result.get_column("SSID").to_list() == expected["SSID"].tolist()
+    assert result.columns == SELECT_COLS
+
+    indexed = apply_filters(frame, filters, SELECT_COLS, column_index, bitmap_index)
+    assert indexed.equals(result)
@@ -0,0 +1,30 @@
+"""
+Combined grades frame and its catalog.
+"""
+import polars as pl
+
+import baseData
+
+
+def test_only_grade_columns_become_labels():
+    sources = {
+        "elgrades": pl.DataFrame({"SSID": ["1", "2"], "GR_M_T1": ["A", None],
+                                  "ENROLLED_DAYS": [170, 165]}),
+        "segrades": pl.DataFrame({"SSID": ["3"], "GR_E_Q1": ["B"]}),
+    }
+    grades, catalog = baseData.get_grades(sources)
+
+    assert sorted(catalog.get_column("COLUMN")) == ["GR_English_Q1", "GR_Math_T1"]
+    assert grades.schema["GR_Math_T1"] == baseData.LABEL_DTYPE
+    assert grades.schema["GR_English_Q1"] == baseData.LABEL_DTYPE
+    assert grades.schema["ENROLLED_DAYS"] == pl.Int64
+    assert grades.schema["SSID"] == pl.String
+    assert grades.sort("SSID").get_column("GR_Math_T1").cast(pl.String).to_list() == [
+        "A", None, None]
+
+
+def test_tables_without_grade_columns():
+    sources = {"elgrades": pl.DataFrame({"SSID": ["1"]}),
+               "segrades": pl.DataFrame({"SSID": ["2"]})}
+    grades, catalog = baseData.get_grades(sources)
+    assert grades.columns == ["SSID"] and catalog.height == 0
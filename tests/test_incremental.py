@@ -0,0 +1,93 @@
+"""
+Incremental assessment refresh (Dataset.load_incremental) against a full rebuild.
+"""
+import sqlite3
+
+import numpy as np
+
+from mtss.data import Dataset
+
+
+def same_entries(a, b):
+    """Whether two index entry dictionaries hold equal arrays."""
+    if a.keys() != b.keys():
+        return False
+    for col in a:
+        if isinstance(a[col], dict):
+            if a[col].keys() != b[col].keys() or not all(
+                    np.array_equal(a[col][value], b[col][value]) for value in a[col]):
+                return False
+        elif not all(np.array_equal(x, y) for x, y in zip(a[col], b[col])):
+            return False
+    return True
+
+
+def test_incremental_refresh_matches_full_rebuild(add_results):
+    dataset = Dataset.load()
+    ssids = dataset.frame.get_column("SSID")
+    add_results([
+        # A newer result in an existing test, and a test nobody had taken
+        (ssids[0], "i-Ready", "Math", "2023-2024", "2024-06-20", "Two Grade Levels Below", "410"),
+        (ssids[5], "Benchmark", "ELA", "2023-2024", "2024-06-21", "Level 2", "512"),
+    ])
+
+    patched = dataset.load_incremental(1)
+    rebuilt = Dataset.load(2)
+
+    assert patched.watermark == rebuilt.watermark > dataset.watermark
+    assert patched.columns == rebuilt.columns
+    assert patched.project(patched.columns).equals(rebuilt.project(rebuilt.columns))
+    assert same_entries(patched.bitmap_index.bitmaps, rebuilt.bitmap_index.bitmaps)
+    assert same_entries(patched.range_index.sorted, rebuilt.range_index.sorted)
+
+
+def test_incremental_refresh_keeps_unchanged_columns(add_results):
+    dataset = Dataset.load()
+    ssid = dataset.frame.get_column("SSID")[3]
+    add_results([
+        (ssid, "i-Ready", "Math", "2023-2024", "2024-06-20", "Two Grade Levels Below", "410"),
+    ])
+    # Columns the student has results in, before and after the refresh
+    row = dataset.frame.get_column("SSID").to_list().index(ssid)
+    before = {col for col in dataset.assessments.columns
+              if row in dataset.assessments.values(col).get_column("ROW").to_list()}
+
+    patched = dataset.load_incremental(1)
+    after = {col for col in patched.assessments.columns
+             if row in patched.assessments.values(col).get_column("ROW").to_list()}
+    unchanged = [col for col in dataset.assessments.columns if col not in before | after]
+
+    assert unchanged
+    for col in unchanged:
+        # The same stored slice and the same index entries, not rebuilt copies
+        assert patched.assessments.values(col) is dataset.assessments.values(col)
+        if col in dataset.bitmap_index:
+            assert patched.bitmap_index.bitmaps[col] is dataset.bitmap_index.bitmaps[col]
+        if col in dataset.range_index:
+            assert patched.range_index.sorted[col] is dataset.range_index.sorted[col]
+
+
+def test_new_student_falls_back_to_full_load(add_results, add_student):
+    dataset = Dataset.load()
+    add_student("2000000")
+    add_results([
+        ("2000000", "i-Ready", "Math", "2023-2024", "2024-06-20", "Two Grade Levels Below", "410"),
+    ])
+
+    refreshed = dataset.load_incremental(1)
+    rebuilt = Dataset.load(2)
+
+    assert "2000000" in refreshed.frame.get_column("SSID")
+    assert refreshed.project(refreshed.columns).equals(rebuilt.project(rebuilt.columns))
+
+
+def test_updated_grades_fall_back_to_full_load(source_db):
+    dataset = Dataset.load()
+    ssid = dataset.frame.get_column("SSID")[0]
+    with sqlite3.connect(source_db) as con:
+        con.execute('update mtss_elgrades set "GR_M_T1" = ? where "SSID" = ?', ("I", ssid))
+        con.execute('update mtss_segrades set "GR_M_Q1" = ? where "SSID" = ?', ("I", ssid))
+
+    refreshed = dataset.load_incremental(1)
+    grades = refreshed.frame.filter(SSID=ssid).select("GR_Math_T1", "GR_Math_Q1").row(0)
+    assert "I" in grades
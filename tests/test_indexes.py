@@ -0,0 +1,92 @@
+"""
+Bitmap and range index lookups agree with scanning the column.
+"""
+import numpy as np
+import polars as pl
+import pytest
+
+from mtss.data.bitmap_index import BitmapIndex
+from mtss.data.range_index import RangeIndex
+
+ROWS = 1000
+
+
+@pytest.fixture(scope="module")
+def frame():
+    rng = np.random.default_rng(7)
+    # "Common" fills every row, so its values are stored as bitmaps; "Rare"
+    # only has a few results, so its values are stored as row indices
+    rare = [value if keep else None for value, keep in
+            zip(rng.choice(["A", "B", "C"], ROWS).tolist(), rng.random(ROWS) < 0.05)]
+    scores = [int(score) if keep else None for score, keep in
+              zip(rng.integers(2200, 2800, ROWS), rng.random(ROWS) < 0.3)]
+    scores[0] = None
+    # Scores stored as text, with one value that is not a number
+    text = ["n/a"] + [None if score is None else str(score) for score in scores[1:]]
+    return pl.DataFrame({
+        "Common": rng.choice(["X", "Y", "Z"], ROWS),
+        "Rare": pl.Series(rare, dtype=pl.String),
+        "Score": pl.Series(scores, dtype=pl.Int64),
+        "Text": pl.Series(text, dtype=pl.String),
+        "Wide": [str(i) for i in range(ROWS)],
+    })
+
+
+def scan_mask(frame, expression):
+    """Boolean numpy mask of the rows matching an expression."""
+    return frame.select(expression.fill_null(False)).to_series().to_numpy()
+
+
+def unpack(bitmap):
+    return np.unpackbits(bitmap, count=ROWS).astype(bool)
+
+
+def test_bitmap_entries_are_sparse_or_dense(frame):
+    index = BitmapIndex(frame, ["Common", "Rare", "Wide", "Missing"])
+    assert "Wide" not in index and "Missing" not in index
+    assert all(entry.dtype == np.uint8 for entry in index.bitmaps["Common"].values())
+    assert all(entry.dtype == np.uint16 for entry in index.bitmaps["Rare"].values())
+    assert index.nbytes < (ROWS + 7) // 8 * 4
+
+
+@pytest.mark.parametrize("terms", [
+    [("Common", ["X"])],
+    [("Rare", ["A", "C"])],
+    [("Common", ["Z"]), ("Rare", ["B"])],
+    [("Rare", ["missing value"])],
+])
+def test_bitmap_lookup_matches_scan(frame, terms):
+    index = BitmapIndex(frame, ["Common", "Rare"])
+    expected = np.zeros(ROWS, dtype=bool)
+    for col, values in terms:
+        expected |= scan_mask(frame, pl.col(col).is_in(values))
+    assert (unpack(index.lookup(terms)) == expected).all()
+
+
+def test_bitmap_lookup_needs_every_column_indexed(frame):
+    index = BitmapIndex(frame, ["Common"])
+    assert index.lookup([("Common", ["X"]), ("Wide", ["1"])]) is None
+
+
+def test_range_bounds(frame):
+    index = RangeIndex(frame, ["Score", "Text"])
+    scores = frame.get_column("Score")
+    assert index.bounds(["Score"]) == (scores.min(), scores.max())
+    # The value that does not parse as a number is left out
+    assert index.bounds(["Text"]) == (scores.min(), scores.max())
+    assert index.bounds(["Missing"]) is None
+
+
+@pytest.mark.parametrize("low, high", [
+    (2300, 2500),
+    (2300.5, 2500.5),
+    (2400, 2400),
+    (-1e12, 1e12),
+    (2500, 2300),
+    (2300.2, 2300.8),
+])
+def test_range_lookup_matches_scan(frame, low, high):
+    index = RangeIndex(frame, ["Score", "Text"])
+    expected = scan_mask(frame, pl.col("Score").is_between(low, high))
+    assert (unpack(index.lookup([("Score", (low, high))])) == expected).all()
+    assert (unpack(index.lookup([("Text", (low, high))])) == expected).all()
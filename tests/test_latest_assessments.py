@@ -0,0 +1,105 @@
+"""
+Latest-row selection: latest_assessments() in "full" extraction and
+LATEST_ASSESSMENTS_QUERY in "latest" extraction must keep the same rows.
+"""
+import sqlite3
+
+import polars as pl
+
+import baseData
+
+# (group, TEST_DATE, PL, SS) rows of a test only these cases use, loaded in
+# this order; the row marked "win" is the one both modes must keep
+EDGE_ROWS = [
+    ("missing date", None, "win", None),
+    ("missing date", "2024-03-01", "lose", None),
+    ("empty date", "", "win", None),
+    ("empty date", "2024-03-01", "lose", None),
+    ("not a date", "01/05/2024", "win", None),
+    ("not a date", "2024-03-01", "lose", None),
+    ("not ISO", "2024-1-5", "win", None),
+    ("not ISO", "2024-01-06", "lose", None),
+    ("dates", "2024-01-04", "lose", None),
+    ("dates", "2024-02-01", "win", None),
+    # A same-day retake: the row loaded last wins
+    ("same day", "2024-03-01", "lose", "500"),
+    ("same day", "2024-03-01", "win", "450"),
+]
+
+
+def add_edge_rows(path):
+    """Append EDGE_ROWS for one student, each group as its own school year."""
+    with sqlite3.connect(path) as con:
+        ssid, load_id = con.execute(
+            'select min("SSID"), max("LOAD_ID") from mtss_assessments').fetchone()
+        con.executemany("insert into mtss_assessments values (?, ?, ?, ?, ?, ?, ?, ?)", [
+            (ssid, "Edge", "ELA", group, date, level, score, load_id + i)
+            for i, (group, date, level, score) in enumerate(EDGE_ROWS, 1)])
+
+
+def latest_rows(monkeypatch, extraction):
+    """Long assessments extracted in one mode, in a stable order."""
+    monkeypatch.setattr(baseData, "ASSESSMENT_EXTRACTION", extraction)
+    raw = baseData.read_source("assessments", baseData.assessments_query())
+    long_df, _ = baseData.long_assessments(raw)
+    return long_df.with_columns(pl.col("PL").cast(pl.String)).sort("SSID", "COLUMN")
+
+
+def edge_levels(rows):
+    """PL of every "Edge" test column."""
+    return rows.filter(pl.col("COLUMN").str.starts_with("Edge ")).drop_nulls(
+        "PL").get_column("PL").to_list()
+
+
+def test_latest_row_rules(source_db, monkeypatch):
+    add_edge_rows(source_db)
+    levels = edge_levels(latest_rows(monkeypatch, "full"))
+    assert levels == ["win"] * len({group for group, *_ in EDGE_ROWS})
+
+
+def test_extraction_modes_keep_same_rows(source_db, monkeypatch):
+    # The synthetic data has same-day retakes of its own
+    add_edge_rows(source_db)
+    assert latest_rows(monkeypatch, "latest").equals(latest_rows(monkeypatch, "full"))
+
+
+def test_same_day_retakes_without_watermark(source_db, monkeypatch):
+    monkeypatch.setattr(baseData, "ASSESSMENT_WATERMARK", "")
+    add_edge_rows(source_db)
+    full = latest_rows(monkeypatch, "full")
+    assert latest_rows(monkeypatch, "latest").equals(full)
+    # Without a load order, the higher scale score wins
+    same_day = full.filter(pl.col("COLUMN").str.starts_with("Edge ELA same day"))
+    assert same_day.get_column("SS").drop_nulls().to_list() == [500]
+
+
+def test_period_placement_uses_the_same_date_rule(source_db, monkeypatch):
+    # Only dates the latest-row rules count as dates get a testing period
+    monkeypatch.setattr(baseData, "ASSESSMENT_COLUMNS", "period")
+    add_edge_rows(source_db)
+    expected = {
+        "Edge ELA missing date  PL",
+        "Edge ELA empty date  PL",
+        "Edge ELA not a date 01/05/2024 PL",
+        "Edge ELA not ISO 2024-1-5 PL",
+        "Edge ELA dates Winter PL",
+        "Edge ELA same day Spring PL",
+    }
+    for extraction in ("full", "latest"):
+        rows = latest_rows(monkeypatch, extraction)
+        columns = rows.filter(pl.col("COLUMN").str.starts_with("Edge ")).drop_nulls("PL")
+        assert set(columns.get_column("COLUMN")) == expected
+        assert set(columns.get_column("PL")) == {"win"}
+
+
+def test_listed_tests_keep_date_columns_in_period_mode(source_db, monkeypatch):
+    monkeypatch.setattr(baseData, "ASSESSMENT_COLUMNS", "period")
+    monkeypatch.setattr(baseData, "DATE_COLUMN_TESTS", ["Edge"])
+    add_edge_rows(source_db)
+    columns = set(latest_rows(monkeypatch, "full").get_column("COLUMN"))
+
+    assert {"Edge ELA dates 2024-02-01 PL", "Edge ELA same day 2024-03-01 PL"} <= columns
+    assert not any(col.startswith("Edge ") and ("Winter" in col or "Spring" in col)
+                   for col in columns)
+    # Other tests are still built per testing period
+    assert any(col.endswith(("Fall PL", "Winter PL", "Spring PL")) for col in columns)
@@ -0,0 +1,40 @@
+"""
+The long assessments store serves the same columns and filter results as
+the wide frame it replaced.
+"""
+import pytest
+
+import baseData
+from benchmarks.bench_filter import legacy_filter
+from mtss.data import Dataset
+
+
+@pytest.fixture
+def loaded(source_db):
+    return baseData.get_base_data(), Dataset.load()
+
+
+def test_projection_matches_wide_frame(loaded):
+    wide, dataset = loaded
+    assert sorted(dataset.columns) == sorted(wide.columns)
+    assert dataset.project(wide.columns).equals(wide)
+
+
+def test_filter_rows_match_legacy_filter(loaded):
+    wide, dataset = loaded
+    (name, subject, year, _), cols = next(
+        (key, cols) for key, cols in dataset.column_index.assessments.items()
+        if key[3] == "PL" and len(cols) > 1)
+    levels = sorted(map(str, dataset.unique_values(cols[0])))[:2]
+    (grade_subject, period), grade_cols = next(iter(dataset.column_index.grades.items()))
+    filters = {
+        "student_info": {"School": ["Lincoln", "Adams", "Madison"]},
+        "assessments": {name: {subject: {year: levels}}},
+        "grades": {grade_subject: {period: ["A", "B", "C"]}},
+    }
+    select_cols = ["SSID", *cols, *grade_cols]
+
+    expected = legacy_filter(wide.to_pandas(), filters, select_cols)
+    result = dataset.query(filters, select_cols)
+    assert len(expected) > 0
+    assert result.get_column("SSID").to_list() == expected["SSID"].tolist()
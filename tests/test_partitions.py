@@ -0,0 +1,43 @@
+"""
+Partitioned source reads are opted into per query, on integer columns only.
+"""
+import logging
+
+import pytest
+
+import baseData
+
+
+@pytest.fixture
+def partitions(source_db, monkeypatch):
+    """Set MTSS_DB_PARTITION_ON as a dictionary, with three partitions."""
+    monkeypatch.setattr(baseData, "DB_PARTITIONS", 3)
+
+    def set_columns(columns):
+        monkeypatch.setattr(baseData, "DB_PARTITION_ON", columns)
+    return set_columns
+
+
+def test_partitioned_read_matches_single_read(partitions):
+    single = baseData.read_source("assessments")
+    partitions({"assessments": "LOAD_ID"})
+    assert baseData.partition_options("assessments", baseData.SOURCE_QUERIES["assessments"]) \
+        == {"partition_on": "LOAD_ID", "partition_num": 3}
+    partitioned = baseData.read_source("assessments")
+    assert partitioned.sort("LOAD_ID").equals(single.sort("LOAD_ID"))
+
+
+def test_queries_without_a_column_are_not_partitioned(partitions):
+    partitions({"assessments": "LOAD_ID"})
+    for name in ("base", "elgrades", "segrades"):
+        assert baseData.partition_options(name, baseData.SOURCE_QUERIES[name]) == {}
+
+
+@pytest.mark.parametrize("column", ["SSID", "NO_SUCH_COLUMN"])
+def test_unusable_column_falls_back_to_one_partition(partitions, caplog, column):
+    partitions({"base": column})
+    with caplog.at_level(logging.WARNING, logger="baseData"):
+        df = baseData.read_source("base")
+    assert df.height == 120
+    assert f"{column} of base" in caplog.text
+
@@ -0,0 +1,95 @@
+"""
+Snapshot cache: reuse while the source is unchanged, rebuild once it changes.
+"""
+import os
+import sqlite3
+import time
+
+from mtss.data import snapshot
+from mtss.data.loader import publish_dataset
+from mtss.data.long_assessments import LongAssessments
+
+
+def count_builds(monkeypatch):
+    """Count calls to the database build behind load_student_data()."""
+    calls = []
+    build = snapshot.get_student_data_with_watermark
+
+    def counted():
+        calls.append(1)
+        return build()
+    monkeypatch.setattr(snapshot, "get_student_data_with_watermark", counted)
+    return calls
+
+
+def test_snapshot_hit_maps_the_same_frames(source_db, tmp_path, monkeypatch):
+    calls = count_builds(monkeypatch)
+    built = snapshot.load_student_data(tmp_path)
+    mapped = snapshot.load_student_data(tmp_path)
+
+    assert len(calls) == 1
+    for built_frame, mapped_frame in zip(built[:3], mapped[:3]):
+        assert built_frame.equals(mapped_frame)
+    assert built[3] == mapped[3]
+
+
+def test_snapshot_miss_after_source_change(add_results, tmp_path, monkeypatch):
+    calls = count_builds(monkeypatch)
+    students, *_ = snapshot.load_student_data(tmp_path)
+    add_results([(students.get_column("SSID")[0], "i-Ready", "Math",
+                             "2023-2024", "2024-06-20", "Two Grade Levels Below", "410")])
+    _, _, _, watermark = snapshot.load_student_data(tmp_path)
+
+    assert len(calls) == 2
+    assert watermark == snapshot.source_fingerprint()[1]
+    assert len(list(tmp_path.glob("*.students.arrow"))) == 2
+
+
+
+def test_incremental_refresh_never_snapshots_stale_students(add_results, add_student, tmp_path):
+    students, assessments, catalog, watermark = snapshot.load_student_data(tmp_path)
+    add_student("2000000")
+    add_results([("2000000", "i-Ready", "Math", "2023-2024", "2024-06-20",
+                  "Two Grade Levels Below", "410")])
+
+    patched = snapshot.load_assessments_incremental(
+        students, LongAssessments(assessments, students.get_column("SSID")),
+        catalog, watermark, tmp_path)
+
+    assert patched is None
+    assert len(list(tmp_path.glob("*.students.arrow"))) == 1
+    students, *_ = snapshot.load_student_data(tmp_path)
+    assert "2000000" in students.get_column("SSID")
+
+
+def backdate_snapshots(directory, secs):
+    """Set the modification time of every snapshot file `secs` seconds back."""
+    written = time.time() - secs
+    for path in directory.glob("*.arrow"):
+        os.utime(path, (written, written))
+
+
+def test_expired_snapshot_is_rebuilt(source_db, tmp_path, monkeypatch):
+    calls = count_builds(monkeypatch)
+    students, *_ = snapshot.load_student_data(tmp_path)
+    ssid = students.get_column("SSID")[0]
+    # An update in place leaves the fingerprint as it was
+    with sqlite3.connect(source_db) as con:
+        con.execute('update mtss_base set "School" = ? where "SSID" = ?', ("Renamed", ssid))
+    snapshot.load_student_data(tmp_path)
+    assert len(calls) == 1
+
+    backdate_snapshots(tmp_path, snapshot.SNAPSHOT_MAX_AGE + 60)
+    students, *_ = snapshot.load_student_data(tmp_path)
+
+    assert len(calls) == 2
+    assert students.filter(SSID=ssid).get_column("School")[0] == "Renamed"
+    assert not snapshot.snapshot_expired(snapshot.source_fingerprint()[0], tmp_path)
+    assert len(list(tmp_path.glob("*.students.arrow"))) == 1
+
+
+def test_loader_republishes_expired_snapshot(source_db, tmp_path):
+    assert publish_dataset(tmp_path)
+    assert not publish_dataset(tmp_path)
+    backdate_snapshots(tmp_path, snapshot.SNAPSHOT_MAX_AGE + 60)
+    assert publish_dataset(tmp_path)
@@ -0,0 +1,54 @@
+"""
+Startup phase budgets and the budget check CLI.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from mtss.startup import budget_violations
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPORT = {
+    "uptime_secs": 4.0,
+    "phases": [
+        {"name": "import app", "parent": None, "start_secs": 0.1, "secs": 3.5},
+        {"name": "query", "parent": "import app", "start_secs": 0.2, "secs": 1.5},
+        {"name": "query", "parent": "import app", "start_secs": 1.8, "secs": 1.0},
+    ],
+}
+
+
+def test_within_budget():
+    assert budget_violations(REPORT, total_secs=5, phase_secs={"query": 3}) == []
+
+
+def test_phases_over_budget_are_reported():
+    violations = budget_violations(REPORT, total_secs=3, phase_secs={"query": 2, "pivot": 1})
+    assert violations == [
+        "startup took 3.50s, budget 3.00s",
+        "phase 'query' took 2.50s, budget 2.00s",  # the sum of both runs
+        "phase 'pivot' was not recorded",
+    ]
+
+
+def test_total_falls_back_to_uptime():
+    report = {**REPORT, "phases": REPORT["phases"][1:]}
+    assert budget_violations(report, total_secs=3.9) == ["startup took 4.00s, budget 3.90s"]
+
+
+def run_cli(*args):
+    return subprocess.run([sys.executable, "-m", "mtss.startup", *args], cwd=ROOT,
+                          env=os.environ.copy(), capture_output=True, text=True, timeout=300)
+
+
+def test_cli_exit_status(source_db):
+    over = run_cli("--budget", "0", "--phase", "render html=60")
+    assert over.returncode == 1, over.stderr
+    assert "Over budget: startup took" in over.stderr
+    assert json.loads(over.stdout)["violations"]
+
+    within = run_cli("--budget", "600", "--phase", "render html=60")
+    assert within.returncode == 0, within.stderr
+    assert json.loads(within.stdout)["violations"] == []
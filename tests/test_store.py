@@ -0,0 +1,98 @@
+"""
+DatasetStore refreshes: atomic swaps, skipped when the source is unchanged,
+and the live dataset kept when a refresh fails.
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from mtss.data import DatasetStore
+
+
+class FakeSource:
+    """Loader and source key for a DatasetStore, with controllable failures."""
+
+    def __init__(self):
+        self.key = "a"
+        self.loads = []
+        self.fail = False
+        self.release = threading.Event()
+        self.release.set()
+
+    def load(self, version):
+        self.release.wait()
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        dataset = SimpleNamespace(version=version, key=self.key)
+        self.loads.append(dataset)
+        return dataset
+
+    def store(self, **kwargs):
+        return DatasetStore(loader=self.load, key=lambda: self.key, **kwargs)
+
+
+@pytest.fixture
+def source():
+    return FakeSource()
+
+
+def test_refresh_swaps_in_the_new_dataset(source):
+    store = source.store()
+    old = store.current
+    source.key = "b"
+    source.release.clear()
+
+    thread = store.refresh()
+    # Readers keep the old dataset until the new one is complete
+    assert store.current is old and store.get_version() == 0
+    source.release.set()
+    thread.join()
+
+    assert store.current is source.loads[-1] is not old
+    assert (store.current.key, store.get_version()) == ("b", 1)
+
+
+def test_unchanged_source_keeps_the_dataset(source):
+    store = source.store()
+    old = store.current
+    store.refresh(wait=True)
+
+    assert store.current is old and store.get_version() == 0
+    assert len(source.loads) == 1
+
+
+def test_expired_dataset_is_reloaded_with_the_same_key(source):
+    store = source.store(max_age=1e-9)
+    old = store.current
+    store.refresh(wait=True)
+
+    assert store.current is not old and store.get_version() == 1
+
+
+def test_failed_refresh_keeps_the_old_dataset(source):
+    store = source.store()
+    old = store.current
+    source.key, source.fail = "b", True
+    store.refresh(wait=True)
+
+    assert store.current is old and store.get_version() == 0
+
+    # The failed key was not recorded, so the next refresh tries again
+    source.fail = False
+    store.refresh(wait=True)
+    assert store.current.key == "b" and store.get_version() == 1
+
+
+def test_refresh_follows_the_source_fingerprint(add_results):
+    store = DatasetStore()
+    ssid = store.current.frame.get_column("SSID")[0]
+    store.refresh(wait=True, incremental=True)
+    assert store.get_version() == 0
+
+    add_results([(ssid, "i-Ready", "Math", "2023-2024", "2024-06-20",
+                  "Two Grade Levels Below", "410")])
+    store.refresh(wait=True, incremental=True)
+    assert store.get_version() == 1
+    store.refresh(wait=True, incremental=True)
+    assert store.get_version() == 1
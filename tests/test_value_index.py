@@ -0,0 +1,34 @@
+"""
+Searching filter choices through the ValueIndex.
+"""
+from mtss.data.value_index import ValueIndex
+
+TEACHERS = ["Smith", "smithers", "Goldsmith", "Jones", None, "SMITH", "Arrowsmith", 12]
+
+
+def test_values_are_distinct_sorted_strings_without_nulls():
+    index = ValueIndex(TEACHERS + ["Jones", None])
+    assert index.values == ["12", "Arrowsmith", "Goldsmith", "Jones", "SMITH", "Smith",
+                            "smithers"]
+    assert len(index) == 7
+
+
+def test_prefix_matches_come_before_substring_matches():
+    index = ValueIndex(TEACHERS)
+    assert index.search("smith") == ["SMITH", "Smith", "smithers", "Arrowsmith", "Goldsmith"]
+
+
+def test_search_folds_case_and_strips_the_query():
+    index = ValueIndex(TEACHERS)
+    assert index.search("  SmItH ") == index.search("smith")
+    assert index.search("JON") == ["Jones"]
+    assert index.search("1") == ["12"]
+    assert index.search("zzz") == []
+
+
+def test_search_limit():
+    index = ValueIndex(TEACHERS)
+    assert index.search("smith", limit=2) == ["SMITH", "Smith"]
+    assert index.search("smith", limit=4) == ["SMITH", "Smith", "smithers", "Arrowsmith"]
+    assert index.search("", limit=3) == ["12", "Arrowsmith", "Goldsmith"]
+    assert index.search("smith", limit=0) == []
@@ -0,0 +1,40 @@
+"""
+Sidebar widget ID registry.
+"""
+import pytest
+
+ORGANIZED = {
+    "Assessments": {"i-Ready": {"Math": {"2023-2024": {"": {"PL": [
+        "i-Ready Math 2023-2024 2023-09-05 PL"]}}}}},
+    # Column names that only differ in characters the IDs cannot hold
+    "Grades": {"Math": {"T1": ["GR_Math_T1", "GR Math T1", "GR-Math-T1"]}},
+    "Student Info": ["SSID", "Home Language", "Home_Language"],
+}
+
+
+@pytest.fixture
+def WidgetIds(source_db):
+    # Importing the sidebar package builds the sidebar, which loads the dataset
+    from mtss.sidebar.ids import WidgetIds
+    return WidgetIds
+
+
+def test_colliding_columns_get_unique_ids(WidgetIds):
+    ids = WidgetIds(ORGANIZED)
+    grade_cols = ORGANIZED["Grades"]["Math"]["T1"]
+
+    col_ids = [ids.column_id(col) for col in grade_cols]
+    assert col_ids == ["col_GR_Math_T1", "col_GR_Math_T1_2", "col_GR_Math_T1_3"]
+    assert [ids.columns[col_id] for col_id in col_ids] == grade_cols
+    assert list(ids.student_info_filters.values()) == ["Home Language", "Home_Language"]
+    assert len(set(ids.student_info_filters)) == 2
+    assert len(ids.collisions) == 4  # two grade columns, a filter and its collapse
+
+
+def test_ids_are_stable_across_rebuilds(WidgetIds):
+    first, second = WidgetIds(ORGANIZED), WidgetIds(ORGANIZED)
+    assert first.columns == second.columns
+    assert first.student_info_filters == second.student_info_filters
+    assert first.grades_filters == second.grades_filters
+    assert first.id_for("filter_assessment", "i-Ready", "Math", "2023-2024") == \
+        "filter_i_Ready_Math_2023_2024"